@@ -6,11 +6,14 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('main.ui', '.'), ('settings.ui', '.'), ('img', 'img'), ('icon.png', '.')],
-    hiddenimports=[],
+    # 预编译的界面与资源包（构建前运行 python ui_cache.py 生成）
+    hiddenimports=['ui_generated.ui_main', 'ui_generated.ui_settings', 'ui_generated.ui_updater',
+                   'ui_generated.resources'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # 只使用 PyQt6，排除其他 Qt 绑定，避免被 hook 误收集进安装包
+    excludes=['PySide6', 'shiboken6', 'PySide2', 'shiboken2', 'PyQt5'],
     noarchive=False,
     optimize=0,
 )
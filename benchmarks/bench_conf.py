@@ -0,0 +1,115 @@
+"""配置读取延迟基准：旧版 read_conf（每次 stat + 重新解析）对比 ConfigStore 缓存读取。
+
+另检查：延迟写入尚未落盘时文件被外部修改并强制重新加载，两边的修改都保留。
+
+用法：python benchmarks/bench_conf.py [次数]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import configparser as config
+
+# 使用临时目录作为 APPDATA，避免改动真实配置
+os.environ['APPDATA'] = tempfile.mkdtemp(prefix='ppt_bench_')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import conf_file  # noqa: E402
+
+
+def legacy_read_conf(section: str, key: str):
+    """改造前的 read_conf 实现（每次调用都 stat 并重新解析整个文件）。"""
+    if not os.path.isfile(conf_file.CONFIG_PATH):
+        cfg = config.ConfigParser()
+        cfg.read_dict(conf_file.DEFAULTS)
+        with open(conf_file.CONFIG_PATH, 'w', encoding='utf-8') as f:
+            cfg.write(f)
+    cfg = config.ConfigParser()
+    cfg.read(conf_file.CONFIG_PATH, encoding='utf-8')
+    return cfg.get(section, key, fallback=conf_file.DEFAULTS.get(section, {}).get(key))
+
+
+def bench(name: str, func, n: int) -> None:
+    func()
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    per_call = (time.perf_counter() - start) / n
+    print(f"{name:<36}{per_call * 1e6:>10.2f} µs/次")
+
+
+def check_deferred_reload() -> None:
+    """设置窗口延迟写入 PPT_Title 期间，文件被其他进程修改后 reload()，两边的修改都应保留。"""
+    path = os.path.join(os.environ['APPDATA'], 'deferred.ini')
+    store = conf_file.ConfigStore(path, conf_file.DEFAULTS, write_delay=60)
+    store.get('General', 'PPT_Title')
+    store.set('General', 'PPT_Title', '我的放映', defer=True)
+    cfg = config.ConfigParser()
+    cfg.read(path, encoding='utf-8')
+    cfg.set('General', 'DPI', '4')
+    with open(path, 'w', encoding='utf-8') as f:
+        cfg.write(f)
+    store.reload()
+    assert store.get('General', 'PPT_Title') == '我的放映', "重新加载丢失了未落盘的修改"
+    assert store.get('General', 'DPI') == '4', "重新加载未读到外部修改"
+    cfg = config.ConfigParser()
+    cfg.read(path, encoding='utf-8')
+    assert cfg.get('General', 'PPT_Title') == '我的放映' and cfg.get('General', 'DPI') == '4', "合并结果未落盘"
+    print("延迟写入期间重新加载：未落盘的修改与外部修改均保留")
+
+
+def check_deferred_notify() -> None:
+    """逐字输入 PPT_Title（每个字符一次延迟写入）：合并落盘后只通知一次，且不在输入线程中；
+    立即写入仍同步通知；主动 flush() 时在调用线程中补发通知。"""
+    path = os.path.join(os.environ['APPDATA'], 'notify.ini')
+    store = conf_file.ConfigStore(path, conf_file.DEFAULTS, write_delay=0.2)
+    calls = []
+    store.add_listener(lambda s: calls.append((threading.current_thread(), s.get('General', 'PPT_Title'))))
+    store.get('General', 'PPT_Title')      # 首次加载时写入默认配置，不计入
+    writes = store.write_count
+    title = 'PowerPoint 幻灯片放映 - 演示文稿1'
+    for i in range(1, len(title) + 1):
+        store.set('General', 'PPT_Title', title[:i], defer=True)
+    assert not calls, f"延迟写入期间每次修改都通知了（{len(calls)} 次）"
+    deadline = time.monotonic() + 5
+    while not calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.3)
+    assert len(calls) == 1 and calls[0][1] == title, f"落盘后应通知一次最终值：{[c[1] for c in calls]}"
+    assert calls[0][0] is not threading.current_thread(), "延迟写入的通知不应在输入线程中进行"
+    assert store.write_count - writes == 1, f"应合并为一次写入（实际 {store.write_count - writes} 次）"
+
+    calls.clear()
+    store.set('General', 'DPI', '4')
+    assert len(calls) == 1 and calls[0][0] is threading.current_thread(), "立即写入应同步通知一次"
+    calls.clear()
+    store.set('General', 'PPT_Title', '我的放映', defer=True)
+    store.flush()
+    assert len(calls) == 1 and calls[0] == (threading.current_thread(), '我的放映'), "flush() 应补发通知"
+    time.sleep(0.3)
+    assert len(calls) == 1, "flush() 之后计时器不应再次通知"
+    print(f"逐字输入 {len(title)} 个字符（延迟写入）：写入 1 次，变化回调 1 次（在落盘线程中）")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    store = conf_file.store
+    print(f"配置文件：{conf_file.CONFIG_PATH}，每项 {n} 次")
+    bench("旧版 read_conf", lambda: legacy_read_conf('General', 'DPI'), n)
+    bench("read_conf（兼容接口）", lambda: conf_file.read_conf('General', 'DPI'), n)
+    bench("store.get", lambda: store.get('General', 'PPT_Title'), n)
+    bench("store.get_int", lambda: store.get_int('General', 'DPI'), n)
+    bench("store.get_float", lambda: store.get_float('Performance', 'Window_Check_TTL'), n)
+    print(f"重新加载次数：{store.reload_count}")
+    check_deferred_reload()
+    check_deferred_notify()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except AssertionError as e:
+        print(f"校验失败：{e}")
+        sys.exit(1)
@@ -0,0 +1,67 @@
+"""手势识别器单事件开销基准，并用 tracemalloc 检查稳态下是否有内存分配。
+
+用法：python benchmarks/bench_gesture.py [轮数]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gesture import BUTTON_LEFT, BUTTON_RIGHT, TapRecognizer  # noqa: E402
+
+
+def build_events():
+    """一组典型事件：普通点击、抖动点击、滑动、菜单区点击（及随后被忽略的点击）、右键。"""
+    events = []
+    t = 0.0
+    for x, y, x2, y2 in ((500, 400, 500, 400), (600, 300, 603, 298),
+                         (700, 500, 400, 510), (10, 400, 10, 400), (500, 400, 500, 400)):
+        events.append((t, x, y, BUTTON_LEFT, True))
+        t += 0.08
+        events.append((t, x2, y2, BUTTON_LEFT, False))
+        t += 0.3
+    events.append((t, 500, 500, BUTTON_RIGHT, True))
+    events.append((t + 0.05, 500, 500, BUTTON_RIGHT, False))
+    return events
+
+
+def is_excluded(x, y):
+    return x < 95 or x > 1825 or y > 985
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    events = build_events()
+    rec = TapRecognizer(touch_slop=8, swipe_enabled=True, is_excluded=is_excluded)
+    feed = rec.feed
+
+    # 预热
+    for e in events:
+        feed(*e)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for t, x, y, b, p in events:
+            feed(t, x, y, b, p)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(rounds):
+        for t, x, y, b, p in events:
+            feed(t, x, y, b, p)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    n = rounds * len(events)
+    print(f"事件数：{n}")
+    print(f"单事件开销：{elapsed / n * 1e9:.0f} ns")
+    print(f"稳态内存增量：{after - before} B，峰值增量：{peak - before} B")
+    print(f"点击 {rec.taps}，滑动 {rec.swipes}，拒绝 {rec.rejected}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""钩子按放映状态安装的效果：模拟一段时间内放映窗口时有时无、鼠标持续点击。
+
+使用模拟后端运行 func.main：放映窗口按周期出现 / 关闭，驱动线程以固定频率产生点击，
+只有钩子已安装时点击才会进入 Python 回调（与真实的全局钩子一致）。
+对比始终安装钩子时（每次点击都进入回调）的回调次数，并测量放映开始到钩子安装的延迟。
+
+用法：python benchmarks/bench_hook_arming.py [秒数] [点击频率/秒] [放映占比]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 200
+    share = float(sys.argv[3]) if len(sys.argv) > 3 else 0.3
+    period = 2.0
+
+    os.environ['APPDATA'] = tempfile.mkdtemp(prefix='ppt-touch-bench-')
+    os.environ['PPT_TOUCH_BACKEND'] = 'simulated'
+
+    import conf_file  # noqa: E402
+    from gesture import BUTTON_LEFT  # noqa: E402
+    from os_backend import SimulatedBackend, set_backend  # noqa: E402
+    from window_tracker import WindowInfo  # noqa: E402
+
+    conf_file.store.set('Performance', 'Stats_Log_Interval', '0')
+    backend = SimulatedBackend()
+    set_backend(backend)
+
+    import func  # noqa: E402
+
+    runner = threading.Thread(target=func.main, name='FuncMain', daemon=True)
+    runner.start()
+    slideshow = [WindowInfo(1, 'PowerPoint 幻灯片放映 - 演示文稿1', 0, 0, 1920, 1080)]
+    generated = 0
+    latencies = []
+    showing = False
+    start = time.monotonic()
+    interval = 1 / rate
+    next_click = start
+    while time.monotonic() - start < duration:
+        phase = (time.monotonic() - start) % period
+        want = phase < period * share
+        if want != showing:
+            showing = want
+            changed = time.perf_counter()
+            backend.windows.set_windows(slideshow if want else [])
+            if want:
+                while not func.hook.armed and time.perf_counter() - changed < 2:
+                    time.sleep(0.0005)
+                latencies.append((time.perf_counter() - changed) * 1000)
+        # 每次点击为一次按下 + 抬起；未安装钩子时点击不会到达 Python
+        listener = func.hook.listener
+        if listener is not None:
+            listener.inject(960, 540, BUTTON_LEFT, True)
+            listener.inject(960, 540, BUTTON_LEFT, False)
+        generated += 2
+        next_click += interval
+        delay = next_click - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    elapsed = time.monotonic() - start
+    func.stop()
+    runner.join(5)
+
+    h = func.hook
+    seen = h.processed + h.skipped
+    print(f"运行 {elapsed:.1f} s，放映占比 {share:.0%}，钩子累计安装 {h.armed_seconds:.1f} s（{h.arm_count} 次）")
+    print(f"产生鼠标事件 {generated} 个：始终安装钩子时全部进入回调")
+    print(f"按放映安装：进入回调 {seen} 个（{seen / max(generated, 1):.0%}），处理 {h.processed}，跳过 {h.skipped}")
+    if latencies:
+        latencies.sort()
+        print(f"放映开始到钩子安装：中位数 {latencies[len(latencies) // 2]:.2f} ms，最大 {latencies[-1]:.2f} ms")
+    print(f"翻页次数 {func.pipeline.injected}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""按键注入后端单次开销基准。
+
+用法：python benchmarks/bench_injector.py [次数] [--key f24]
+
+注意：除 recording 外的后端会真的发送按键，默认使用几乎不被程序处理的 F24。
+当前平台不可用的后端会被跳过。
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from key_injector import BACKENDS  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('n', nargs='?', type=int, default=200)
+    parser.add_argument('--key', default='f24')
+    args = parser.parse_args()
+
+    for name, cls in BACKENDS.items():
+        try:
+            injector = cls()
+        except Exception as e:
+            print(f"{name:<10} 不可用：{e}")
+            continue
+        n = args.n
+        injector.press(args.key)
+        start = time.perf_counter()
+        for _ in range(n):
+            injector.press(args.key)
+        per_call = (time.perf_counter() - start) / n
+        print(f"{name:<10} {per_call * 1e6:>10.1f} µs/次")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""热路径日志单事件开销基准。
+
+对比：
+- 改造前：同步文件 sink + 每个事件一条 f-string 调试日志
+- 改造后（默认）：热路径调试日志关闭
+- 改造后（开启）：enqueue 文件 sink + 延迟格式化 + 每类消息限速
+
+用法：python benchmarks/bench_logging.py [事件数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger  # noqa: E402
+
+import hot_log  # noqa: E402
+
+
+def run(name, func, n):
+    start = time.perf_counter()
+    for i in range(n):
+        func(i, i + 1, 'Button.left', True)
+    per_event = (time.perf_counter() - start) / n
+    print(f"{name:<40}{per_event * 1e6:>10.2f} µs/事件")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    log_dir = tempfile.mkdtemp(prefix='ppt_log_bench_')
+    logger.remove()
+
+    # 改造前
+    sink = logger.add(os.path.join(log_dir, 'sync.log'), backtrace=True, diagnose=True)
+
+    def legacy(x, y, button, pressed):
+        logger.debug(f"X坐标：{x}，Y坐标{y}，按键：{button}，按下：{pressed}\n")
+
+    run("改造前（同步 sink + f-string）", legacy, n)
+    logger.remove(sink)
+
+    # 改造后
+    sink = logger.add(os.path.join(log_dir, 'async.log'), enqueue=True, backtrace=True, diagnose=True)
+
+    def hot(x, y, button, pressed):
+        hot_log.debug('mouse_event', "X坐标：{}，Y坐标{}，按键：{}，按下：{}", x, y, button, pressed)
+
+    hot_log.configure(debug=False)
+    run("改造后（热路径调试日志关闭）", hot, n)
+    hot_log.configure(debug=True, rate=20)
+    run("改造后（开启，限速 20 条/秒）", hot, n)
+    hot_log.configure(debug=True, rate=1e9)
+    run("改造后（开启，不限速，enqueue）", hot, n)
+    logger.complete()
+    logger.remove(sink)
+
+
+if __name__ == '__main__':
+    main()
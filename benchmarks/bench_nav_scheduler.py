@@ -0,0 +1,123 @@
+"""翻页调度器基准：放映渲染较慢时，快速连点跳页的滞后。
+
+SendInput 立即返回，按键在“放映”的队列中排队，每次翻页需 `--render-ms` 毫秒渲染
+（输入页码的数字键不渲染，回车跳转渲染一次）。演讲者以 `--tap-ms` 的间隔连点若干次
+（偶尔点一次上一页）。对比：
+
+- 逐次注入：每次点击立即发送一个翻页键（原行为）；
+- 调度器 keys / number：在途翻页受限，积压时合并为一次跳转（--stale-ms 大于 0 时丢弃过期命令）。
+
+keys 方式合并后仍逐页发送翻页键，滞后与逐次注入基本相同；只有 number 方式能缩短滞后。
+
+输出最后一次点击到放映停在目标页的滞后、放映处理的按键数与调度器统计。
+
+用法：python benchmarks/bench_nav_scheduler.py [--bursts 10] [--taps 8] [--tap-ms 60] [--render-ms 150]
+"""
+
+import argparse
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gesture import ACTION_NEXT, ACTION_PREV  # noqa: E402
+from nav_scheduler import JUMP_KEYS, JUMP_NUMBER, NavScheduler  # noqa: E402
+
+
+class SlowShow:
+    """按顺序处理按键的“放映”：翻页键与回车各渲染一次，数字键只记录页码。"""
+
+    def __init__(self, render: float):
+        self.render = render
+        self.slide = 1
+        self.keys = 0
+        self.settled = 0.0
+        self._digits = ''
+        self._queue: 'queue.Queue[str]' = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def press_sequence(self, keys):
+        for key in keys:
+            self._queue.put(key)
+
+    def idle(self) -> bool:
+        return self._queue.unfinished_tasks == 0
+
+    def _run(self):
+        while True:
+            key = self._queue.get()
+            if key.isdigit():
+                self._digits += key
+            else:
+                time.sleep(self.render)
+                if key == 'enter':
+                    self.slide = int(self._digits or self.slide)
+                    self._digits = ''
+                else:
+                    self.slide += 1 if key == 'space' else -1
+            self.keys += 1
+            self.settled = time.perf_counter()
+            self._queue.task_done()
+
+
+def run(args, jump):
+    rnd = random.Random(3)
+    show = SlowShow(args.render_ms / 1000)
+    scheduler = None
+    if jump is not None:
+        scheduler = NavScheduler(show.press_sequence, coalesce_threshold=args.threshold,
+                                 max_in_flight=args.in_flight, settle=args.render_ms / 1000,
+                                 deadline=args.stale_ms / 1000, jump=jump)
+        scheduler.reset_position(1)
+        scheduler.start()
+    lags = []
+    target = 1
+    for _ in range(args.bursts):
+        for _ in range(args.taps):
+            action = ACTION_PREV if rnd.random() < 0.1 and target > 1 else ACTION_NEXT
+            target += 1 if action == ACTION_NEXT else -1
+            t = time.perf_counter()
+            if scheduler is not None:
+                scheduler.submit(action, t, t)
+            else:
+                show.press_sequence(['space' if action == ACTION_NEXT else 'left'])
+            time.sleep(args.tap_ms / 1000)
+        last_tap = time.perf_counter()
+        timeout = last_tap + 10
+        while not (show.slide == target and show.idle() and (scheduler is None or not scheduler.pending)):
+            if time.perf_counter() > timeout:
+                break
+            time.sleep(0.001)
+        lags.append(max(0.0, show.settled - last_tap) * 1000 if show.slide == target else float('inf'))
+        time.sleep(args.pause_ms / 1000)
+    if scheduler is not None:
+        scheduler.stop()
+    lags.sort()
+    return lags, show.keys, scheduler.stats() if scheduler else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bursts', type=int, default=10)
+    parser.add_argument('--taps', type=int, default=8)
+    parser.add_argument('--tap-ms', type=float, default=60)
+    parser.add_argument('--render-ms', type=float, default=150)
+    parser.add_argument('--pause-ms', type=float, default=300)
+    parser.add_argument('--threshold', type=int, default=3)
+    parser.add_argument('--in-flight', type=int, default=2)
+    parser.add_argument('--stale-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    for label, jump in (('逐次注入', None), ('调度器 keys', JUMP_KEYS), ('调度器 number', JUMP_NUMBER)):
+        lags, keys, stats = run(args, jump)
+        print(f"{label:<12} 滞后中位数 {lags[len(lags) // 2]:8.1f} ms，最大 {lags[-1]:8.1f} ms，处理按键 {keys} 个")
+        if stats:
+            print(f"{'':<12} 调度统计：{stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""常驻托盘的内存占用随时间的变化：开启 / 关闭空闲释放各运行一次 main.py 并定时采样。
+
+子进程使用 Qt 的 offscreen 平台与模拟输入后端，配置写入临时目录；空闲释放阈值设得很短，
+以便在几十秒内观察到启动提示窗口、界面模块与图片缓存被释放后的常驻内存（RSS）。
+同时统计每秒上下文切换次数，作为空闲时被唤醒频率的近似。
+
+用法：python benchmarks/bench_resident_memory.py [采样秒数] [采样间隔秒]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def launch(idle_minutes: float) -> subprocess.Popen:
+    appdata = tempfile.mkdtemp(prefix='ppt-touch-resident-')
+    conf_dir = os.path.join(appdata, 'PowerPointTouchAssist')
+    os.makedirs(conf_dir)
+    with open(os.path.join(conf_dir, 'config.ini'), 'w', encoding='utf-8') as f:
+        f.write('[Miscellaneous]\ninitialstartup = 0\n\n'
+                '[Update]\nauto_check_hours = 0\n\n'
+                f'[Performance]\nidle_teardown_minutes = {idle_minutes}\nstats_log_interval = 0\n')
+    env = dict(os.environ, APPDATA=appdata, QT_QPA_PLATFORM='offscreen', PPT_TOUCH_BACKEND='simulated')
+    return subprocess.Popen([sys.executable, os.path.join(ROOT, 'main.py')], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def sample(duration: float, interval: float, idle_minutes: float):
+    proc = launch(idle_minutes)
+    ps = psutil.Process(proc.pid)
+    rows = []
+    last = None
+    start = time.monotonic()
+    try:
+        while time.monotonic() - start < duration:
+            time.sleep(interval)
+            if proc.poll() is not None:
+                raise RuntimeError(f"main.py 已退出（返回码 {proc.returncode}）")
+            with ps.oneshot():
+                rss = ps.memory_info().rss / 1048576
+                ctx = ps.num_ctx_switches()
+                threads = ps.num_threads()
+            now = time.monotonic()
+            switches = ctx.voluntary + ctx.involuntary
+            rate = (switches - last[1]) / (now - last[0]) if last else float('nan')
+            last = (now, switches)
+            rows.append((now - start, rss, threads, rate))
+    finally:
+        proc.terminate()
+        proc.wait(10)
+    return rows
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 40
+    interval = float(sys.argv[2]) if len(sys.argv) > 2 else 4
+    # 0.1 分钟 = 6 秒后释放
+    runs = {'空闲释放': sample(duration, interval, 0.1), '不释放': sample(duration, interval, 0)}
+
+    names = list(runs)
+    print(f"{'时间 s':>7} | " + ' | '.join(f"{n + ' RSS MB':>14} {'线程':>4} {'唤醒/s':>7}" for n in names))
+    for i in range(min(len(r) for r in runs.values())):
+        cells = []
+        for n in names:
+            t, rss, threads, rate = runs[n][i]
+            cells.append(f"{rss:14.1f} {threads:4d} {rate:7.1f}")
+        print(f"{runs[names[0]][i][0]:7.1f} | " + ' | '.join(cells))
+    a, b = runs[names[0]][-1][1], runs[names[1]][-1][1]
+    print(f"结束时常驻内存：{names[0]} {a:.1f} MB，{names[1]} {b:.1f} MB，相差 {b - a:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""放映窗口匹配基准：合并后的单次匹配 vs 每条规则各扫一遍窗口列表。
+
+模拟数百个顶层窗口与数十条规则（多语言的 PowerPoint / WPS / Impress 标题，部分带类名 / 进程名条件），
+并校验两种方式的结果一致。
+
+用法：python benchmarks/bench_title_matcher.py [窗口数] [规则数] [轮数]
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from title_matcher import TitleMatcher, parse_rules  # noqa: E402
+from window_tracker import WindowInfo  # noqa: E402
+
+BASE_RULES = [
+    'PowerPoint 幻灯片放映',
+    'PowerPoint Slide Show',
+    'PowerPoint-Bildschirmpräsentation',
+    'Diaporama PowerPoint',
+    'Presentación con diapositivas de PowerPoint',
+    'PowerPoint スライド ショー',
+    're:^WPS (演示|Presentation) 放映 ; process=wpp.exe',
+    're:Impress.*(演示|Presentation)$ ; class=SALFRAME',
+]
+
+NOISE_TITLES = ['Microsoft Edge', 'Visual Studio Code', '文件资源管理器', 'WeChat', 'Outlook',
+                '设置', 'Task Manager', '计算器', 'Notepad', 'Teams', 'Spotify', 'Zoom Meeting']
+
+
+def build_rules(count, rnd):
+    rules = list(BASE_RULES)
+    while len(rules) < count:
+        word = ''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(8))
+        if rnd.random() < 0.3:
+            rules.append(f're:^{word}\\d+ (Show|放映)$ ; process={word}.exe')
+        else:
+            rules.append(f'{word} Slideshow')
+    return '\n'.join(rules[:count])
+
+
+def build_windows(count, rnd):
+    windows = []
+    for i in range(count):
+        title = f"{rnd.choice(NOISE_TITLES)} - 文档{i}"
+        windows.append(WindowInfo(i + 1, title, class_name='Chrome_WidgetWin_1'))
+    # 放映窗口放在最后，两种方式都要扫完整个列表
+    windows.append(WindowInfo(count + 1, 'WPS 演示 放映', class_name='wpsShowFrame'))
+    return windows
+
+
+def naive_match(rules, win, process):
+    """参考实现：每条规则单独匹配。"""
+    for r in rules:
+        if not re.search(r.pattern, win.title):
+            continue
+        if r.class_name and r.class_name != win.class_name.lower():
+            continue
+        if r.process and r.process != process(win.handle).lower():
+            continue
+        return True
+    return False
+
+
+def main():
+    n_windows = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    n_rules = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    rnd = random.Random(7)
+    text = build_rules(n_rules, rnd)
+    windows = build_windows(n_windows, rnd)
+    processes = {len(windows): 'WPP.EXE'}
+    lookups = [0]
+
+    def process(handle):
+        lookups[0] += 1
+        return processes.get(handle, 'other.exe')
+
+    start = time.perf_counter()
+    matcher = TitleMatcher(parse_rules(text))
+    compile_ms = (time.perf_counter() - start) * 1000
+    rules = matcher.rules
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fast = [w.handle for w in windows if matcher.match(w.title, w.class_name, lambda h=w.handle: process(h))]
+    t_fast = (time.perf_counter() - start) / rounds
+    fast_lookups = lookups[0] // rounds
+
+    lookups[0] = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        slow = [w.handle for w in windows if naive_match(rules, w, process)]
+    t_slow = (time.perf_counter() - start) / rounds
+    slow_lookups = lookups[0] // rounds
+
+    print(f"窗口 {len(windows)} 个，规则 {len(rules)} 条，编译 {compile_ms:.2f} ms")
+    print(f"合并匹配：{t_fast * 1000:.3f} ms/次刷新，进程名查询 {fast_lookups} 次")
+    print(f"逐条匹配：{t_slow * 1000:.3f} ms/次刷新，进程名查询 {slow_lookups} 次")
+    print(f"结果一致：{fast == slow}，命中 {fast}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""窗口打开耗时：运行时解析 .ui（uic.loadUi）vs 预编译模块，以及复用已创建的设置对话框。
+
+使用 Qt 的 offscreen 平台，无需显示器。
+
+用法：python benchmarks/bench_ui_open.py [轮数]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6 import uic  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QDialog, QWidget  # noqa: E402
+
+import paths  # noqa: E402
+import ui_cache  # noqa: E402
+
+
+def measure(label, rounds, build, keep=False):
+    app = QApplication.instance()
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        w = build()
+        w.show()
+        app.processEvents()
+        times.append((time.perf_counter() - start) * 1000)
+        w.hide()
+        if not keep:
+            w.deleteLater()
+    app.processEvents()
+    first = times[0]
+    times.sort()
+    print(f"{label:<24} 首次 {first:7.2f} ms | 中位数 {times[len(times) // 2]:7.2f} ms")
+
+
+def loaded(name, cls):
+    def build():
+        w = cls()
+        uic.loadUi(paths.resource(f'{name}.ui'), w)
+        return w
+    return build
+
+
+def compiled(name, cls):
+    def build():
+        w = cls()
+        ui_cache.setup_ui(name, w)
+        return w
+    return build
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    _ = QApplication(sys.argv)      # 保持引用，直到 main 返回
+    ui_cache.ensure_all()
+
+    for name, cls in (('main', QWidget), ('settings', QDialog)):
+        measure(f'{name}: uic.loadUi', rounds, loaded(name, cls))
+        measure(f'{name}: 预编译', rounds, compiled(name, cls))
+
+    # 复用：只创建一次，之后每次打开只是重新显示
+    dlg = QDialog()
+    ui_cache.setup_ui('settings', dlg)
+    measure('settings: 复用', rounds, lambda: dlg, keep=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""完整包更新的 I/O 字节数与耗时：原流程 vs 流式校验 + 增量解压。
+
+在临时目录中生成一个“已安装”的旧版本与新版本更新包（部分文件变化、新增一个文件），
+由子进程中的本地 HTTP 服务（支持 Range，见 update_mirror.MirrorServer）提供下载：
+
+- 原流程：下载 zip → extractall 到临时目录 → 逐项复制到安装目录（不校验）；
+- 新流程：下载时计算 SHA-256 并与 version.json 比对 → 只把 CRC / 大小不同的条目
+  解压到安装目录内的 staging → 重命名到位。
+
+分别以单连接与 4 段并行下载运行，输出本进程的读写字节数（psutil，Linux 上为系统调用层面的
+rchar / wchar）、耗时与结果校验；另验证 SHA-256 不符时下载被拒绝且不留下临时文件。
+
+用法：python benchmarks/bench_update_apply.py [--files 300] [--size-mb 60] [--changed 0.1]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def serve(root: str, port_file: str) -> None:
+    """子进程：用镜像服务提供 root 中的更新包（源站的 I/O 不计入测量进程）。"""
+    from update_mirror import MirrorCache, MirrorServer
+    server = MirrorServer(MirrorCache(root), port=0, host='127.0.0.1')
+    server.start()
+    Path(port_file).write_text(str(server.port))
+    sys.stdin.read()        # 父进程关闭 stdin 时退出
+
+
+def io_counters():
+    import psutil
+    c = psutil.Process().io_counters()
+    return (getattr(c, 'read_chars', c.read_bytes), getattr(c, 'write_chars', c.write_bytes))
+
+
+def make_tree(root: Path, files: int, size_mb: float, rnd: random.Random):
+    """生成安装目录：大小不一的文件，一半内容可压缩。"""
+    weights = [rnd.paretovariate(1.2) for _ in range(files)]
+    scale = size_mb * 1048576 / sum(weights)
+    for i, w in enumerate(weights):
+        path = root / f'lib{i % 7}' / f'mod{i}.bin' if i else root / 'PowerPoint_TouchAssist.exe'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        n = max(64, int(w * scale))
+        path.write_bytes(os.urandom(n // 2) + bytes(n - n // 2))
+    (root / 'config.ini').write_text('[General]\n', encoding='utf-8')
+
+
+def make_package(old: Path, new: Path, zip_path: Path, changed: float, rnd: random.Random):
+    shutil.copytree(old, new)
+    (new / 'config.ini').unlink()
+    files = sorted(p for p in new.rglob('*') if p.is_file())
+    for p in rnd.sample(files, max(1, int(len(files) * changed))):
+        data = bytearray(p.read_bytes())
+        data[:16] = os.urandom(16)
+        p.write_bytes(bytes(data) + (b'v2' if rnd.random() < 0.5 else b''))
+    (new / 'lib0' / 'added.bin').write_bytes(os.urandom(4096))
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        for p in sorted(new.rglob('*')):
+            if p.is_file():
+                zf.write(p, p.relative_to(new).as_posix())
+
+
+def tree_digest(root: Path) -> dict:
+    return {p.relative_to(root).as_posix(): hashlib.sha256(p.read_bytes()).hexdigest()
+            for p in root.rglob('*') if p.is_file() and p.name != 'config.ini'}
+
+
+def old_flow(url: str, app: Path, work: Path, segments: int) -> dict:
+    """更新窗口原来的流程（下载 → extractall → 复制）。"""
+    from downloader import Downloader
+    tmp = Downloader(segments=segments, segment_threshold=1024 * 1024).download(url, work / 'old.tmp.zip')
+    with zipfile.ZipFile(tmp, 'r') as zf:
+        temp_dir = Path(tempfile.mkdtemp(prefix='update_', dir=work))
+        zf.extractall(temp_dir)
+    ignore = {'logs', 'config.ini'}
+    for item in temp_dir.iterdir():
+        dst = app / item.name
+        if item.is_dir():
+            if dst.exists():
+                shutil.rmtree(dst)
+            shutil.copytree(item, dst, ignore=lambda src, names: [n for n in names if n in ignore])
+        elif item.name not in ignore:
+            shutil.copy2(item, dst)
+    shutil.rmtree(temp_dir)
+    tmp.unlink()
+    return {}
+
+
+def new_flow(url: str, app: Path, work: Path, segments: int, sha256: str) -> dict:
+    """新流程（流式 SHA-256 → 增量解压到 staging → 重命名）。"""
+    from downloader import Downloader
+    from update_manifest import apply_staging, extract_package
+    d = Downloader(segments=segments, segment_threshold=1024 * 1024)
+    tmp = d.download(url, app.with_suffix('.tmp.zip'), sha256=sha256)
+    staging = Path(tempfile.mkdtemp(prefix='update_full_', dir=app))
+    result = extract_package(tmp, app, staging)
+    tmp.unlink()
+    apply_staging(staging, app)
+    shutil.rmtree(staging)
+    return {'extracted': result.extracted, 'skipped': result.skipped, 'hash_read_back': d.hash_read_back}
+
+
+def measure(fn, *args):
+    r0, w0 = io_counters()
+    start = time.perf_counter()
+    extra = fn(*args)
+    elapsed = time.perf_counter() - start
+    r1, w1 = io_counters()
+    return elapsed, r1 - r0, w1 - w0, extra
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=300)
+    parser.add_argument('--size-mb', type=float, default=60)
+    parser.add_argument('--changed', type=float, default=0.1)
+    parser.add_argument('--serve', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(*args.serve)
+        return
+
+    work = Path(tempfile.mkdtemp(prefix='ppt-touch-apply-'))
+    os.environ['APPDATA'] = str(work / 'appdata')
+    rnd = random.Random(5)
+    installed = work / 'installed'
+    make_tree(installed, args.files, args.size_mb, rnd)
+    mirror = work / 'mirror'
+    mirror.mkdir()
+    name = '9.9.9-PowerPoint-Touch-Assist.zip'
+    make_package(installed, work / 'new', mirror / name, args.changed, rnd)
+    package = (mirror / name).read_bytes()
+    sha256 = hashlib.sha256(package).hexdigest()
+    (mirror / 'version.json').write_text(json.dumps({
+        'origin': {'version': '9.9.9', 'url': name}, 'package': name,
+        'package_sha256': sha256, 'package_size': len(package)}), encoding='utf-8')
+    expected = tree_digest(work / 'new')
+
+    port_file = work / 'port'
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', str(mirror), str(port_file)],
+                            stdin=subprocess.PIPE, cwd=ROOT)
+    try:
+        while not port_file.exists() or not port_file.read_text():
+            time.sleep(0.05)
+        url = f'http://127.0.0.1:{port_file.read_text()}/package/{name}'
+        print(f"安装目录 {args.files} 个文件 {args.size_mb:.0f} MB，更新包 {len(package) / 1048576:.1f} MB，"
+              f"变化约 {args.changed:.0%}")
+
+        for segments in (1, 4):
+            for label, fn, extra_args in (('原流程', old_flow, (segments,)),
+                                          ('流式校验 + 增量解压', new_flow, (segments, sha256))):
+                app = work / f'app_{label}_{segments}'
+                shutil.copytree(installed, app)
+                elapsed, read, written, extra = measure(fn, url, app, work, *extra_args)
+                ok = tree_digest(app) == expected and (app / 'config.ini').exists()
+                print(f"{segments} 段 {label:<12} 耗时 {elapsed * 1000:7.0f} ms，读 {read / 1048576:7.1f} MB，"
+                      f"写 {written / 1048576:7.1f} MB，结果{'一致' if ok else '不一致'} {extra or ''}")
+                assert ok, f"{label} 更新结果与新版本不一致"
+                shutil.rmtree(app)
+
+        # SHA-256 不符：拒绝并删除临时文件
+        from downloader import ChecksumError, Downloader
+        dest = work / 'bad.zip'
+        try:
+            Downloader(segments=4, segment_threshold=1024 * 1024).download(url, dest, sha256='0' * 64)
+            raise AssertionError("SHA-256 不符时应抛出 ChecksumError")
+        except ChecksumError:
+            pass
+        leftovers = [p.name for p in work.iterdir() if p.name.startswith('bad.zip')]
+        assert not leftovers, f"校验失败后残留文件：{leftovers}"
+        print("SHA-256 不符时拒绝更新包且不留临时文件：通过")
+    finally:
+        proc.stdin.close()
+        proc.wait(5)
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except AssertionError as e:
+        print(f"校验失败：{e}")
+        sys.exit(1)
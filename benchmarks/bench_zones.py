@@ -0,0 +1,96 @@
+"""屏幕区域命中测试基准：预编译网格索引 vs 逐矩形检查，并校验两者结果一致。
+
+使用合成的多显示器布局（笔记本 + 4K 投影仪，DPI 不同），无需 Windows。
+另检查读取显示器列表失败时的退回：单屏布局 / 沿用当前布局 / 完全无布局时不排除点击。
+
+用法：python benchmarks/bench_zones.py [事件数]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from screen_zones import (ZONE_ACTION, ZONE_EXCLUDED, DisplayProvider, Monitor,  # noqa: E402
+                          StaticDisplayProvider, ZoneMap, ZoneMapManager)
+
+LAYOUT = [Monitor(0, 0, 1920, 1080, 1.25), Monitor(1920, -540, 3840, 2160, 1.5)]
+
+
+def linear_hit_test(zone_map, x, y):
+    """参考实现：按叠加顺序逐个矩形检查。"""
+    kind = zone_map.offscreen
+    for x0, y0, x1, y1, k in zone_map.rects:
+        if x0 <= x < x1 and y0 <= y < y1:
+            kind = k
+    return kind
+
+
+class FailingProvider(DisplayProvider):
+    """枚举显示器失败，可选地仍能读取主显示器分辨率。"""
+
+    def __init__(self, primary=None):
+        self.primary = primary
+
+    def monitors(self):
+        raise OSError("EnumDisplayMonitors 失败")
+
+    def primary_monitor(self):
+        if self.primary is None:
+            raise OSError("GetSystemMetrics 失败")
+        return self.primary
+
+
+def check_fallback() -> None:
+    manager = ZoneMapManager(FailingProvider(Monitor(0, 0, 1920, 1080, 1.0)))
+    assert manager.zone_map.monitors == (Monitor(0, 0, 1920, 1080, 1.0),), manager.zone_map.monitors
+    assert not manager.is_excluded(960, 540) and manager.is_excluded(960, 1070), "单屏布局的排除区域不正确"
+
+    provider = StaticDisplayProvider(LAYOUT)
+    manager = ZoneMapManager(provider)
+    manager.provider = FailingProvider()
+    assert not manager.rebuild() and manager.zone_map.monitors == tuple(LAYOUT), "暂时失败时应沿用当前布局"
+
+    manager = ZoneMapManager(FailingProvider())
+    assert manager.zone_map.hit_test(960, 540) == ZONE_ACTION, "完全无布局时点击不应被排除"
+    assert manager.zone_map.hit_test(960, 540) != ZONE_EXCLUDED
+    print("显示器读取失败时的退回：通过")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    rnd = random.Random(42)
+    points = [(rnd.randrange(-100, 5860), rnd.randrange(-640, 1720)) for _ in range(n)]
+
+    start = time.perf_counter()
+    manager = ZoneMapManager(StaticDisplayProvider(LAYOUT))
+    build = time.perf_counter() - start
+    zone_map: ZoneMap = manager.zone_map
+
+    hit = zone_map.hit_test
+    start = time.perf_counter()
+    fast = [hit(x, y) for x, y in points]
+    t_fast = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = [linear_hit_test(zone_map, x, y) for x, y in points]
+    t_slow = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(fast, slow))
+    print(f"显示器：{len(LAYOUT)}，矩形：{len(zone_map.rects)}，网格：{zone_map.cols}x{zone_map.rows}")
+    print(f"编译耗时：{build * 1000:.1f} ms")
+    print(f"网格索引：{t_fast / n * 1e9:.0f} ns/次")
+    print(f"逐矩形：  {t_slow / n * 1e9:.0f} ns/次")
+    print(f"结果不一致：{mismatches}")
+    assert mismatches == 0, "网格索引与逐矩形检查结果不一致"
+    check_fallback()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except AssertionError as e:
+        print(f"校验失败：{e}")
+        sys.exit(1)
@@ -0,0 +1,222 @@
+"""增量更新的正确性检查（本地 HTTP 服务与临时安装目录，全部在 127.0.0.1 上完成）。
+
+在临时目录中生成“已安装”的旧版本与新版本发布目录（含子目录、带空格和中文的文件名、
+config.ini 与 logs），由本地 HTTP 服务提供单文件下载，依次检查：
+
+1. 安装目录与清单一致：plan_delta 无变化文件，_DeltaThread 不发出任何下载请求；
+2. 部分文件变化（修改、缺失、新增）：只下载这些文件，staging 中只有清单内的文件，
+   apply_staging 后安装目录与新版本逐个哈希一致，config.ini / logs 不受影响；
+3. 变化量超过阈值：_DeltaThread 改用完整包，不下载、不留下 staging 目录；
+4. 服务器返回的文件与清单哈希不符：fetch_delta 抛出异常；_DeltaThread 改用完整包，
+   删除 staging，安装目录不变；
+5. 清单中含 `..`、绝对路径（POSIX / Windows / 盘符相对路径）：parse_manifest 拒绝，
+   _DeltaThread 改用完整包且不访问服务器。
+
+_DeltaThread 在当前线程直接调用 run()，用信号回调收集结果（APP_DIR 指向临时安装目录）。
+校验失败时以非 0 退出码结束。
+
+用法：python benchmarks/delta_update_checks.py
+"""
+
+import functools
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 发布目录中的文件（相对路径 → 大小）
+FILES = {
+    'main.exe': 200_000,
+    'python3.dll': 120_000,
+    'lib/core.pyd': 80_000,
+    'lib/ui.pyd': 60_000,
+    'assets/icon.png': 4_000,
+    'assets/图 标.png': 3_000,
+    'docs/readme.txt': 1_000,
+}
+THRESHOLD = 0.6
+
+
+class Handler(SimpleHTTPRequestHandler):
+    requests = []       # 收到的 GET 路径（已解码，相对发布目录）
+
+    def do_GET(self):
+        Handler.requests.append(unquote(self.path).lstrip('/'))
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_tree(root: Path, files: dict, seed: int) -> None:
+    for i, (rel, size) in enumerate(files.items()):
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(bytes([(seed + i) % 251]) * size)
+
+
+def tree_hashes(root: Path) -> dict:
+    from update_manifest import hash_file
+    return {p.relative_to(root).as_posix(): hash_file(p) for p in sorted(root.rglob('*')) if p.is_file()}
+
+
+def install(release: Path, app: Path) -> None:
+    """把发布目录“安装”到 app，并加上用户数据（config.ini / logs）。"""
+    shutil.rmtree(app, ignore_errors=True)
+    shutil.copytree(release, app)
+    (app / 'config.ini').write_text('[General]\nDPI = 2\n', encoding='utf-8')
+    (app / 'logs').mkdir()
+    (app / 'logs' / 'app.log').write_text('old log\n', encoding='utf-8')
+
+
+def run_delta(files: list, base_url: str, package_bytes: int) -> dict:
+    """在当前线程运行一次 _DeltaThread，返回发出的信号。"""
+    from updater_gui import _DeltaThread
+    thread = _DeltaThread(files, base_url, package_bytes, THRESHOLD)
+    result = {'finished': None, 'fallback': None, 'progress': []}
+    thread.finished.connect(lambda r: result.update(finished=r))
+    thread.fallback.connect(lambda reason: result.update(fallback=reason))
+    thread.progress.connect(result['progress'].append)
+    Handler.requests = []
+    thread.run()
+    result['requests'] = list(Handler.requests)
+    return result
+
+
+def staging_dirs(app: Path) -> list:
+    return sorted(p.name for p in app.glob('update_delta_*'))
+
+
+def main():
+    work = Path(tempfile.mkdtemp(prefix='ppt-touch-delta-'))
+    os.environ['APPDATA'] = str(work / 'appdata')
+
+    import updater_gui
+    from update_manifest import (apply_staging, build_manifest, fetch_delta, hash_file,
+                                 manifest_to_json, parse_manifest, plan_delta)
+
+    old, new, app = work / 'old', work / 'new', work / 'app'
+    write_tree(old, FILES, seed=1)
+    # 新版本：修改两个文件（其一文件名带空格与中文）、新增一个文件，其余不变
+    new_files = dict(FILES, **{'lib/plugins/extra.pyd': 5_000})
+    write_tree(new, new_files, seed=1)
+    (new / 'lib/ui.pyd').write_bytes(b'\x07' * 61_000)
+    (new / 'assets/图 标.png').write_bytes(b'\x09' * 3_000)
+    manifest = manifest_to_json(build_manifest(new))
+    package_bytes = sum(e['size'] for e in manifest)
+    expected = tree_hashes(new)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(Handler, directory=str(new)))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/'
+    updater_gui.APP_DIR = app
+
+    # 1. 安装目录与清单一致
+    install(new, app)
+    plan = plan_delta(parse_manifest(manifest), app, package_bytes)
+    assert not plan.changed and plan.unchanged == len(manifest), f"未变化的安装目录得到变化文件：{plan.changed}"
+    result = run_delta(manifest, base_url, package_bytes)
+    assert result['fallback'] is None, f"未变化时不应改用完整包：{result['fallback']}"
+    plan, staging = result['finished']
+    assert not plan.changed and not result['requests'], f"未变化时发出了下载请求：{result['requests']}"
+    assert not any(staging.rglob('*')), "未变化时 staging 不为空"
+    assert apply_staging(staging, app) == 0
+    shutil.rmtree(staging)
+    print(f"1. 无变化：{plan.unchanged} 个文件全部未变，下载请求 0 个")
+
+    # 2. 部分文件变化：旧版本上再删除一个文件（按缺失处理）
+    install(old, app)
+    (app / 'docs/readme.txt').unlink()
+    want = {'lib/ui.pyd', 'assets/图 标.png', 'lib/plugins/extra.pyd', 'docs/readme.txt'}
+    plan = plan_delta(parse_manifest(manifest), app, package_bytes)
+    assert {e.path for e in plan.changed} == want, f"变化文件不符：{[e.path for e in plan.changed]}"
+    assert plan.changed_bytes == sum(e['size'] for e in manifest if e['path'] in want), "变化字节数不符"
+    result = run_delta(manifest, base_url, package_bytes)
+    assert result['fallback'] is None, f"部分变化时不应改用完整包：{result['fallback']}"
+    plan, staging = result['finished']
+    assert sorted(result['requests']) == sorted(want), f"下载了不该下载的文件：{result['requests']}"
+    staged = {p.relative_to(staging).as_posix() for p in staging.rglob('*') if p.is_file()}
+    assert staged == want, f"staging 中的文件不符（残留临时文件？）：{sorted(staged)}"
+    assert result['progress'] and result['progress'][-1] == 100, f"进度未到 100：{result['progress']}"
+    assert apply_staging(staging, app) == len(want)
+    shutil.rmtree(staging)
+    actual = tree_hashes(app)
+    for rel in ('config.ini', 'logs/app.log'):
+        actual.pop(rel)
+    assert actual == expected, "应用增量更新后安装目录与新版本不一致"
+    assert (app / 'config.ini').read_text(encoding='utf-8') == '[General]\nDPI = 2\n', "config.ini 被改动"
+    assert staging_dirs(app) == []
+    print(f"2. 部分变化：下载 {len(want)} 个文件 {plan.changed_bytes} / {plan.package_bytes} 字节，"
+          f"应用后与新版本一致")
+
+    # 3. 变化量超过阈值：安装目录几乎全部不同
+    install(old, app)
+    for rel in ('main.exe', 'python3.dll'):
+        (app / rel).write_bytes(b'\x00' * FILES[rel])
+    plan = plan_delta(parse_manifest(manifest), app, package_bytes)
+    assert plan.ratio > THRESHOLD, f"构造的变化量 {plan.ratio:.0%} 未超过阈值"
+    result = run_delta(manifest, base_url, package_bytes)
+    assert result['finished'] is None and result['fallback'], "超过阈值时未改用完整包"
+    assert not result['requests'], f"超过阈值时仍发出了下载请求：{result['requests']}"
+    assert staging_dirs(app) == [], f"留下了 staging 目录：{staging_dirs(app)}"
+    print(f"3. 超过阈值：变化量 {plan.ratio:.0%} → 改用完整包（{result['fallback']}）")
+
+    # 4. 服务器上的文件与清单哈希不符（大小相同）
+    install(old, app)
+    before = tree_hashes(app)
+    tampered = new / 'lib/ui.pyd'
+    good = tampered.read_bytes()
+    tampered.write_bytes(b'\x66' * len(good))
+    try:
+        plan = plan_delta(parse_manifest(manifest), app, package_bytes)
+        staging = Path(tempfile.mkdtemp(prefix='update_delta_', dir=work))
+        try:
+            fetch_delta(plan, base_url, staging, updater_gui.Downloader(segments=1).download)
+        except ValueError as e:
+            assert 'lib/ui.pyd' in str(e), f"错误信息未指出文件：{e}"
+        else:
+            raise AssertionError("哈希不符的文件未被拒绝")
+        shutil.rmtree(staging)
+        result = run_delta(manifest, base_url, package_bytes)
+        assert result['finished'] is None and result['fallback'], "哈希不符时未改用完整包"
+        assert staging_dirs(app) == [], f"哈希不符后留下了 staging 目录：{staging_dirs(app)}"
+        assert tree_hashes(app) == before, "哈希不符时安装目录被改动"
+    finally:
+        tampered.write_bytes(good)
+    print(f"4. 哈希不符：拒绝并改用完整包（{result['fallback']}），安装目录未改动")
+
+    # 5. 清单中越出安装目录的路径
+    bad_paths = ['../evil.exe', 'lib/../../evil.exe', '/tmp/evil.exe', '\\evil.exe', 'C:evil.exe',
+                 'C:/Windows/evil.exe', '..\\evil.exe', '\\\\server\\share\\evil.exe']
+    for bad in bad_paths:
+        entry = {'path': bad, 'size': 1, 'sha256': hash_file(new / 'docs/readme.txt')}
+        try:
+            parse_manifest([entry])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"清单路径未被拒绝：{bad}")
+        result = run_delta(manifest + [entry], base_url, package_bytes)
+        assert result['finished'] is None and result['fallback'], f"清单含 {bad} 时未改用完整包"
+        assert not result['requests'], f"清单含 {bad} 时仍访问了服务器"
+    assert not (work / 'evil.exe').exists() and staging_dirs(app) == []
+    print(f"5. 越界路径：{len(bad_paths)} 种写法全部拒绝，改用完整包")
+
+    server.shutdown()
+    shutil.rmtree(work, ignore_errors=True)
+    print("全部校验通过")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except AssertionError as e:
+        print(f"校验失败：{e}")
+        sys.exit(1)
@@ -0,0 +1,339 @@
+"""更新包下载的断线续传与旧文件校验（本地 HTTP 服务，全部在 127.0.0.1 上完成）。
+
+服务端可按请求在发送若干字节后断开连接、关闭 Range 支持、去掉 ETag / Last-Modified，
+或在 HEAD 之后把文件换成新版本。检查：
+
+1. 单连接下载中途断线：带 Range + If-Range 续传，只补传剩余部分；
+2. 服务器不支持 Range：续传请求得到 200，从头重新下载，结果正确；
+3. 上次中断留下的 .part：URL / 大小 / ETag 一致时跨会话续传；
+4. 上次留下的是旧版本（ETag 不同，大小相同或不同）、旧格式 .part.json、缺少 .part.json、
+   服务器没有验证器：丢弃已有部分，不发 Range 请求；
+5. HEAD 之后文件被替换：If-Range 不匹配得到完整新内容（单连接），或分段下载整体重来；
+6. 分段下载中断后跨会话续传，只补传缺少的字节，SHA-256 校验通过；
+7. 镜像服务返回 ETag / Last-Modified，If-Range 不匹配时返回完整内容；
+8. 镜像下载中断后改用源站（给出 sha256）：从镜像已下载的部分续传；续传的部分有误时
+   从头重新下载一次；不给 sha256 时换地址不续传。
+
+校验失败时以非 0 退出码结束。
+
+用法：python benchmarks/download_resume.py
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MB = 1024 * 1024
+
+
+class Origin:
+    """可控的源站状态（由测试线程修改，处理线程读取）。"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.publish(os.urandom(3 * MB), 'v1')
+        self.ranges = True
+        self.validators = True
+        self.cuts = []              # 依次用于之后的 GET：发送多少字节后断开（None 为完整发送）
+        self.on_head = None         # HEAD 响应之后调用一次（模拟此后发布了新版本）
+        self.log = []               # (Range, If-Range, 状态码, 发送字节)
+
+    def publish(self, content: bytes, tag: str) -> None:
+        self.content = content
+        self.etag = f'"{tag}-{len(content)}"'
+        self.last_modified = formatdate(1700000000 + len(tag), usegmt=True)
+
+    def gets(self):
+        return [entry for entry in self.log if entry[0] != 'HEAD']
+
+
+origin = Origin()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def _serve(self, head: bool):
+        from update_mirror import parse_range
+        o = origin
+        with o.lock:
+            data, etag, last_modified = o.content, o.etag, o.last_modified
+            cut = None if head or not o.cuts else o.cuts.pop(0)
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        start, end, status = 0, len(data) - 1, 200
+        if range_header and o.ranges and (not if_range or if_range in (etag, last_modified)):
+            (start, end), status = parse_range(range_header, len(data)), 206
+        body = data[start:end + 1]
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        if o.ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        if o.validators:
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        self.end_headers()
+        if head:
+            o.log.append(('HEAD', None, status, 0))
+            hook, o.on_head = o.on_head, None
+            if hook is not None:
+                hook()
+            return
+        # 先记录再发送：客户端读完响应时记录已经可见
+        if cut is not None and cut < len(body):
+            o.log.append((range_header, if_range, status, cut))
+            self.wfile.write(body[:cut])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        o.log.append((range_header, if_range, status, len(body)))
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            pass        # 客户端发现文件已变化后不再读取响应体
+
+    def log_message(self, format, *args):
+        pass
+
+
+def sent(entries) -> int:
+    return sum(e[3] for e in entries)
+
+
+def range_start(entry) -> int:
+    """续传请求 "bytes=a-" 中的 a。"""
+    return int(entry[0].partition('=')[2].partition('-')[0])
+
+
+def reset(work: Path, name: str, content: bytes = None, tag: str = 'v1'):
+    origin.publish(content if content is not None else os.urandom(3 * MB), tag)
+    origin.ranges = origin.validators = True
+    origin.cuts, origin.on_head, origin.log = [], None, []
+    dest = work / name
+    for p in (dest, dest.with_name(dest.name + '.part'), dest.with_name(dest.name + '.part.json')):
+        p.unlink(missing_ok=True)
+    return dest
+
+
+def main():
+    from downloader import Downloader, NETWORK_ERRORS
+    work = Path(tempfile.mkdtemp(prefix='ppt-touch-resume-'))
+    os.environ['APPDATA'] = str(work / 'appdata')
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/PowerPoint-Touch-Assist.zip'
+
+    def single(**kw):
+        return Downloader(segments=1, retries=kw.pop('retries', 3), timeout=5, **kw)
+
+    def interrupted(dest, downloader, cuts):
+        """下载一次并在 cuts 处断线、不再重试，留下 .part / .part.json。"""
+        origin.cuts = list(cuts)
+        try:
+            downloader.download(url, dest)
+        except NETWORK_ERRORS:
+            pass
+        else:
+            raise AssertionError("预期下载中断")
+        assert dest.with_name(dest.name + '.part').exists(), "中断后应保留 .part"
+
+    # 1. 会话内断线续传
+    dest = reset(work, 'a.zip')
+    origin.cuts = [MB]
+    single().download(url, dest)
+    gets = origin.gets()
+    assert dest.read_bytes() == origin.content, "续传结果不正确"
+    assert len(gets) == 2 and gets[1][1] == origin.etag and gets[1][2] == 206, gets
+    offset = range_start(gets[1])
+    assert 0 < offset <= MB and offset + gets[1][3] == len(origin.content), f"续传应只补传剩余部分：{gets}"
+    print("1. 中途断线：带 Range + If-Range 续传，只补传剩余部分")
+
+    # 2. 服务器不支持 Range
+    dest = reset(work, 'b.zip')
+    origin.ranges = False
+    origin.cuts = [MB]
+    single().download(url, dest)
+    gets = origin.gets()
+    assert dest.read_bytes() == origin.content, "不支持 Range 时重新下载的结果不正确"
+    assert gets[-1][2] == 200 and gets[-1][3] == len(origin.content), gets
+    print("2. 不支持 Range：续传请求得到 200，从头重新下载，结果正确")
+
+    # 3. 跨会话续传（标识一致）
+    dest = reset(work, 'c.zip')
+    interrupted(dest, single(retries=0), [MB])
+    state = json.loads(dest.with_name('c.zip.part.json').read_text(encoding='utf-8'))
+    assert state['url'] == url and state['total'] == len(origin.content) and state['etag'] == origin.etag, state
+    origin.log = []
+    single().download(url, dest)
+    gets = origin.gets()
+    assert dest.read_bytes() == origin.content
+    assert len(gets) == 1 and gets[0][2] == 206, gets
+    assert range_start(gets[0]) + gets[0][3] == len(origin.content), f"应只补传剩余部分：{gets}"
+    print("3. 上次中断的下载：标识一致，跨会话续传剩余部分")
+
+    # 4. 不能确认属于同一文件的已有部分：全部丢弃，不发 Range
+    old = os.urandom(3 * MB)
+    cases = {
+        '旧版本（大小相同，ETag 不同）': (old, 'v1', os.urandom(3 * MB), 'v2', None),
+        '旧版本（大小不同）': (old, 'v1', os.urandom(4 * MB), 'v2', None),
+        '旧格式 .part.json': (old, 'v1', old, 'v1', {'total': len(old), 'segments': [[0, len(old) - 1, MB]]}),
+        '缺少 .part.json': (old, 'v1', old, 'v1', 'missing'),
+    }
+    for label, (first, tag1, second, tag2, state_override) in cases.items():
+        dest = reset(work, 'd.zip', first, tag1)
+        interrupted(dest, single(retries=0), [MB])
+        state_path = dest.with_name('d.zip.part.json')
+        if state_override == 'missing':
+            state_path.unlink()
+        elif state_override is not None:
+            state_path.write_text(json.dumps(state_override), encoding='utf-8')
+        origin.publish(second, tag2)
+        origin.log = []
+        single().download(url, dest)
+        gets = origin.gets()
+        assert dest.read_bytes() == second, f"{label}：结果混入了旧内容"
+        assert all(g[0] is None for g in gets), f"{label}：不应从旧内容续传 {gets}"
+    dest = reset(work, 'e.zip')
+    interrupted(dest, single(retries=0), [MB])
+    origin.validators = False
+    origin.log = []
+    single().download(url, dest)
+    assert dest.read_bytes() == origin.content and all(g[0] is None for g in origin.gets())
+    print(f"4. 无法确认的已有部分（{'、'.join(cases)}、服务器无验证器）：丢弃后完整下载")
+
+    # 5. HEAD 之后发布了新版本
+    dest = reset(work, 'f.zip')
+    interrupted(dest, single(retries=0), [MB])
+    newer = os.urandom(3 * MB)
+    origin.on_head = lambda: origin.publish(newer, 'v3')
+    origin.log = []
+    single().download(url, dest)
+    gets = origin.gets()
+    assert dest.read_bytes() == newer, "If-Range 不匹配时结果不正确"
+    assert gets[0][1] is not None and gets[0][2] == 200, gets
+    assert not dest.with_name('f.zip.part.json').exists()
+
+    def segmented(**kw):
+        return Downloader(segments=4, segment_threshold=MB, retries=kw.pop('retries', 3), timeout=5, **kw)
+
+    big = os.urandom(12 * MB)
+    dest = reset(work, 'g.zip', big, 'v1')
+    interrupted(dest, segmented(retries=0), [MB // 2] * 4)
+    newer = os.urandom(12 * MB)
+    origin.on_head = lambda: origin.publish(newer, 'v4')
+    origin.log = []
+    d = segmented()
+    d.download(url, dest, sha256=hashlib.sha256(newer).hexdigest())
+    assert dest.read_bytes() == newer, "分段续传期间文件变化后结果不正确"
+    print("5. HEAD 之后文件被替换：单连接得到完整新内容，分段下载整体重来，SHA-256 校验通过")
+
+    # 6. 分段下载跨会话续传
+    dest = reset(work, 'h.zip', big, 'v1')
+    interrupted(dest, segmented(retries=0), [MB // 2] * 4)
+    state = json.loads(dest.with_name('h.zip.part.json').read_text(encoding='utf-8'))
+    assert state['etag'] == origin.etag and len(state['segments']) == 4, state
+    kept = sum(s[2] for s in state['segments'])
+    origin.log = []
+    d = segmented()
+    d.download(url, dest, sha256=hashlib.sha256(big).hexdigest())
+    gets = origin.gets()
+    assert dest.read_bytes() == big and d.sha256 == hashlib.sha256(big).hexdigest()
+    assert all(g[1] == origin.etag and g[2] == 206 for g in gets), gets
+    assert sent(gets) == len(big) - kept, f"应只补传缺少的 {len(big) - kept} 字节（实际 {sent(gets)}）"
+    print(f"6. 分段下载跨会话续传：保留 {kept} 字节，补传 {sent(gets)} 字节，SHA-256 一致")
+
+    # 7. 镜像服务的验证器与 If-Range
+    import requests
+    from update_mirror import MirrorCache, MirrorServer
+    mirror_dir = work / 'mirror'
+    mirror_dir.mkdir()
+    (mirror_dir / 'pkg.zip').write_bytes(big)
+    (mirror_dir / 'version.json').write_text(json.dumps({'origin': {'version': '9.9.9'}, 'package': 'pkg.zip',
+                                                         'package_sha256': hashlib.sha256(big).hexdigest(),
+                                                         'package_size': len(big)}), encoding='utf-8')
+    mirror = MirrorServer(MirrorCache(str(mirror_dir)), port=0, host='127.0.0.1')
+    assert mirror.start()
+    pkg_url = f'http://127.0.0.1:{mirror.port}/package/pkg.zip'
+    head = requests.head(pkg_url, timeout=5)
+    etag = head.headers.get('ETag')
+    assert etag and head.headers.get('Last-Modified'), dict(head.headers)
+    r = requests.get(pkg_url, headers={'Range': 'bytes=10-19', 'If-Range': etag}, timeout=5)
+    assert r.status_code == 206 and r.content == big[10:20]
+    r = requests.get(pkg_url, headers={'Range': 'bytes=10-19', 'If-Range': '"old"'}, timeout=5)
+    assert r.status_code == 200 and r.content == big, "If-Range 不匹配时应返回完整内容"
+    mirror.stop()
+    print("7. 镜像服务：返回 ETag / Last-Modified，If-Range 不匹配时返回完整内容")
+
+    # 8. 镜像中断后改用源站（两个地址提供同一个包）
+    mirror_url = url.rsplit('/', 1)[0] + '/package/9.9.9-PowerPoint-Touch-Assist.zip'
+
+    def from_mirror(dest, sha256):
+        origin.cuts = [MB]
+        try:
+            single(retries=0).download(mirror_url, dest, sha256=sha256)
+        except NETWORK_ERRORS:
+            pass
+        else:
+            raise AssertionError("预期镜像下载中断")
+
+    dest = reset(work, 'm.zip')
+    digest = hashlib.sha256(origin.content).hexdigest()
+    from_mirror(dest, digest)
+    origin.log = []
+    d = single()
+    d.download(url, dest, sha256=digest)
+    gets = origin.gets()
+    assert dest.read_bytes() == origin.content and d.sha256 == digest
+    assert len(gets) == 1 and gets[0][2] == 206 and range_start(gets[0]) > 0, f"应从镜像已下载的部分续传：{gets}"
+    resumed = range_start(gets[0])
+
+    dest = reset(work, 'n.zip')
+    digest = hashlib.sha256(origin.content).hexdigest()
+    from_mirror(dest, digest)
+    part = dest.with_name('n.zip.part')
+    with open(part, 'r+b') as f:
+        f.write(bytes(b ^ 0xFF for b in f.read(16)))     # 镜像给出的部分有误
+    origin.log = []
+    single().download(url, dest, sha256=digest)
+    gets = origin.gets()
+    assert dest.read_bytes() == origin.content, "续传的部分有误时结果不正确"
+    assert [g[2] for g in gets] == [206, 200] and gets[1][0] is None, f"校验失败后应从头重新下载一次：{gets}"
+
+    dest = reset(work, 'o.zip')
+    from_mirror(dest, None)
+    origin.log = []
+    single().download(url, dest)
+    assert dest.read_bytes() == origin.content and all(g[0] is None for g in origin.gets()), \
+        "没有 sha256 时换地址不应续传"
+    print(f"8. 镜像中断后改用源站：从第 {resumed} 字节续传；续传部分有误时从头重新下载；"
+          f"没有 sha256 时不跨地址续传")
+
+    server.shutdown()
+    print("全部校验通过")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except AssertionError as e:
+        print(f"校验失败：{e}")
+        sys.exit(1)
@@ -0,0 +1,58 @@
+"""用模拟后端无界面地运行完整的 func.main（钩子 → 队列 → 识别 → 放映判断 → 按键）。
+
+不需要 Windows：显示器、放映窗口与鼠标事件都是虚拟的，按键只记录在内存中。
+配置写入临时目录，不影响本机的用户配置。
+
+用法：python benchmarks/headless_pipeline.py [手势数] [--speed 0]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('gestures', nargs='?', type=int, default=20000)
+    parser.add_argument('--rate', type=float, default=20.0, help='合成手势频率（个/秒）')
+    parser.add_argument('--speed', type=float, default=0.0, help='回放倍速，0 为尽快回放')
+    args = parser.parse_args()
+
+    os.environ['APPDATA'] = tempfile.mkdtemp(prefix='ppt-touch-bench-')
+    os.environ['PPT_TOUCH_BACKEND'] = 'simulated'
+
+    import conf_file  # noqa: E402
+    from input_trace import synthetic_events  # noqa: E402
+    from os_backend import SimulatedBackend, set_backend  # noqa: E402
+    from window_tracker import WindowInfo  # noqa: E402
+
+    script = list(synthetic_events(args.gestures, args.rate, 1920, 1080, seed=0))
+    # 尽快回放时事件远快于真实输入，队列容量放大到能容纳全部事件
+    conf_file.store.set('Performance', 'Event_Queue_Size', str(max(256, len(script))))
+    conf_file.store.set('Gesture', 'Swipe_Enabled', '1')
+    conf_file.store.set('Performance', 'Stats_Log_Interval', '0')
+
+    backend = SimulatedBackend(
+        windows=[WindowInfo(1, 'PowerPoint 幻灯片放映 - 演示文稿1', 0, 0, 1920, 1080)],
+        script=script, speed=args.speed)
+    set_backend(backend)
+
+    import func  # noqa: E402
+
+    start = time.perf_counter()
+    func.main()
+    elapsed = time.perf_counter() - start
+
+    print(f"事件数      : {len(script)}（入队 {func.event_queue.pushed}，丢弃 {func.event_queue.dropped}）")
+    print(f"翻页次数    : {func.pipeline.injected}  {backend.injector.counts()}")
+    if func.scheduler is not None:
+        print(f"翻页调度    : {func.scheduler.stats()}")
+    print(f"耗时        : {elapsed:.3f} s，{len(script) / elapsed:.0f} 事件/秒")
+
+
+if __name__ == '__main__':
+    main()
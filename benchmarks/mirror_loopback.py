@@ -0,0 +1,232 @@
+"""局域网更新镜像的回环测试：源站流量、Range 服务与回退。
+
+全部在 127.0.0.1 上完成：
+
+1. 启动一个“源站”（http.server，统计发出的字节数），放置随机内容的更新包与 version.json；
+2. 镜像从源站同步并校验更新包，启动 HTTP 服务与 UDP 发现应答；
+3. 若干“客户端”通过发现找到镜像：版本信息（sha256、增量清单）取自源站，更新包从镜像下载
+   （大包分段并行），按源站的 SHA-256 校验；
+4. 校验 Range / HEAD / 416 / 304 等响应，镜像不转发增量清单；
+5. 冒充的镜像（篡改的包、自己的 sha256 与增量清单，或指向别处的下载地址）：客户端仍使用
+   源站的 sha256 与清单，篡改的包校验失败后回退源站；
+6. 停止镜像，客户端检查与下载都回退到源站；默认配置下不使用镜像。
+
+输出有无镜像时源站发出的字节数。校验失败时以非 0 退出码结束。
+
+用法：python benchmarks/mirror_loopback.py [客户端数] [包大小 MB]
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class OriginHandler(SimpleHTTPRequestHandler):
+    bytes_sent = 0
+    requests = 0
+
+    def copyfile(self, source, outputfile):
+        data = source.read()
+        outputfile.write(data)
+        OriginHandler.bytes_sent += len(data)
+
+    def send_head(self):
+        OriginHandler.requests += 1
+        return super().send_head()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_package(path: Path, size_mb: float) -> None:
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as zf:
+        zf.writestr('PowerPoint_TouchAssist.exe', os.urandom(int(size_mb * 1024 * 1024)))
+        zf.writestr('README.txt', '新版本')
+
+
+def request(url, method='GET', headers=None):
+    import requests
+    r = requests.request(method, url, headers=headers or {}, timeout=5)
+    return r.status_code, r.headers, r.content
+
+
+def download(urls, dest: Path, sha256: str):
+    """与更新窗口的下载线程相同：依次尝试各地址，按 sha256 校验。"""
+    from downloader import Downloader
+    d = Downloader(segments=4, segment_threshold=1024 * 1024, retries=1)
+    for i, url in enumerate(urls):
+        try:
+            return d.download(url, dest, sha256=sha256), url
+        except Exception:
+            if i == len(urls) - 1:
+                raise
+
+
+def main():
+    peers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    size_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 8
+    tmp = Path(tempfile.mkdtemp(prefix='ppt-touch-mirror-'))
+    os.environ['APPDATA'] = str(tmp / 'appdata')
+
+    from update_mirror import (DiscoveryResponder, FallbackChecker, MirrorCache, MirrorServer, create_checker,
+                               download_urls)
+
+    # ---------- 源站 ----------
+    origin_dir = tmp / 'origin'
+    origin_dir.mkdir()
+    make_package(origin_dir / 'PowerPoint-Touch-Assist.zip', size_mb)
+    package = (origin_dir / 'PowerPoint-Touch-Assist.zip').read_bytes()
+    digest = hashlib.sha256(package).hexdigest()
+    origin = ThreadingHTTPServer(('127.0.0.1', 0), partial(OriginHandler, directory=str(origin_dir)))
+    threading.Thread(target=origin.serve_forever, daemon=True).start()
+    origin_base = f'http://127.0.0.1:{origin.server_address[1]}'
+    files = [{'path': 'PowerPoint_TouchAssist.exe', 'size': 1, 'sha256': '0' * 64}]
+    (origin_dir / 'version.json').write_text(json.dumps({
+        'version': '9.9.9', 'url': f'{origin_base}/PowerPoint-Touch-Assist.zip',
+        'sha256': digest, 'changelog': '回环测试',
+        'files': files, 'files_base_url': f'{origin_base}/files/'}), encoding='utf-8')
+    version_size = (origin_dir / 'version.json').stat().st_size
+    version_url = f'{origin_base}/version.json'
+
+    # ---------- 镜像 ----------
+    from release_info import ReleaseChecker
+    cache = MirrorCache(str(tmp / 'mirror'))
+    start = time.perf_counter()
+    info, _ = ReleaseChecker(version_url, cache_path=str(tmp / 'mirror_release.json')).check()
+    assert cache.sync(info), "首次同步应下载更新包"
+    assert not cache.sync(info), "版本未变化时不应重复下载"
+    sync_ms = (time.perf_counter() - start) * 1000
+    empty = MirrorServer(MirrorCache(str(tmp / 'empty')), port=0, host='127.0.0.1')
+    assert empty.start()
+    assert request(f'http://127.0.0.1:{empty.port}/version.json')[0] == 503, "未同步的镜像应返回 503"
+    empty.stop()
+    server = MirrorServer(cache, port=0, host='127.0.0.1')
+    assert server.start()
+    responder = DiscoveryResponder(server.port, port=0, host='127.0.0.1')
+    assert responder.start()
+    mirror_base = f'http://127.0.0.1:{server.port}'
+    origin_after_sync = OriginHandler.bytes_sent
+    print(f"镜像同步 {len(package) / 1048576:.1f} MB 用时 {sync_ms:.0f} ms，源站发出 {origin_after_sync} 字节")
+
+    # ---------- Range / 条件请求 ----------
+    status, headers, body = request(f'{mirror_base}/version.json')
+    assert status == 200, status
+    published = json.loads(body)
+    assert published['url'].startswith(mirror_base) and published['origin_url'] == info['url']
+    assert published['sha256'] == digest
+    assert 'files' not in published and 'files_base_url' not in published, "镜像不应转发增量清单"
+    status, _, _ = request(f'{mirror_base}/version.json', headers={'If-None-Match': headers['ETag']})
+    assert status == 304, status
+    pkg_url = published['url']
+    status, headers, body = request(pkg_url, 'HEAD')
+    assert status == 200 and int(headers['Content-Length']) == len(package) and not body
+    assert headers['Accept-Ranges'] == 'bytes'
+    for rng, expect in (('bytes=0-99', package[:100]), ('bytes=100-', package[100:]),
+                        ('bytes=-10', package[-10:]), (f'bytes=5-{len(package) + 50}', package[5:])):
+        status, headers, body = request(pkg_url, headers={'Range': rng})
+        assert status == 206 and body == expect, f"{rng}：{status}，{len(body)} 字节"
+    status, headers, _ = request(pkg_url, headers={'Range': f'bytes={len(package)}-'})
+    assert status == 416 and headers['Content-Range'] == f'bytes */{len(package)}', status
+    status, _, body = request(pkg_url, headers={'Range': 'bytes=0-1,5-6'})
+    assert status == 200 and body == package, "多段 Range 应按整个文件返回"
+    assert request(f'{mirror_base}/package/other.zip')[0] == 404
+    assert request(f'{mirror_base}/package/..%2Fversion.json')[0] == 404
+    print("Range / HEAD / 304 / 416 校验通过")
+
+    # ---------- 客户端经发现使用镜像 ----------
+    served_before = server.bytes_served
+    start = time.perf_counter()
+    for i in range(peers):
+        checker = FallbackChecker(version_url, discovery=True, port=responder.port, discovery_address='127.0.0.1',
+                                  cache_path=str(tmp / f'peer{i}_origin.json'),
+                                  mirror_cache_path=str(tmp / f'peer{i}_mirror.json'))
+        peer_info, _ = checker.check()
+        assert checker.source.startswith(mirror_base), checker.source
+        assert peer_info['sha256'] == digest and peer_info['files'] == files, "版本信息应取自源站"
+        dest, used = download(download_urls(peer_info), tmp / f'peer{i}.zip', peer_info['sha256'])
+        assert used.startswith(mirror_base), used
+        assert hashlib.sha256(dest.read_bytes()).hexdigest() == digest
+        dest.unlink()
+        peer_info_first = peer_info
+    peer_s = time.perf_counter() - start
+    origin_peers = OriginHandler.bytes_sent - origin_after_sync
+    print(f"{peers} 台客户端经镜像更新用时 {peer_s:.2f} s：镜像发出 {server.bytes_served - served_before} 字节，"
+          f"源站发出 {origin_peers} 字节（无镜像时约 {peers * len(package)} 字节），发现应答 {responder.replies} 次")
+    assert origin_peers == peers * version_size, f"客户端只应从源站获取 version.json（源站发出 {origin_peers} 字节）"
+
+    # ---------- 冒充的镜像 ----------
+    rogue_dir = tmp / 'rogue'
+    (rogue_dir / 'package').mkdir(parents=True)
+    rogue_zip = rogue_dir / 'package' / '9.9.9-PowerPoint-Touch-Assist.zip'
+    make_package(rogue_zip, 0.1)
+    rogue = ThreadingHTTPServer(('127.0.0.1', 0), partial(OriginHandler, directory=str(rogue_dir)))
+    threading.Thread(target=rogue.serve_forever, daemon=True).start()
+    rogue_base = f'http://127.0.0.1:{rogue.server_address[1]}'
+    rogue_info = {'version': '9.9.9', 'url': f'{rogue_base}/package/{rogue_zip.name}', 'origin_url': info['url'],
+                  'sha256': hashlib.sha256(rogue_zip.read_bytes()).hexdigest(), 'mirror': True,
+                  'files': [{'path': 'PowerPoint_TouchAssist.exe', 'size': 1, 'sha256': '1' * 64}],
+                  'files_base_url': f'{rogue_base}/files/'}
+    (rogue_dir / 'version.json').write_text(json.dumps(rogue_info), encoding='utf-8')
+    checker = FallbackChecker(version_url, mirror_url=rogue_base, cache_path=str(tmp / 'rogue_origin.json'),
+                              mirror_cache_path=str(tmp / 'rogue_mirror.json'))
+    peer_info, _ = checker.check()
+    assert peer_info['url'] == rogue_info['url'], "地址与版本一致的镜像应作为下载地址"
+    assert peer_info['sha256'] == digest and peer_info['files'] == files, "不应使用镜像提供的 sha256 / 增量清单"
+    assert peer_info['files_base_url'] == f'{origin_base}/files/'
+    dest, used = download(download_urls(peer_info), tmp / 'rogue.zip', peer_info['sha256'])
+    assert used == info['url'] and hashlib.sha256(dest.read_bytes()).hexdigest() == digest, \
+        "篡改的包应校验失败并回退源站"
+    dest.unlink()
+    for i, bad in enumerate(({'url': f'{origin_base}/PowerPoint-Touch-Assist.zip'}, {'version': '9.9.10'},
+                             {'origin_url': f'{rogue_base}/other.zip'})):
+        (rogue_dir / 'version.json').write_text(json.dumps(dict(rogue_info, **bad)), encoding='utf-8')
+        checker = FallbackChecker(version_url, mirror_url=rogue_base, cache_path=str(tmp / 'rogue_origin.json'),
+                                  mirror_cache_path=str(tmp / f'rogue_mirror{i}.json'))
+        peer_info, _ = checker.check()
+        assert peer_info['url'] == info['url'] and checker.source == version_url, f"不应使用镜像：{bad}"
+    rogue.shutdown()
+    print("冒充的镜像：sha256 / 增量清单仍取自源站，篡改的包被拒绝并回退源站")
+
+    # ---------- 镜像停止后回退源站 ----------
+    server.stop()
+    responder.stop()
+    checker = FallbackChecker(version_url, mirror_url=mirror_base, discovery=False, mirror_timeout=1.0,
+                              cache_path=str(tmp / 'late_origin.json'),
+                              mirror_cache_path=str(tmp / 'late_mirror.json'))
+    start = time.perf_counter()
+    late_info, _ = checker.check()
+    assert checker.source == version_url and late_info['url'] == info['url'], checker.source
+    check_ms = (time.perf_counter() - start) * 1000
+    # 镜像地址来自之前检查得到的版本信息，下载时回退 origin_url
+    dest, used = download(download_urls(peer_info_first), tmp / 'late.zip', digest)
+    assert used == info['url'] and hashlib.sha256(dest.read_bytes()).hexdigest() == digest
+    print(f"镜像停止后：版本检查回退源站用时 {check_ms:.0f} ms，下载回退源站成功")
+
+    # 未发现镜像时直接使用源站
+    checker = FallbackChecker(version_url, discovery=True, port=responder.port, discovery_address='127.0.0.1',
+                              cache_path=str(tmp / 'none_origin.json'),
+                              mirror_cache_path=str(tmp / 'none_mirror.json'))
+    checker.check()
+    assert checker.source == version_url
+    # 默认配置（不广播发现、未配置镜像地址）直接使用源站
+    assert type(create_checker(version_url)).__name__ == 'ReleaseChecker', "默认配置不应使用镜像"
+    origin.shutdown()
+    print("全部校验通过")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except AssertionError as e:
+        print(f"校验失败：{e}")
+        sys.exit(1)
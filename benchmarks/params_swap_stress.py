@@ -0,0 +1,207 @@
+"""回放事件流的同时并发替换监听参数快照，检查快照的一致性。
+
+用模拟后端无界面地运行 func.main（Use_System_DPI 关闭，DPI 配置决定显示器缩放），
+并同时运行三类线程：
+
+- 回放：把合成事件流（input_trace.synthetic_events）经模拟钩子不断送入；
+- 改配置：在两套配置 A / B 之间来回切换（整文件原子替换后 ConfigStore.reload，
+  与监听子进程收到重新加载消息时相同），每次切换都通过变化回调生成新快照；
+- 检查：不停读取识别器正在使用的 `recognizer.params`，要求每个快照的缩放、点击半径、
+  滑动距离、排除区域、显示器缩放与窗口匹配器全部来自同一套配置，且版本号不回退；
+  同时后台显示器轮询也在替换排除区域。
+
+结束后检查：没有错误日志、没有丢事件、最终快照与最后写入的配置一致；并对比有无切换时
+分发线程处理同一事件流的耗时。校验失败时以非 0 退出码结束。
+
+用法：python benchmarks/params_swap_stress.py [切换次数] [每轮手势数]
+"""
+
+import configparser
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+VARIANTS = {
+    'A': {('General', 'DPI'): '0', ('General', 'Window_Patterns'): '',
+          ('Gesture', 'Touch_Slop'): '8', ('Gesture', 'Swipe_Min_Distance'): '120',
+          ('Zones', 'Taskbar_Height'): '95', ('Zones', 'Menu_Width'): '95',
+          ('Performance', 'Inject_SLO_ms'): '50'},
+    'B': {('General', 'DPI'): '4', ('General', 'Window_Patterns'): 'WPS 演示',
+          ('Gesture', 'Touch_Slop'): '20', ('Gesture', 'Swipe_Min_Distance'): '200',
+          ('Zones', 'Taskbar_Height'): '200', ('Zones', 'Menu_Width'): '150',
+          ('Performance', 'Inject_SLO_ms'): '80'},
+}
+
+
+def write_variant(path, name):
+    cfg = configparser.ConfigParser()
+    cfg.read(path, encoding='utf-8')
+    for (section, key), value in VARIANTS[name].items():
+        if not cfg.has_section(section):
+            cfg.add_section(section)
+        cfg.set(section, key, value)
+    tmp = path + '.stress'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        cfg.write(f)
+    os.replace(tmp, path)
+
+
+# 排除区域边界两侧的探测点（1920×1080 显示器）：A 为 95 像素，B 为 200 / 150 × 2 倍缩放
+PROBES = [(94, 500), (96, 500), (299, 500), (301, 500), (1920 - 95, 500), (1920 - 97, 500),
+          (960, 1080 - 94), (960, 1080 - 96), (960, 1080 - 399), (960, 1080 - 401)]
+
+
+def signature(p):
+    """从快照中取出与配置相关的部分；排除区域用编译后 zone_map 的探测结果表示。"""
+    return (p.scale, p.touch_slop, p.slop_sq, p.swipe_min_distance, p.slo,
+            tuple(s.size for s in p.zone_specs), tuple(p.is_excluded(x, y) for x, y in PROBES), p.matcher,
+            tuple(m.scale for m in p.zone_map.monitors))
+
+
+def expected_signature(name):
+    from title_matcher import matcher_from_config
+    v = VARIANTS[name]
+    scale = {'0': 1, '4': 2}[v[('General', 'DPI')]]
+    slop = int(int(v[('Gesture', 'Touch_Slop')]) * scale)
+    taskbar, menu = int(v[('Zones', 'Taskbar_Height')]), int(v[('Zones', 'Menu_Width')])
+    bottom, side = taskbar * scale, menu * scale
+    hits = tuple((x < side or x >= 1920 - side) if y == 500 else y >= 1080 - bottom for x, y in PROBES)
+    return (scale, slop, slop * slop, int(int(v[('Gesture', 'Swipe_Min_Distance')]) * scale),
+            int(v[('Performance', 'Inject_SLO_ms')]) / 1000, (taskbar, menu, menu), hits,
+            matcher_from_config('PowerPoint 幻灯片放映', v[('General', 'Window_Patterns')]), (scale,))
+
+
+def main():
+    swaps = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    gestures = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    os.environ['APPDATA'] = tempfile.mkdtemp(prefix='ppt-touch-stress-')
+    os.environ['PPT_TOUCH_BACKEND'] = 'simulated'
+
+    from loguru import logger
+    import conf_file
+    from input_trace import synthetic_events
+    from os_backend import SimulatedBackend, set_backend
+    from window_tracker import WindowInfo
+
+    errors = []
+    logger.remove()
+    logger.add(lambda msg: errors.append(msg), level='ERROR')
+
+    store = conf_file.store
+    store.set('Zones', 'Use_System_DPI', '0')
+    store.set('Zones', 'Display_Poll', '0.01')       # 显示器轮询也在并发重建
+    store.set('Performance', 'Stats_Log_Interval', '0')
+    store.set('Performance', 'Event_Queue_Size', str(1 << 20))
+    store.set('Navigation', 'Scheduler', '0')
+    write_variant(store.path, 'A')
+    store.reload()
+    set_backend(SimulatedBackend(windows=[WindowInfo(1, 'PowerPoint 幻灯片放映 - 演示文稿1', 0, 0, 1920, 1080)]))
+
+    import func
+
+    runner = threading.Thread(target=func.main, name='FuncMain', daemon=True)
+    runner.start()
+    while not func.hook.armed:
+        time.sleep(0.01)
+    listener = func.hook.listener
+    events = [(x, y, b, p) for _, x, y, b, p in synthetic_events(gestures, 1000.0, seed=7)]
+
+    def replay_once():
+        for x, y, b, p in events:
+            listener.inject(x, y, b, p)
+
+    def drain():
+        while func.event_queue.depth:
+            time.sleep(0.001)
+
+    # 基线：无切换时分发线程处理一轮事件流的耗时
+    baseline = []
+    for _ in range(5):
+        start = time.perf_counter()
+        replay_once()
+        drain()
+        baseline.append(time.perf_counter() - start)
+
+    stop = threading.Event()
+    probe = {'reads': 0, 'bad': [], 'versions': set(), 'rollback': 0}
+    allowed = {expected_signature('A'): 'A', expected_signature('B'): 'B'}
+
+    def probe_loop():
+        last = -1
+        while not stop.is_set():
+            p = func.recognizer.params
+            probe['reads'] += 1
+            sig = signature(p)
+            if sig not in allowed and len(probe['bad']) < 5:
+                probe['bad'].append(sig)
+            if p.version < last:
+                probe['rollback'] += 1
+            last = p.version
+            probe['versions'].add(p.version)
+
+    written = []
+
+    def writer_loop():
+        for i in range(swaps):
+            name = 'B' if i % 2 == 0 else 'A'
+            write_variant(store.path, name)
+            store.reload()
+            written.append(name)
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=probe_loop, daemon=True) for _ in range(2)]
+    writer = threading.Thread(target=writer_loop, daemon=True)
+    for t in threads:
+        t.start()
+    reload_before, swaps_before = func.reload_count, func.params.swaps
+    stormy = []
+    writer.start()
+    while writer.is_alive():
+        start = time.perf_counter()
+        replay_once()
+        drain()
+        stormy.append(time.perf_counter() - start)
+    writer.join()
+    stop.set()
+    for t in threads:
+        t.join()
+    drain()
+
+    pushed = func.hook.processed
+    current = func.params.current
+    assert not errors, f"出现错误日志：{errors[:3]}"
+    assert not probe['bad'], f"读到混合配置的快照：{probe['bad']}"
+    assert probe['rollback'] == 0, f"快照版本回退 {probe['rollback']} 次"
+    assert func.event_queue.dropped == 0, f"丢弃事件 {func.event_queue.dropped} 个"
+    assert func.event_queue.pushed == pushed, "入队事件数与钩子处理数不一致"
+    assert signature(current) == expected_signature(written[-1]), "最终快照与最后写入的配置不一致"
+    assert func.recognizer.params is current, "识别器未使用最终快照"
+    assert func.window_tracker.matcher is current.matcher
+    assert func.stats.slo == current.slo
+
+    baseline.sort()
+    stormy.sort()
+    per_event = lambda s: s / len(events) * 1e6     # noqa: E731
+    print(f"配置切换 {len(written)} 次 → 重新加载 {func.reload_count - reload_before} 次，"
+          f"快照替换 {func.params.swaps - swaps_before} 次（含显示器轮询），最终版本 {current.version}")
+    print(f"检查线程读取快照 {probe['reads']} 次，见到 {len(probe['versions'])} 个版本，全部为完整的 A / B 配置")
+    print(f"事件 {pushed} 个全部处理，识别点击 {func.recognizer.taps}，滑动 {func.recognizer.swipes}，"
+          f"排除区域按下 {func.recognizer.suppressed}")
+    print(f"每事件耗时（钩子 + 分发，中位数）：无切换 {per_event(baseline[len(baseline) // 2]):.2f} µs，"
+          f"切换中 {per_event(stormy[len(stormy) // 2]):.2f} µs（{len(stormy)} 轮）")
+
+    func.stop()
+    runner.join(5)
+    print("全部校验通过")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except AssertionError as e:
+        print(f"校验失败：{e}")
+        sys.exit(1)
@@ -0,0 +1,61 @@
+"""回放输入轨迹，测量翻页决策流水线的吞吐量与延迟。
+
+用法：
+    python benchmarks/replay.py trace.bin [--speed 1.0]
+    python benchmarks/replay.py --synthetic 100000 [--rate 50] [--save synthetic.bin]
+
+按键由 RecordingInjector 记录，不会真正发送；放映状态默认视为进行中。
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gesture import TapRecognizer  # noqa: E402
+from input_trace import read_trace, replay, synthetic_events, write_trace  # noqa: E402
+from key_injector import RecordingInjector  # noqa: E402
+from pipeline import InputPipeline  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('trace', nargs='?', help='轨迹文件路径')
+    parser.add_argument('--synthetic', type=int, default=0, help='生成的合成手势数量')
+    parser.add_argument('--rate', type=float, default=20.0, help='合成手势频率（个/秒）')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help='把合成事件保存为轨迹文件')
+    parser.add_argument('--speed', type=float, default=0.0, help='回放倍速，0 为尽快回放')
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        events = list(synthetic_events(args.synthetic, args.rate, args.width, args.height, args.seed))
+        if args.save:
+            write_trace(args.save, events)
+            print(f"已保存 {len(events)} 个事件到 {args.save}")
+    elif args.trace:
+        events = read_trace(args.trace)
+    else:
+        parser.error('需要指定轨迹文件或 --synthetic')
+
+    edge = 95
+    recognizer = TapRecognizer(
+        swipe_enabled=True,
+        is_excluded=lambda x, y: x < edge or x > args.width - edge or y > args.height - edge)
+    sink = RecordingInjector()
+    pipeline = InputPipeline(recognizer, lambda: True, sink.press)
+    result = replay(events, pipeline, args.speed)
+
+    print(f"事件数      : {result['events']}")
+    print(f"翻页次数    : {result['injected']}  {sink.counts()}")
+    print(f"耗时        : {result['elapsed_s']:.3f} s")
+    print(f"吞吐量      : {result['throughput_eps']:.0f} 事件/秒")
+    print(f"决策延迟    : p50 {result['p50_us']:.2f} µs | p95 {result['p95_us']:.2f} µs | "
+          f"p99 {result['p99_us']:.2f} µs | max {result['max_us']:.2f} µs")
+
+
+if __name__ == '__main__':
+    main()
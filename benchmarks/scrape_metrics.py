@@ -0,0 +1,179 @@
+"""抓取本机指标端点并校验内容，同时测量抓取对钩子路径的影响。
+
+用模拟后端无界面地运行 func.main，向钩子送入一批点击（部分落在任务栏排除区域），
+在随机端口上启动指标端点，用 urllib 抓取 /metrics 与 /metrics.json：
+
+- 校验 Prometheus 文本格式（HELP / TYPE / 样本行、直方图分桶单调且 +Inf 等于 count）；
+- 校验各计数器与 func 中的实际数值一致；
+- 对比“无人抓取”与“每 5 ms 抓取一次”时钩子回调的耗时。
+
+校验失败时以非 0 退出码结束。
+
+用法：python benchmarks/scrape_metrics.py [点击数]
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})? (\S+)$')
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        return resp.headers.get('Content-Type'), resp.read().decode('utf-8')
+
+
+def parse_prometheus(text):
+    """解析文本格式，返回 {样本名{标签}: 值}；格式错误时抛出 AssertionError。"""
+    samples = {}
+    types = {}
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            continue
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            assert kind in ('counter', 'gauge', 'histogram'), line
+            types[name] = kind
+            continue
+        m = SAMPLE_RE.match(line)
+        assert m, f"无效的样本行：{line}"
+        name, labels, value = m.groups()
+        base = re.sub(r'_(bucket|sum|count)$', '', name)
+        assert name in types or base in types, f"样本缺少 TYPE：{line}"
+        samples[name + (labels or '')] = float(value)
+    return types, samples
+
+
+def check_histogram(samples, name, labels=''):
+    buckets = [(k, v) for k, v in samples.items() if k.startswith(f'{name}_bucket{{{labels}')]
+    values = [v for _, v in buckets]
+    assert values == sorted(values), f"{name} 分桶不是单调递增"
+    inf = next(v for k, v in buckets if 'le="+Inf"' in k)
+    count_key = f'{name}_count{{{labels[:-1]}}}' if labels else f'{name}_count'
+    assert inf == samples[count_key], f"{name} +Inf 分桶与 count 不一致"
+    return inf
+
+
+def hook_cost(listener, n):
+    """送入 n 次点击，返回每个钩子回调的平均耗时（µs）。"""
+    from gesture import BUTTON_LEFT
+    start = time.perf_counter()
+    for i in range(n):
+        listener.inject(960, 540, BUTTON_LEFT, True)
+        listener.inject(960, 540, BUTTON_LEFT, False)
+    return (time.perf_counter() - start) / (2 * n) * 1e6
+
+
+def hook_cost_for(listener, n, seconds):
+    """在 seconds 秒内反复送入点击，返回各轮中位数（µs）。"""
+    costs = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        costs.append(hook_cost(listener, n))
+    costs.sort()
+    return costs[len(costs) // 2]
+
+
+def main():
+    clicks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    os.environ['APPDATA'] = tempfile.mkdtemp(prefix='ppt-touch-bench-')
+    os.environ['PPT_TOUCH_BACKEND'] = 'simulated'
+
+    import conf_file
+    from gesture import BUTTON_LEFT
+    from os_backend import SimulatedBackend, set_backend
+    from window_tracker import WindowInfo
+
+    conf_file.store.set('Performance', 'Stats_Log_Interval', '0')
+    conf_file.store.set('Performance', 'Event_Queue_Size', str(8 * clicks))
+    # 这里只关心钩子回调本身，关闭调度器的节流，避免合并影响翻页计数
+    conf_file.store.set('Navigation', 'Scheduler', '0')
+    backend = SimulatedBackend(windows=[WindowInfo(1, 'PowerPoint 幻灯片放映 - 演示文稿1', 0, 0, 1920, 1080)])
+    set_backend(backend)
+
+    import func
+    from metrics_server import AppCollector, MetricsServer
+
+    runner = threading.Thread(target=func.main, name='FuncMain', daemon=True)
+    runner.start()
+    while not func.hook.armed:
+        time.sleep(0.01)
+    listener = func.hook.listener
+
+    # 功能数据：普通点击 + 任务栏区域内的点击 + 一次配置重新加载
+    hook_cost(listener, clicks)
+    for _ in range(10):
+        listener.inject(960, 1070, BUTTON_LEFT, True)
+        listener.inject(960, 1070, BUTTON_LEFT, False)
+    func.reload_config()
+    while func.event_queue.depth:
+        time.sleep(0.01)
+    if func.scheduler is not None:
+        while func.scheduler.pending:
+            time.sleep(0.01)
+
+    server = MetricsServer(AppCollector(version='bench'), port=0)
+    assert server.start()
+    base = f'http://127.0.0.1:{server.port}'
+    ctype, text = fetch(base + '/metrics')
+    assert ctype.startswith('text/plain; version=0.0.4'), ctype
+    types, samples = parse_prometheus(text)
+    _, body = fetch(base + '/metrics.json')
+    data = json.loads(body)
+
+    expected = {
+        'ppt_touch_events_received_total': func.hook.processed + func.hook.skipped,
+        'ppt_touch_page_turns_total': func.pipeline.injected,
+        'ppt_touch_suppressed_taps_total': func.recognizer.suppressed,
+        'ppt_touch_config_reloads_total': func.reload_count,
+    }
+    for name, value in expected.items():
+        assert samples[name] == value, f"{name}：端点 {samples[name]}，实际 {value}"
+        assert data[name]['series'][0]['value'] == value, f"{name} JSON 不一致"
+    assert samples['ppt_touch_suppressed_taps_total'] == 10
+    assert samples['ppt_touch_config_reloads_total'] == 1
+    turns = check_histogram(samples, 'ppt_touch_latency_seconds', 'stage="total",')
+    checks = check_histogram(samples, 'ppt_touch_window_check_seconds')
+    assert checks >= 1
+    rss = samples['ppt_touch_resident_memory_bytes{process="gui"}']
+    assert rss > 0
+    print(f"抓取校验通过：{len(types)} 项指标，{len(samples)} 个样本；"
+          f"事件 {expected['ppt_touch_events_received_total']:.0f}，翻页 {turns:.0f}，"
+          f"屏蔽 10，窗口检查 {checks:.0f} 次，RSS {rss / 1048576:.1f} MB")
+
+    # 钩子路径开销：无人抓取 vs 持续抓取
+    idle = hook_cost_for(listener, 200, 2.0)
+    stop = threading.Event()
+
+    def scrape_loop():
+        while not stop.is_set():
+            fetch(base + '/metrics')
+            time.sleep(0.005)
+
+    scraper = threading.Thread(target=scrape_loop, daemon=True)
+    scraper.start()
+    before = server.scrapes
+    busy = hook_cost_for(listener, 200, 2.0)
+    stop.set()
+    scraper.join()
+    print(f"钩子回调耗时：无人抓取 {idle:.2f} µs，每 5 ms 抓取 {busy:.2f} µs（期间抓取 {server.scrapes - before} 次）")
+
+    server.stop()
+    func.stop()
+    runner.join(5)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except AssertionError as e:
+        print(f"校验失败：{e}")
+        sys.exit(1)
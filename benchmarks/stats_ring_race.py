@@ -0,0 +1,89 @@
+"""共享内存统计环形缓冲区的并发写入检查。
+
+与监听子进程相同：一个线程不断写翻页记录（StatsRing.write），另一个线程不断发布计数器与
+心跳（write_counters），读端（另一个附加到同一块共享内存的 StatsRing）持续读取。
+每条记录的第一个字段为递增编号，检查：
+
+- 读端看到的写入序号从不回退；
+- 读到的记录没有重复、顺序递增，读到的 + 计入 lost 的 = 写入总数；
+- 心跳中的 PID 始终为发布方写入的值。
+
+校验失败时以非 0 退出码结束。
+
+用法：python benchmarks/stats_ring_race.py [记录数] [缓冲区容量]
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    from listener_process import StatsRing
+
+    ring = StatsRing.create(capacity)
+    reader = StatsRing.attach(ring.name, capacity)
+    done = threading.Event()
+    pid = os.getpid()
+
+    def write_records():
+        for i in range(total):
+            ring.write((float(i), 0.0, 0.0, 0.0))
+        done.set()
+
+    def publish_counters():
+        n = 0
+        while not done.is_set():
+            n += 1
+            ring.write_counters({'pushed': n}, pid)
+
+    seen = []
+    backwards = 0
+    bad_pid = 0
+    last_head = 0
+    writer = threading.Thread(target=write_records)
+    publisher = threading.Thread(target=publish_counters)
+    start = time.perf_counter()
+    writer.start()
+    publisher.start()
+    while True:
+        finished = done.is_set()
+        head = reader._header()[0]
+        if head < last_head:
+            backwards += 1
+        last_head = max(last_head, head)
+        beat_pid, _ = reader.heartbeat()
+        if beat_pid not in (0, pid):
+            bad_pid += 1
+        seen.extend(int(r[0]) for r in reader.read_new())
+        if finished:
+            seen.extend(int(r[0]) for r in reader.read_new())
+            break
+    writer.join()
+    publisher.join()
+    elapsed = time.perf_counter() - start
+
+    duplicates = len(seen) - len(set(seen))
+    ordered = all(a < b for a, b in zip(seen, seen[1:]))
+    print(f"写入 {total} 条记录（容量 {capacity}），用时 {elapsed:.2f} s：读到 {len(seen)} 条，"
+          f"套圈丢失 {reader.lost} 条，重复 {duplicates} 条，序号回退 {backwards} 次")
+    reader.close()
+    ring.close()
+    assert backwards == 0, f"读端看到写入序号回退 {backwards} 次"
+    assert duplicates == 0 and ordered, f"读到重复或乱序的记录（重复 {duplicates} 条）"
+    assert len(seen) + reader.lost == total, f"读到 {len(seen)} + 丢失 {reader.lost} ≠ 写入 {total}"
+    assert bad_pid == 0, f"心跳 PID 被覆盖 {bad_pid} 次"
+    print("全部校验通过")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except AssertionError as e:
+        print(f"校验失败：{e}")
+        sys.exit(1)
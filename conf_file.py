@@ -1,18 +1,33 @@
 """配置文件读写工具。
 
 将配置文件放在用户的 %APPDATA%/PowerPointTouchAssist 目录，避免打包后写入受限。
-提供读写接口：read_conf / write_conf。
+配置由进程内唯一的 `ConfigStore` 缓存：首次访问时加载一次，之后仅在文件的
+mtime/大小变化时重新解析，并提供带缓存的类型化读取（get_int / get_bool / get_float）。
+延迟写入（defer=True）会在短时间窗口内合并多次修改，最终通过“临时文件 + 重命名”
+一次性原子落盘；退出前调用 `flush()` 确保写入。
+配置内容变化（写入或重新加载）后依次调用 `add_listener` 注册的回调；延迟写入的修改
+在合并落盘后才通知一次（如逐字输入时不会每个字符都触发）。
+`read_conf` / `write_conf` 保留为兼容接口。
 """
 
+import atexit
 import os
+import tempfile
+import threading
+import time
 import configparser as config
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
 
 # 配置文件目录与路径（放在用户 APPDATA 下）
 CONFIG_DIR = os.path.join(os.environ.get('APPDATA', ''), 'PowerPointTouchAssist')
 CONFIG_PATH = os.path.join(CONFIG_DIR, 'config.ini')
 os.makedirs(CONFIG_DIR, exist_ok=True)
 
+# 程序目录下的 config.ini（记录版本号等随程序发布的信息）
+APP_CONFIG_PATH = 'config.ini'
+
 # DPI 缩放映射表（配置项 -> 缩放倍数）
 dpi_dict = {
     '0': 1,
@@ -27,22 +42,359 @@ DEFAULTS = {
     'General': {
         'DPI': '0',
         'PPT_Title': 'PowerPoint 幻灯片放映',
+        # 其他放映窗口规则，每行一条（续行需缩进），格式见 title_matcher.py，例如：
+        #     PowerPoint Slide Show ; class=screenClass
+        #     re:^WPS (演示|Presentation) ; process=wpp.exe
+        'Window_Patterns': '',
         'auto_startup': '0'
     },
     'Miscellaneous': {
         'InitialStartUp': '1'
+    },
+    'Gesture': {
+        # 判定为点击的最大位移（像素，按 DPI 缩放）与最长按住时间（秒，0 为不限制）
+        'Touch_Slop': '8',
+        'Tap_Timeout': '1.0',
+        # 左右滑动翻页（左滑下一页，右滑上一页）
+        'Swipe_Enabled': '0',
+        'Swipe_Min_Distance': '120'
+    },
+    'Zones': {
+        # 每个显示器底部任务栏、左右两侧放映菜单的排除宽度（96 DPI 下的像素，按显示器 DPI 缩放）
+        'Taskbar_Height': '95',
+        'Menu_Width': '95',
+        # 1：按各显示器系统 DPI 缩放；0：统一使用 General/DPI 中选择的缩放比例
+        'Use_System_DPI': '1',
+        # 显示器布局变化的检查间隔（秒）
+        'Display_Poll': '2.0'
+    },
+    'Update': {
+        # 更新包并行分段下载数（1 为不分段，仅对较大的包生效）
+        'Download_Segments': '4',
+        # 增量更新需下载的字节数超过完整包的该比例时，改为下载完整 zip
+        'Delta_Threshold': '0.6',
+        # 后台定期检查更新的间隔（小时，0 为关闭）
+        'Auto_Check_Hours': '0',
+        # 局域网更新镜像：off（客户端，可使用镜像）/ serve（本机下载并向局域网提供更新包）
+        'Mirror_Mode': 'off',
+        # 客户端使用的镜像地址（如 http://10.0.0.5:8765，留空则按下一项广播发现）
+        'Mirror_URL': '',
+        # 广播发现镜像（默认关闭：局域网内任何机器都能应答；更新包始终按源站的 sha256 校验）
+        'Mirror_Discovery': '0',
+        # 镜像 HTTP 端口（UDP 发现使用同一端口号）与镜像从源站同步的间隔（小时）
+        'Mirror_Port': '8765',
+        'Mirror_Sync_Hours': '6'
+    },
+    'Logging': {
+        # 鼠标事件等热路径调试日志（默认关闭）、每类消息每秒上限与 1/N 采样
+        'Hot_Path_Debug': '0',
+        'Hot_Path_Rate': '20',
+        'Hot_Path_Sample': '1'
+    },
+    'Performance': {
+        # 放映窗口状态的后台刷新周期（秒）
+        'Window_Check_TTL': '0.5',
+        # 钩子事件队列容量与溢出策略（drop_oldest / drop_newest）
+        'Event_Queue_Size': '256',
+        'Event_Queue_Overflow': 'drop_oldest',
+        # 录制输入轨迹的文件路径（留空不录制），可用 benchmarks/replay.py 回放
+        'Trace_File': '',
+        # 翻页延迟告警阈值（毫秒）与性能汇总日志间隔（秒，0 为不写）
+        'Inject_SLO_ms': '50',
+        'Stats_Log_Interval': '300',
+        # 按键注入后端（direct / pynput / pyautogui）与连续按键间隔（毫秒）
+        'Key_Backend': 'direct',
+        'Key_Delay_ms': '0',
+        # 鼠标钩子与手势识别的运行方式：thread（GUI 进程内的后台线程）/ process（独立子进程）
+        'Listener_Mode': 'thread',
+        # 鼠标钩子安装时机：slideshow（仅放映期间）/ always（始终安装）
+        'Hook_Mode': 'slideshow',
+        # 未在放映时检查放映窗口的周期（秒），即放映开始后最迟多久安装钩子
+        'Idle_Window_Check': '1.0',
+        # 设置 / 更新 / 启动提示窗口空闲多少分钟后释放（下次打开时重新创建，0 为不释放）
+        'Idle_Teardown_Minutes': '5'
+    },
+    'Navigation': {
+        # 翻页调度器：1 为在独立线程中注入并合并连续点击，0 为在分发线程中逐次注入（默认，原行为）
+        # keys 方式合并后仍按净页数逐个发送翻页键，放映渲染慢时的滞后与逐次注入相同，
+        # 只抵消方向相反的点击；要缩短滞后需用 number 方式（见 Jump_Mode 的限制）
+        'Scheduler': '0',
+        # 积压达到多少条翻页命令时合并为一次跳转
+        'Coalesce_Threshold': '3',
+        # 同时在途（已发送、放映可能尚未处理完）的翻页上限，与估计的单次翻页处理时间（毫秒，0 为不限制）
+        'Max_In_Flight': '2',
+        'Settle_ms': '100',
+        # 点击后超过多少毫秒仍未注入则丢弃（每次丢弃都记录警告日志），0 为不丢弃
+        'Stale_ms': '0',
+        # 合并跳转方式：keys（连续发送翻页键）/ number（输入页码 + 回车）
+        # number 方式按触屏翻页自行推算页码，假定放映从第 1 页开始；用翻页笔、键盘或鼠标滚轮翻过页，
+        # 或从当前页开始放映后，页码会不同步并跳到错误的页，此时请用 keys
+        'Jump_Mode': 'keys'
+    },
+    'Metrics': {
+        # 本机指标端点（仅绑定 127.0.0.1）：/metrics 为 Prometheus 文本格式，/metrics.json 为 JSON
+        'Enabled': '0',
+        'Port': '9464'
     }
 }
 
+# 程序目录 config.ini 的默认内容
+APP_DEFAULTS = {
+    'General': {
+        'dpi': '0',
+        'ppt_title': 'PowerPoint 幻灯片放映',
+        'auto_startup': '0'
+    },
+    'Miscellaneous': {
+        'initialstartup': '0',
+        'ver': '1.1'
+    },
+    'About': {
+        'version': '1.2.0'
+    }
+}
+
+
+class ConfigStore:
+    """进程内的配置缓存。
+
+    - 首次读取时加载文件，之后最多每 `check_interval` 秒 stat 一次，
+      仅当 mtime 或大小变化时才重新解析；
+    - 类型化读取结果按 (节, 键, 类型) 缓存，重新加载或写入时清空；
+    - 写入时立即更新内存；文件写入可延迟 `write_delay` 秒合并为一次原子写；
+    - 值被写入修改或文件被重新加载后，在触发变化的线程中（不持有内部锁）调用变化回调；
+      延迟写入的修改在落盘后由落盘的线程（计时器线程或调用 `flush` 的线程）通知一次。
+    """
+
+    def __init__(self, path: str, defaults: Optional[Dict[str, Dict[str, str]]] = None,
+                 check_interval: float = 1.0, write_delay: float = 0.5):
+        self.path = path
+        self.defaults = defaults or {}
+        self.check_interval = check_interval
+        self.write_delay = write_delay
+        self.reload_count = 0
+        self.write_count = 0
+        self.writes_avoided = 0
+        self._dirty = False
+        self._pending: Dict[Tuple[str, str], str] = {}      # 尚未落盘的修改
+        self._notify_deferred = False                        # 延迟写入的修改尚未通知
+        self._timer: Optional[threading.Timer] = None
+        self._cfg: Optional[config.ConfigParser] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._cache: Dict[Tuple[str, str, str], Any] = {}
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[['ConfigStore'], None]] = []
+
+    # ---------- 变化通知 ----------
+    def add_listener(self, callback: Callable[['ConfigStore'], None]) -> None:
+        """注册配置变化回调 callback(store)。"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[['ConfigStore'], None]) -> None:
+        try:
+            self._listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def _notify(self) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(self)
+            except Exception as e:
+                logger.exception(f"配置变化回调出错：{e}")
+
+    # ---------- 文件同步 ----------
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
 
-def _ensure_conf():
-    """确保配置文件存在；不存在时写入默认配置."""
-    if os.path.isfile(CONFIG_PATH):
-        return
-    cfg = config.ConfigParser()
-    cfg.read_dict(DEFAULTS)
-    with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-        cfg.write(f)
+    def _atomic_write(self, cfg: config.ConfigParser) -> None:
+        """先写同目录临时文件并 fsync，再用 os.replace 原子替换，避免写到一半留下损坏文件。"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                cfg.write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self.write_count += 1
+
+    def _write_defaults(self) -> None:
+        cfg = config.ConfigParser()
+        cfg.read_dict(self.defaults)
+        self._atomic_write(cfg)
+
+    def _load(self) -> None:
+        """（重新）解析配置文件；文件不存在时先写入默认配置。"""
+        signature = self._stat()
+        if signature is None:
+            self._write_defaults()
+            signature = self._stat()
+        cfg = config.ConfigParser()
+        cfg.read(self.path, encoding='utf-8')
+        self._cfg = cfg
+        self._signature = signature
+        self._cache.clear()
+        self.reload_count += 1
+
+    def _sync(self, notify: bool = True) -> config.ConfigParser:
+        """返回最新的解析结果，必要时按 mtime/大小重新加载。
+
+        notify 为 False 时重新加载后不通知（调用方持有锁，稍后自行通知）。
+        """
+        now = time.monotonic()
+        if self._cfg is not None and now - self._checked_at < self.check_interval:
+            return self._cfg
+        changed = False
+        with self._lock:
+            self._checked_at = now
+            # 有未落盘的修改时以内存为准，不从磁盘重新加载
+            if self._cfg is None or (not self._dirty and self._stat() != self._signature):
+                changed = self._cfg is not None
+                self._load()
+            cfg = self._cfg
+        if changed and notify:
+            self._notify()
+        return cfg
+
+    def reload(self) -> None:
+        """强制重新加载配置文件。
+
+        有尚未落盘的延迟写入时，在重新读到的内容上重新应用这些修改并立即落盘，不会丢失。
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._load()
+            if self._dirty:
+                for (section, key), value in self._pending.items():
+                    if not self._cfg.has_section(section):
+                        self._cfg.add_section(section)
+                    self._cfg.set(section, key, value)
+                self._flush_locked()
+            self._notify_deferred = False       # 下面的通知已包含延迟写入的修改
+        self._notify()
+
+    # ---------- 读取 ----------
+    def get(self, section: str, key: str, fallback: Optional[str] = None) -> Optional[str]:
+        """读取字符串配置，回退顺序：文件 -> 默认配置 -> fallback。"""
+        cfg = self._sync()
+        if fallback is None:
+            fallback = self.defaults.get(section, {}).get(key)
+        return cfg.get(section, key, fallback=fallback)
+
+    def _typed(self, section: str, key: str, kind: str, convert, fallback):
+        cfg = self._sync()
+        cache_key = (section, key, kind)
+        try:
+            return self._cache[cache_key]
+        except KeyError:
+            pass
+        raw = self.get(section, key)
+        try:
+            value = convert(raw) if raw not in (None, '') else fallback
+        except ValueError:
+            value = fallback
+        if cfg is self._cfg:
+            self._cache[cache_key] = value
+        return value
+
+    def get_int(self, section: str, key: str, fallback: int = 0) -> int:
+        """读取整数配置（带缓存），无法解析时返回 fallback。"""
+        return self._typed(section, key, 'int', int, fallback)
+
+    def get_float(self, section: str, key: str, fallback: float = 0.0) -> float:
+        """读取浮点配置（带缓存），无法解析时返回 fallback。"""
+        return self._typed(section, key, 'float', float, fallback)
+
+    def get_bool(self, section: str, key: str, fallback: bool = False) -> bool:
+        """读取布尔配置（带缓存），支持 1/0、yes/no、true/false、on/off。"""
+        def _to_bool(raw: str) -> bool:
+            state = config.ConfigParser.BOOLEAN_STATES.get(raw.strip().lower())
+            if state is None:
+                raise ValueError(raw)
+            return state
+        return self._typed(section, key, 'bool', _to_bool, fallback)
+
+    # ---------- 写入 ----------
+    def set(self, section: str, key: str, value, defer: bool = False) -> None:
+        """写入（或更新）配置项。
+
+        参数:
+            defer: 为 True 时仅更新内存并在 `write_delay` 秒后合并落盘；
+                   期间的后续修改会重置计时器，只产生一次文件写入，变化回调也在落盘后只调用一次。
+        """
+        notify = False
+        with self._lock:
+            signature = self._signature
+            cfg = self._sync(notify=False)
+            changed = signature != self._signature or cfg.get(section, key, fallback=None) != str(value)
+            if not cfg.has_section(section):
+                cfg.add_section(section)
+            cfg.set(section, key, str(value))
+            self._pending[(section, key)] = str(value)
+            self._cache.clear()
+            if self._dirty:
+                # 与尚未落盘的修改合并，省下一次完整的重写
+                self.writes_avoided += 1
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not defer:
+                notify = self._flush_locked() or changed
+            else:
+                self._notify_deferred = self._notify_deferred or changed
+                self._timer = threading.Timer(self.write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if notify:
+            self._notify()
+
+    def flush(self) -> None:
+        """将未落盘的修改一次性原子写入文件；其中有延迟写入的修改时随后调用变化回调。"""
+        with self._lock:
+            notify = self._flush_locked()
+        if notify:
+            self._notify()
+
+    def _flush_locked(self) -> bool:
+        """落盘（调用方持有锁），返回是否有尚未通知的延迟写入修改。"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        notify, self._notify_deferred = self._notify_deferred, False
+        if not self._dirty or self._cfg is None:
+            return notify
+        self._atomic_write(self._cfg)
+        self._signature = self._stat()
+        self._dirty = False
+        self._pending.clear()
+        return notify
+
+
+# 进程内唯一的配置实例
+store = ConfigStore(CONFIG_PATH, DEFAULTS)
+app_store = ConfigStore(APP_CONFIG_PATH, APP_DEFAULTS)
+
+
+def flush() -> None:
+    """落盘所有延迟写入的配置（关闭设置窗口或退出程序前调用）。"""
+    store.flush()
+    app_store.flush()
+
+
+atexit.register(flush)
 
 
 def read_conf(section: str = 'General', key: str = '') -> Optional[str]:
@@ -57,19 +409,12 @@ def read_conf(section: str = 'General', key: str = '') -> Optional[str]:
     返回:
         配置值的字符串或 None（如果既不在文件也不在默认配置中）。
     """
-    _ensure_conf()
-    cfg = config.ConfigParser()
-    cfg.read(CONFIG_PATH, encoding='utf-8')
-    return cfg.get(section, key, fallback=DEFAULTS.get(section, {}).get(key))
-
-
-def write_conf(section: str, key: str, value) -> None:
-    """写入（或更新）配置项并保存到用户配置文件."""
-    _ensure_conf()
-    cfg = config.ConfigParser()
-    cfg.read(CONFIG_PATH, encoding='utf-8')
-    if not cfg.has_section(section):
-        cfg.add_section(section)
-    cfg.set(section, key, str(value))
-    with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-        cfg.write(f)
\ No newline at end of file
+    return store.get(section, key)
+
+
+def write_conf(section: str, key: str, value, defer: bool = False) -> None:
+    """写入（或更新）配置项并保存到用户配置文件.
+
+    defer=True 时合并短时间内的多次修改，稍后一次性写入（见 `ConfigStore.set`）。
+    """
+    store.set(section, key, value, defer=defer)
@@ -1,12 +1,14 @@
 """设置界面（Qt）相关逻辑。
 
-通过 `paths.resource` 加载 UI 文件，读取/写入配置并处理开机自启选项。
+界面来自预编译的 settings.ui（见 ui_cache），读取/写入配置并处理开机自启选项。
+对话框只创建一次，之后每次打开复用并重新载入配置值。
 """
 
+import time
+
 from PyQt6.QtWidgets import QDialog, QLineEdit, QPushButton, QComboBox, QCheckBox
-from PyQt6 import uic
-from PyQt6.QtCore import Qt
-import paths
+from PyQt6.QtCore import Qt, QSignalBlocker, QTimer
+import ui_cache
 import conf_file as config
 import shortcut as a
 
@@ -16,36 +18,44 @@ class FramelessWindow(QDialog):
 
     def __init__(self):
         super().__init__()
-        # 使用 paths.resource 加载 UI 文件（兼容打包与源码）
-        uic.loadUi(paths.resource('settings.ui'), self)
+        # 使用预编译的界面模块（兼容打包与源码）
+        ui_cache.setup_ui('settings', self)
 
         # 绑定 DPI 组合框
         self.opt1_Combo = self.findChild(QComboBox, 'opt1_Combo')
-        self.opt1_Combo.setCurrentIndex(int(config.read_conf('General', 'DPI') or 0))
         self.opt1_Combo.currentIndexChanged.connect(self.opt1_Save)
 
         # 绑定 PPT 标题输入框
         self.opt2_LineEdit = self.findChild(QLineEdit, 'opt2_LineEdit')
-        self.opt2_LineEdit.setText(config.read_conf('General', 'PPT_Title') or 'PowerPoint 幻灯片放映')
         self.opt2_LineEdit.textChanged.connect(self.opt2_Save)
 
         # 绑定开机自启复选框
         self.opt3_checkBox = self.findChild(QCheckBox, 'opt3_checkBox')
-        self.opt3_checkBox.setChecked(int(config.read_conf('General', 'auto_startup') or 0))
         self.opt3_checkBox.stateChanged.connect(self.opt3_Save)
 
         # 重置按钮
         self.opt2_Reset = self.findChild(QPushButton, 'opt2Reset')
         self.opt2_Reset.clicked.connect(self.opt2_ResetToDefault)
 
+        self.load_values()
+
+    def load_values(self):
+        """从配置载入控件的值（载入时不触发保存）."""
+        blockers = [QSignalBlocker(w) for w in (self.opt1_Combo, self.opt2_LineEdit, self.opt3_checkBox)]
+        self.opt1_Combo.setCurrentIndex(config.store.get_int('General', 'DPI'))
+        self.opt2_LineEdit.setText(config.read_conf('General', 'PPT_Title') or 'PowerPoint 幻灯片放映')
+        self.opt3_checkBox.setChecked(config.store.get_bool('General', 'auto_startup'))
+        for blocker in blockers:
+            blocker.unblock()
+
     # ---------- 配置保存相关方法 ----------
     def opt1_Save(self, idx):
         """保存 DPI 设置索引."""
         config.write_conf('General', 'DPI', str(idx))
 
-    def opt2_Save(self, txt):
-        """保存 PPT 标题配置."""
-        config.write_conf('General', 'PPT_Title', txt)
+        """保存 PPT 标题配置（逐字输入时合并写入并在落盘后通知一次，窗口关闭时落盘）."""
+        """保存 PPT 标题配置（逐字输入时合并写入，窗口关闭时落盘）."""
+        config.write_conf('General', 'PPT_Title', txt, defer=True)
 
     def opt2_ResetToDefault(self):
         """将 PPT 标题恢复为默认并更新输入框."""
@@ -58,8 +68,39 @@ class FramelessWindow(QDialog):
         config.write_conf('General', 'auto_startup', str(int(checked)))
         (a.add_to_startup if checked else a.remove_from_startup)('PowerPoint_TouchAssist.exe')
 
+    def done(self, result):
+        """关闭窗口前落盘所有延迟写入的配置."""
+        config.flush()
+        super().done(result)
+
+
+_dialog = None
+
+
+def main(on_shown=None):
+    """显示设置对话框并阻塞直到关闭（对话框只创建一次，之后复用）.
+
+    参数:
+        on_shown: 可选回调，对话框显示后以打开耗时（毫秒）调用。
+    """
+    global _dialog
+    start = time.perf_counter()
+    if _dialog is None:
+        _dialog = FramelessWindow()
+    else:
+        _dialog.load_values()
+    if on_shown is not None:
+        QTimer.singleShot(0, lambda: on_shown((time.perf_counter() - start) * 1000))
+    _dialog.exec()
+
 
-def main():
-    """显示设置对话框并阻塞直到关闭."""
-    dlg = FramelessWindow()
-    dlg.exec()
\ No newline at end of file
+def release() -> bool:
+    """释放已创建的设置对话框（空闲时调用，下次打开时重新创建），对话框正在显示时返回 False."""
+    global _dialog
+    if _dialog is None:
+        return True
+    if _dialog.isVisible():
+        return False
+    _dialog.deleteLater()
+    _dialog = None
+    return True
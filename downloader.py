@@ -0,0 +1,490 @@
+"""更新包下载引擎（与 Qt 无关，可直接对本地 HTTP 服务测试）。
+
+- 复用进程内持久的 `requests.Session`（连接池 + 连接失败自动重试）；
+- 断线后用 HTTP Range 从 `.part` 文件续传，而不是从头再来；
+- 服务器支持 Range 且文件较大时，可拆成多段并行下载，分段进度记录在 `.part.json` 中，同样可续传；
+- `.part.json` 记录 URL、总大小与 ETag / Last-Modified，与本次 HEAD 结果不一致（如上次留下的是旧版本）
+  或无法校验时丢弃已有部分；续传请求带 If-Range，服务器上的文件已变化时重新下载；
+- 读取块大小按实际吞吐自适应调整，进度回调按固定频率节流；
+- 可边下载边计算 SHA-256 并与 version.json 中的值比对，不再单独读一遍文件。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.util.retry import Retry
+from loguru import logger
+
+ProgressCallback = Callable[[int, int], None]   # (已下载字节, 总字节；未知时为 0)
+
+# 可通过续传恢复的网络错误（读取响应体时 urllib3 会直接抛出自己的异常）
+NETWORK_ERRORS = (requests.ConnectionError, requests.Timeout, Urllib3HTTPError)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size: int = 8) -> requests.Session:
+    """返回进程内共享的 Session（首次调用时创建）。"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=3, connect=3, read=0, backoff_factor=0.5,
+                          status_forcelist=(502, 503, 504), allowed_methods=frozenset({'GET', 'HEAD'}))
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+            s = requests.Session()
+            s.mount('http://', adapter)
+            s.mount('https://', adapter)
+            s.headers['User-Agent'] = 'PowerPointTouchAssist-Updater'
+            _session = s
+        return _session
+
+
+class DownloadCancelled(Exception):
+    """下载被调用方取消。"""
+
+
+class ChecksumError(ValueError):
+    """下载内容的 SHA-256 与期望值不符。"""
+
+
+class _RemoteChanged(Exception):
+    """续传期间服务器上的文件已变化（If-Range 不匹配，返回了完整内容）。"""
+
+
+class _Remote(NamedTuple):
+    """HEAD 请求得到的远端文件信息。"""
+    total: int
+    accept_ranges: bool
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+    @property
+    def validator(self) -> Optional[str]:
+        """If-Range 使用的验证器：强 ETag 优先（弱 ETag 不能用于 If-Range），其次 Last-Modified。"""
+        if self.etag and not self.etag.startswith('W/'):
+            return self.etag
+        return self.last_modified
+
+    def identity(self, url: str, sha256: Optional[str] = None) -> Dict:
+        """写入 `.part.json` 的标识，续传前与本次 HEAD 结果比对。
+
+        给出期望的 SHA-256 时按它与大小标识内容：同一个包换了下载地址（镜像失败后改用源站）
+        也能续传，续传结果最终由哈希校验。
+        """
+        if sha256:
+            return {'sha256': sha256, 'total': self.total}
+        return {'url': url, 'total': self.total, 'etag': self.etag, 'last_modified': self.last_modified}
+
+
+_HASH_BLOCK = 1024 * 1024
+
+
+class _StreamHasher:
+    """边下载边计算 SHA-256。
+
+    按文件顺序到达的数据直接计算。分段并行下载时只有紧接已计算位置的数据能直接计算，
+    其余分段的数据在前面的分段完成后从文件补读（刚写入，通常仍在页缓存中）。
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.pos = 0                # 已计算到的文件偏移
+        self.read_back = 0          # 从文件补读的字节数
+        self._h = hashlib.sha256()
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.pos = 0
+            self._h = hashlib.sha256()
+
+    def feed(self, offset: int, data: bytes) -> None:
+        """写入 offset 处的数据后调用；与已计算位置不相接时忽略（之后补读）。"""
+        with self._lock:
+            end = offset + len(data)
+            if offset <= self.pos < end:
+                self._h.update(memoryview(data)[self.pos - offset:])
+                self.pos = end
+
+    def catch_up(self, extent: int) -> None:
+        """从文件补读 [pos, extent) 的数据（extent 之前的内容须已写入）。"""
+        with self._lock:
+            if extent <= self.pos:
+                return
+            with open(self.path, 'rb') as f:
+                f.seek(self.pos)
+                while self.pos < extent:
+                    data = f.read(min(_HASH_BLOCK, extent - self.pos))
+                    if not data:
+                        break
+                    self._h.update(data)
+                    self.pos += len(data)
+                    self.read_back += len(data)
+
+    def hexdigest(self) -> str:
+        return self._h.hexdigest()
+
+
+class _HashingWriter:
+    """顺序写入文件，同时把数据交给哈希计算。"""
+
+    def __init__(self, f, hasher: _StreamHasher, offset: int):
+        self.f = f
+        self.hasher = hasher
+        self.offset = offset
+
+    def write(self, data):
+        self.f.write(data)
+        self.hasher.feed(self.offset, data)
+        self.offset += len(data)
+
+
+class _Progress:
+    """线程安全的进度累计，回调按 `interval` 秒节流。"""
+
+    def __init__(self, total: int, done: int, callback: Optional[ProgressCallback], interval: float):
+        self.total = total
+        self.done = done
+        self.callback = callback
+        self.interval = interval
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, n: int) -> None:
+        with self._lock:
+            self.done += n
+            now = time.monotonic()
+            if self.callback is None or now - self._last < self.interval:
+                return
+            self._last = now
+            done, total = self.done, self.total
+        self.callback(done, total)
+
+    def finish(self) -> None:
+        if self.callback is not None:
+            self.callback(self.done, self.total or self.done)
+
+
+class Downloader:
+    """可续传、可分段并行的下载器。
+
+    参数:
+        session: 使用的 Session，默认为进程内共享 Session。
+        timeout: 连接 / 读取超时（秒）。
+        retries: 读取中断后续传的最大次数。
+        segments: 并行分段数，1 为不分段。
+        segment_threshold: 文件不小于该字节数时才分段下载。
+        progress_interval: 进度回调的最小间隔（秒）。
+        min_chunk / max_chunk: 自适应读取块大小的上下限（字节）。
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, timeout: float = 15,
+                 retries: int = 5, segments: int = 4, segment_threshold: int = 8 * 1024 * 1024,
+                 progress_interval: float = 0.1, min_chunk: int = 64 * 1024, max_chunk: int = 1024 * 1024):
+        self.session = session or get_session(pool_size=max(8, segments * 2))
+        self.timeout = timeout
+        self.retries = retries
+        self.segments = max(1, segments)
+        self.segment_threshold = segment_threshold
+        self.progress_interval = progress_interval
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.cancel_event = threading.Event()
+        self.sha256: Optional[str] = None        # 最近一次下载的 SHA-256（要求计算时）
+        self.hash_read_back = 0                  # 最近一次下载为计算哈希从文件补读的字节数
+        self._hasher: Optional[_StreamHasher] = None
+        self._expected: Optional[str] = None     # 本次下载期望的 SHA-256（`.part.json` 标识用）
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    # ---------------- 对外接口 ----------------
+    def download(self, url: str, dest: Path, progress: Optional[ProgressCallback] = None,
+                 sha256: Optional[str] = None) -> Path:
+        """下载 url 到 dest（先写 dest.part，完成后重命名），返回 dest。
+
+        参数:
+            sha256: 期望的 SHA-256（十六进制）。不为 None 时边下载边计算，结果见 `self.sha256`；
+                非空且不一致时删除已下载内容并抛出 ChecksumError。非空时 .part.json 按期望的哈希与
+                大小标识，换了 url（如镜像失败后改用源站）也能续传已有的 .part。
+        """
+        dest = Path(dest)
+        part = dest.with_name(dest.name + '.part')
+        state = dest.with_name(dest.name + '.part.json')
+        self.sha256 = None
+        self._expected = sha256.lower() if sha256 else None
+
+        remote = self._probe(url)
+        info = self._resumable(url, remote, part, state)
+        try:
+            self._download_checked(url, part, state, remote, info, progress, sha256)
+        except ChecksumError:
+            if info is None:
+                raise
+            # 续传的已有部分有误（如来自另一个下载地址）：已删除，从头重新下载一次
+            logger.warning("续传的下载内容校验失败，从头重新下载")
+            self._download_checked(url, part, state, self._probe(url), None, progress, sha256)
+        os.replace(part, dest)
+        state.unlink(missing_ok=True)
+        return dest
+
+    # ---------------- 内部实现 ----------------
+    def _download_checked(self, url: str, part: Path, state: Path, remote: _Remote, info: Optional[Dict],
+                          progress: Optional[ProgressCallback], sha256: Optional[str]) -> None:
+        """下载到 part 并按 sha256 校验；不一致时删除 part 并抛出 ChecksumError。"""
+        self._hasher = _StreamHasher(part) if sha256 is not None else None
+        try:
+            self._fetch(url, part, state, remote, info, progress)
+        except _RemoteChanged:
+            # 下载期间文件被替换（如发布了新版本）：已下载的部分作废，按新文件重新下载一次
+            logger.warning("下载期间服务器上的文件已变化，重新下载")
+            self._discard(part, state)
+            if self._hasher is not None:
+                self._hasher.reset()
+            remote = self._probe(url)
+            self._fetch(url, part, state, remote, None, progress)
+
+        hasher, self._hasher = self._hasher, None
+        if hasher is not None:
+            hasher.catch_up(part.stat().st_size)
+            self.sha256 = hasher.hexdigest()
+            self.hash_read_back = hasher.read_back
+            if sha256 and self.sha256 != sha256.lower():
+                # 内容有误，不保留以免下次从错误的数据续传
+                part.unlink(missing_ok=True)
+                state.unlink(missing_ok=True)
+                raise ChecksumError(f"下载内容校验失败（期望 {sha256}，实际 {self.sha256}）")
+
+    def _probe(self, url: str) -> _Remote:
+        """HEAD 请求获取总大小、是否支持 Range 与验证器；失败时各项为空。"""
+        try:
+            r = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            r.raise_for_status()
+        except requests.RequestException as e:
+            logger.debug(f"HEAD 请求失败，按不支持分段处理：{e}")
+            return _Remote(0, False, None, None)
+        return _Remote(
+            total=int(r.headers.get('Content-Length') or 0),
+            accept_ranges=r.headers.get('Accept-Ranges', '').lower() == 'bytes',
+            etag=r.headers.get('ETag'),
+            last_modified=r.headers.get('Last-Modified'),
+        )
+
+    @staticmethod
+    def _discard(part: Path, state: Path) -> None:
+        part.unlink(missing_ok=True)
+        state.unlink(missing_ok=True)
+
+    def _resumable(self, url: str, remote: _Remote, part: Path, state: Path) -> Optional[Dict]:
+        """返回可续传的 `.part.json` 内容；已有部分不能确认属于同一文件时删除并返回 None。"""
+        if not part.exists():
+            state.unlink(missing_ok=True)
+            return None
+        try:
+            info = json.loads(state.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            info = None
+        # 同一 url 且验证器一致，或（给出期望哈希时）大小与哈希一致
+        identities = [remote.identity(url)]
+        if self._expected:
+            identities.append(remote.identity(url, self._expected))
+        if (isinstance(info, dict) and remote.total and remote.validator
+                and any(all(info.get(k) == v for k, v in identity.items()) for identity in identities)):
+            return info
+        logger.info(f"已有的未完成下载与服务器上的文件不一致或无法校验，重新下载：{part.name}")
+        self._discard(part, state)
+        return None
+
+    def _fetch(self, url: str, part: Path, state: Path, remote: _Remote, info: Optional[Dict],
+               progress: Optional[ProgressCallback]) -> None:
+        if info is not None and 'segments' in info:
+            self._download_segmented(url, part, state, remote, progress, resume=info)
+        elif (remote.accept_ranges and remote.total >= self.segment_threshold and self.segments > 1
+              and not part.exists()):
+            self._download_segmented(url, part, state, remote, progress, resume=None)
+        else:
+            self._download_single(url, part, state, remote, progress)
+
+    def _stream(self, resp: requests.Response, f, progress: _Progress, limit: Optional[int] = None) -> int:
+        """把响应体写入 f，块大小按吞吐自适应（目标每块约 0.1 s），返回写入字节数。"""
+        chunk = self.min_chunk
+        written = 0
+        raw = resp.raw
+        while limit is None or written < limit:
+            if self.cancel_event.is_set():
+                raise DownloadCancelled()
+            size = chunk if limit is None else min(chunk, limit - written)
+            t0 = time.monotonic()
+            data = raw.read(size, decode_content=True)
+            if not data:
+                break
+            f.write(data)
+            written += len(data)
+            progress.add(len(data))
+            elapsed = time.monotonic() - t0
+            if elapsed < 0.05 and chunk < self.max_chunk:
+                chunk = min(chunk * 2, self.max_chunk)
+            elif elapsed > 0.2 and chunk > self.min_chunk:
+                chunk = max(chunk // 2, self.min_chunk)
+        return written
+
+    def _download_single(self, url: str, part: Path, state: Path, remote: _Remote,
+                         progress_cb: Optional[ProgressCallback]) -> None:
+        """单连接下载；中断后用 Range（带 If-Range）从 .part 已有长度处续传。"""
+        total = remote.total
+        validator = remote.validator
+        done = part.stat().st_size if part.exists() else 0
+        if not done:
+            state.write_text(json.dumps(remote.identity(url, self._expected)), encoding='utf-8')
+        progress = _Progress(total, done, progress_cb, self.progress_interval)
+        hasher = self._hasher
+        attempt = 0
+        while True:
+            headers = {}
+            if done:
+                headers['Range'] = f'bytes={done}-'
+                if validator:
+                    headers['If-Range'] = validator
+            try:
+                with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as resp:
+                    if resp.status_code == 416 and done and (not total or done >= total):
+                        break       # 已完整下载
+                    resp.raise_for_status()
+                    if done and resp.status_code != 206:
+                        # 不支持 Range，或 If-Range 不匹配（文件已变化）：返回的是完整的新内容
+                        logger.info("服务器未按断点续传返回（不支持 Range 或文件已变化），重新下载")
+                        done = 0
+                        progress.done = 0
+                        if hasher is not None:
+                            hasher.reset()
+                        changed = _Remote(int(resp.headers.get('Content-Length') or 0), remote.accept_ranges,
+                                          resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+                        total = progress.total = changed.total
+                        validator = changed.validator
+                        state.write_text(json.dumps(changed.identity(url, self._expected)), encoding='utf-8')
+                    if not total:
+                        length = int(resp.headers.get('Content-Length') or 0)
+                        total = progress.total = done + length if length else 0
+                    with open(part, 'ab' if done else 'wb') as f:
+                        if hasher is not None:
+                            # 续传时先补算已有部分，之后的数据随写入计算
+                            hasher.catch_up(done)
+                            f = _HashingWriter(f, hasher, done)
+                        done += self._stream(resp, f, progress)
+                if not total or done >= total:
+                    break
+                raise requests.ConnectionError(f"连接提前结束：{done}/{total}")
+            except NETWORK_ERRORS as e:
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+                done = progress.done = part.stat().st_size if part.exists() else 0
+                logger.warning(f"下载中断（{e}），{attempt}/{self.retries} 次续传，已下载 {done} 字节")
+                time.sleep(min(2 ** attempt * 0.2, 5))
+        progress.finish()
+
+    def _download_segmented(self, url: str, part: Path, state: Path, remote: _Remote,
+                            progress_cb: Optional[ProgressCallback], resume: Optional[Dict]) -> None:
+        """多段并行下载；每段进度写入 state 文件，中断后可续传。
+
+        resume 为已校验过的 `.part.json` 内容（None 为新下载）。分段请求带 If-Range，
+        文件已变化时抛出 _RemoteChanged。
+        """
+        total = remote.total
+        identity = remote.identity(url, self._expected)
+        validator = remote.validator
+        segments: List[List[int]]    # [起始, 结束(含), 已完成字节]
+        if resume is not None:
+            segments = resume['segments']
+        else:
+            size = -(-total // self.segments)
+            segments = [[s, min(s + size, total) - 1, 0] for s in range(0, total, size)]
+            with open(part, 'wb') as f:
+                f.truncate(total)
+        state_lock = threading.Lock()
+
+        def save_state():
+            with state_lock:
+                state.write_text(json.dumps({**identity, 'segments': segments}), encoding='utf-8')
+
+        save_state()
+        progress = _Progress(total, sum(s[2] for s in segments), progress_cb, self.progress_interval)
+        errors: List[BaseException] = []
+
+        hasher = self._hasher
+
+        def hashed_extent() -> int:
+            """从文件开头起连续下载完成的长度（分段按起始位置排列）。"""
+            for seg in segments:
+                if seg[2] < seg[1] - seg[0] + 1:
+                    return seg[0] + seg[2]
+            return total
+
+        class _SegmentWriter:
+            """写入文件指定偏移处，并同步更新分段进度。"""
+
+            def __init__(self, f, seg):
+                self.f = f
+                self.seg = seg
+
+            def write(self, data):
+                offset = self.seg[0] + self.seg[2]
+                self.f.write(data)
+                if hasher is not None:
+                    self.f.flush()      # 其他线程补读哈希时要能从文件读到
+                self.seg[2] += len(data)
+                if hasher is not None:
+                    hasher.feed(offset, data)
+
+        def worker(seg: List[int]) -> None:
+            attempt = 0
+            with open(part, 'r+b') as f:
+                while seg[0] + seg[2] <= seg[1]:
+                    start = seg[0] + seg[2]
+                    try:
+                        headers = {'Range': f'bytes={start}-{seg[1]}'}
+                        if validator:
+                            headers['If-Range'] = validator
+                        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as resp:
+                            if resp.status_code == 200 and validator:
+                                raise _RemoteChanged()
+                            if resp.status_code != 206:
+                                raise requests.HTTPError(f"分段请求未返回 206（{resp.status_code}）")
+                            f.seek(start)
+                            self._stream(resp, _SegmentWriter(f, seg), progress, limit=seg[1] - start + 1)
+                        save_state()
+                        if seg[0] + seg[2] <= seg[1]:
+                            raise requests.ConnectionError("分段连接提前结束")
+                    except NETWORK_ERRORS as e:
+                        attempt += 1
+                        save_state()
+                        if attempt > self.retries:
+                            errors.append(e)
+                            return
+                        time.sleep(min(2 ** attempt * 0.2, 5))
+                    except BaseException as e:
+                        save_state()
+                        errors.append(e)
+                        return
+            if hasher is not None:
+                # 本段完成：补算已连续完成、但不是按顺序到达的部分
+                hasher.catch_up(hashed_extent())
+
+        threads = [threading.Thread(target=worker, args=(seg,), daemon=True) for seg in segments
+                   if seg[0] + seg[2] <= seg[1]]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            raise errors[0]
+        progress.finish()
@@ -0,0 +1,143 @@
+"""鼠标事件队列与分发线程。
+
+Windows 会静默移除回调过慢的低级鼠标钩子，且钩子回调阻塞期间整个系统的指针输入都会卡顿。
+因此钩子回调只做两件事：记录时间戳、把原始事件写入预分配的有界环形队列；
+手势判断与按键注入由独立的 `Dispatcher` 线程完成。
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from loguru import logger
+
+# 队列满时的处理策略
+DROP_OLDEST = 'drop_oldest'   # 覆盖最旧的事件（默认，保证最新输入被处理）
+DROP_NEWEST = 'drop_newest'   # 丢弃新到的事件
+
+
+class EventQueue:
+    """有界、预分配的鼠标事件环形队列。
+
+    各字段存放在固定长度的并行列表中，入队只是几次下标赋值，不创建新容器。
+    """
+
+    def __init__(self, capacity: int = 256, overflow: str = DROP_OLDEST):
+        if capacity <= 0:
+            raise ValueError("capacity 必须大于 0")
+        if overflow not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"未知的溢出策略：{overflow}")
+        self.capacity = capacity
+        self.overflow = overflow
+        self._t = [0.0] * capacity
+        self._x = [0] * capacity
+        self._y = [0] * capacity
+        self._button = [None] * capacity
+        self._pressed = [False] * capacity
+        self._head = 0          # 下一个待读取的序号
+        self._tail = 0          # 下一个待写入的序号
+        self._lock = threading.Lock()
+        self.ready = threading.Event()
+
+        # 统计
+        self.pushed = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        """当前队列中的事件数。"""
+        return self._tail - self._head
+
+    def push(self, t: float, x: int, y: int, button, pressed: bool) -> bool:
+        """写入一个事件（供钩子回调调用）。队列已满且策略为丢弃新事件时返回 False。"""
+        with self._lock:
+            depth = self._tail - self._head
+            if depth >= self.capacity:
+                self.dropped += 1
+                if self.overflow == DROP_NEWEST:
+                    return False
+                self._head += 1
+                depth -= 1
+            i = self._tail % self.capacity
+            self._t[i] = t
+            self._x[i] = x
+            self._y[i] = y
+            self._button[i] = button
+            self._pressed[i] = pressed
+            self._tail += 1
+            self.pushed += 1
+            if depth + 1 > self.max_depth:
+                self.max_depth = depth + 1
+        self.ready.set()
+        return True
+
+    def pop(self):
+        """取出最旧的事件，返回 (t, x, y, button, pressed)；队列为空时返回 None。"""
+        with self._lock:
+            if self._head == self._tail:
+                return None
+            i = self._head % self.capacity
+            self._head += 1
+            return self._t[i], self._x[i], self._y[i], self._button[i], self._pressed[i]
+
+
+class Dispatcher:
+    """从 `EventQueue` 取事件并调用处理函数的后台线程。
+
+    处理函数签名：handler(t, x, y, button, pressed)，其中 t 为钩子入口的 perf_counter 时间戳。
+    """
+
+    def __init__(self, queue: EventQueue, handler: Callable, name: str = 'InputDispatcher'):
+        self.queue = queue
+        self.handler = handler
+        self.name = name
+        self.handled = 0
+        self.max_wait = 0.0     # 事件在队列中等待的最长时间（秒）
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        self.queue.ready.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        queue = self.queue
+        while not self._stop.is_set():
+            queue.ready.wait()
+            # 先清除再取，确保清除之后入队的事件会重新唤醒本线程
+            queue.ready.clear()
+            while True:
+                event = queue.pop()
+                if event is None:
+                    break
+                wait = time.perf_counter() - event[0]
+                if wait > self.max_wait:
+                    self.max_wait = wait
+                try:
+                    self.handler(*event)
+                except Exception as e:
+                    logger.exception(f"处理鼠标事件失败：{e}")
+                self.handled += 1
+
+    def stats(self) -> dict:
+        """返回队列深度、丢弃数、最长等待时间等统计。"""
+        q = self.queue
+        return {
+            'depth': q.depth,
+            'max_depth': q.max_depth,
+            'pushed': q.pushed,
+            'dropped': q.dropped,
+            'handled': self.handled,
+            'max_wait_ms': self.max_wait * 1000,
+        }
@@ -1,98 +1,236 @@
-import pyautogui
-import pygetwindow as gw
-from pynput import mouse
-from win32 import win32api
+import threading
+import time
 import conf_file as conf
 from loguru import logger
-# 屏幕分辨率
-screenX = win32api.GetSystemMetrics(0)
-screenY = win32api.GetSystemMetrics(1)
-
-# 缩放比率（读取配置，读取失败时默认为 1）
-scale_rate = conf.dpi_dict.get(conf.read_conf('General', 'DPI'), 1)
-
-# PowerPoint 全屏窗口标题（可配置）
-ppt_window_title = conf.read_conf('General', 'PPT_Title') or 'PowerPoint 幻灯片放映'
-
-# 用于判断是否点击到任务栏或 PPT 菜单区的阈值
-tsk_edge = screenY - 95 * scale_rate
-ppt_menuWL = 95 * scale_rate
-ppt_menuWR = screenX - 95 * scale_rate
-
-# 全局状态变量
-is_pressed = False
-pressed_menuButton = False
-pos_mouse = [0, 0]
-count = 0
+from window_tracker import WindowTracker
+from event_queue import Dispatcher, EventQueue
+from gesture import TapRecognizer
+from pipeline import InputPipeline
+from nav_scheduler import JUMP_KEYS, JUMP_NUMBER, NavScheduler
+from input_trace import TraceWriter
+from perf_stats import stats
+from screen_zones import ZoneMapManager
+from listener_params import LiveParams, dpi_scale, params_from_config, window_matcher, zone_specs
+from os_backend import get_backend
+from hook_arming import HookArmer
+import hot_log
+
+# 系统后端（Windows 或无界面的模拟后端），平台相关的库都由它按需导入
+backend = get_backend()
+
+# 热路径调试日志：默认关闭，开启后按消息类型限速
+hot_log.configure(
+    debug=conf.store.get_bool('Logging', 'Hot_Path_Debug'),
+    rate=conf.store.get_float('Logging', 'Hot_Path_Rate', 20),
+    sample_every=conf.store.get_int('Logging', 'Hot_Path_Sample', 1),
+)
+
+# 放映窗口状态跟踪器（后台刷新，热路径只读缓存）
+window_tracker = WindowTracker(
+    backend.window_source(),
+    window_matcher(conf.store),
+    ttl=conf.store.get_float('Performance', 'Window_Check_TTL', 0.5),
+    idle_ttl=conf.store.get_float('Performance', 'Idle_Window_Check', 1.0),
+)
+
+# 任务栏 / PPT 菜单排除区域：按显示器与各自 DPI 预先编译，显示器变化时自动重建
+# （General/DPI 在系统 DPI 不可用或关闭 Use_System_DPI 时作为显示器缩放比例）
+zones = ZoneMapManager(
+    backend.display_provider(
+        fallback_scale=dpi_scale(conf.store),
+        use_system_dpi=conf.store.get_bool('Zones', 'Use_System_DPI'),
+    ),
+    specs=zone_specs(conf.store),
+    poll_interval=conf.store.get_float('Zones', 'Display_Poll', 2.0),
+)
+
+# 监听参数快照（排除区域、窗口匹配器、按 DPI 缩放的手势阈值）：配置或显示器变化时整体替换
+params = LiveParams(params_from_config(conf.store, zones.zone_map))
+
+# 钩子事件队列：钩子回调只入队，判断与翻页在分发线程中进行
+event_queue = EventQueue(
+    capacity=conf.store.get_int('Performance', 'Event_Queue_Size', 256),
+    overflow=conf.read_conf('Performance', 'Event_Queue_Overflow') or 'drop_oldest',
+)
 
 
 def is_powerpoint_showing():
     """判断是否存在指定标题的 PowerPoint 放映窗口。
 
+    读取 `window_tracker` 的缓存状态，不再在调用时枚举窗口。
+
     返回:
         bool: 如果存在匹配窗口则为 True，否则为 False。
     """
-    try:
-        windows = gw.getWindowsWithTitle(ppt_window_title)
-        return len(windows) > 0
-    except Exception:
-        return False
+    return window_tracker.showing
+
+
+def is_excluded(x, y):
+    """判断坐标是否位于任务栏或 PPT 菜单区（在此按下不触发翻页）。"""
+    return params.current.is_excluded(x, y)
+
+
+# 点击 / 滑动识别器：每个事件读取一次 recognizer.params（即当前快照）
+recognizer = TapRecognizer(params=params.current)
+
+
+def apply_params(p):
+    """新快照生效：识别器与告警阈值直接替换，窗口匹配器变化时触发一次刷新。"""
+    recognizer.params = p
+    stats.slo = p.slo
+    window_tracker.set_matcher(p.matcher)
 
 
-def is_finger_not_slide(x, y):
-    """判断当前位置是否与按下时的位置相同（即未滑动）。"""
-    return [x, y] == pos_mouse
+params.subscribe(apply_params)
+# 显示器变化（后台轮询）时只替换快照中的排除区域；在锁内读取 zones.zone_map，总是取到最新的一份
+zones.on_rebuild = lambda _: params.update(lambda p: p._replace(zone_map=zones.zone_map))
 
+# 按键注入后端（默认直接 SendInput，无 pyautogui 的 PAUSE 等待）
+injector = backend.key_injector(
+    conf.read_conf('Performance', 'Key_Backend') or 'direct',
+    delay=conf.store.get_float('Performance', 'Key_Delay_ms') / 1000,
+)
 
-def is_not_click_taskbar(mouse_y):
-    """判断 y 坐标是否不在任务栏区域内（未点击任务栏）。"""
-    return mouse_y <= tsk_edge
 
+def create_scheduler():
+    """按 Navigation 配置创建翻页调度器；关闭时返回 None（在分发线程中逐次注入）。"""
+    if not conf.store.get_bool('Navigation', 'Scheduler'):
+        return None
+    jump = conf.read_conf('Navigation', 'Jump_Mode') or JUMP_KEYS
+    if jump not in (JUMP_KEYS, JUMP_NUMBER):
+        logger.error(f"未知的跳转方式 Navigation/Jump_Mode：{jump}，改用 {JUMP_KEYS}")
+        jump = JUMP_KEYS
+    if jump == JUMP_NUMBER:
+        logger.warning("翻页调度使用页码跳转：假定放映从第 1 页开始且只用触屏翻页，"
+                       "用翻页笔或键盘翻页后会跳到错误的页")
+    return NavScheduler(
+        injector.press_sequence,
+        coalesce_threshold=conf.store.get_int('Navigation', 'Coalesce_Threshold', 3),
+        max_in_flight=conf.store.get_int('Navigation', 'Max_In_Flight', 2),
+        settle=conf.store.get_float('Navigation', 'Settle_ms', 100) / 1000,
+        deadline=conf.store.get_float('Navigation', 'Stale_ms', 0) / 1000,
+        jump=jump,
+        stats=stats,
+    )
+
+
+scheduler = create_scheduler()
+# 翻页决策流水线：识别 → 放映判断 → 发送按键
+pipeline = InputPipeline(recognizer, is_powerpoint_showing, injector.press, stats=stats, scheduler=scheduler)
+
+# 输入轨迹录制器（配置 Performance/Trace_File 时启用）
+trace_writer = None
 
-def is_not_click_ppt_menubar(mouse_x):
-    """判断 x 坐标是否不在 PPT 菜单栏区域内（未点击菜单）。"""
-    return ppt_menuWL <= mouse_x <= ppt_menuWR
 
 
 def on_click(x, y, button, pressed):
-    """鼠标点击回调，处理左/右键按下和释放逻辑。
+    """鼠标钩子回调：只记录时间戳并写入事件队列，尽快返回。
 
-    左键按下：记录按下位置，判断是否点击到菜单或任务栏。
-    左键释放：若为点击（未滑动、未触发菜单、且为 PPT 放映），则发送空格键（翻页）。
-    右键按下：视作触发菜单按钮，避免误触发翻页。
+    button 为后端转换好的按键编码（gesture.BUTTON_*）。未在放映时（如放映刚结束、
+    钩子尚未卸载）直接跳过，不入队。
     """
-    global is_pressed, pos_mouse, pressed_menuButton, count
-    logger.debug(f"X坐标：{x}，Y坐标{y}，按键：{button}，按下：{pressed}\n")
-    if button == mouse.Button.right:
-        # 右键视作菜单操作，阻止翻页触发
-        pressed_menuButton = True
-        logger.debug("右键点击")
-
-    if button == mouse.Button.left:
-        if pressed:
-            # 按下：记录位置并判断是否点击菜单或任务栏
-            pos_mouse = [x, y]
-            if not is_not_click_ppt_menubar(x) or not is_not_click_taskbar(y):
-                pressed_menuButton = True
-                count = 2
-            else:
-                is_pressed = True
-        else:
-            # 释放：若为有效点击且为 PPT 放映，则发送空格翻页
-            if is_pressed and not pressed_menuButton and is_finger_not_slide(x, y) and is_powerpoint_showing():
-                pyautogui.press('space')
-                logger.debug("被点击并翻页")
-            elif count != 0:
-                count -= 1
-            if count == 0:
-                pressed_menuButton = False
-            is_pressed = False
+    if not window_tracker.showing:
+        hook.skipped += 1
+        return
+    hook.processed += 1
+    event_queue.push(time.perf_counter(), x, y, button, pressed)
+
+
+# 鼠标钩子：默认只在放映期间安装（放映窗口跟踪器通知放映开始 / 结束）
+hook = HookArmer(lambda: backend.create_listener(on_click))
+
+
+def handle_click(t, x, y, button, pressed):
+    """处理一个鼠标事件（在分发线程中运行）。
+
+    事件交给 `pipeline` 识别；识别为点击 / 滑动且正在放映时发送翻页键：
+    下一页为空格，上一页为左方向键。
+    """
+    hot_log.debug('mouse_event', "X坐标：{}，Y坐标{}，按键：{}，按下：{}", x, y, button, pressed)
+    if trace_writer is not None:
+        trace_writer.write(t, x, y, button, pressed)
+    if pipeline.handle(t, x, y, button, pressed):
+        hot_log.debug('page_turn', "识别到翻页手势")
+
+
+# 配置重新加载次数；重新加载串行进行，避免较早读到的配置最后生效
+# （可重入：重新加载中读取配置时若发现文件已变化，会经变化回调在同一线程再次进入）
+reload_count = 0
+_reload_lock = threading.RLock()
+
+
+def reload_config():
+    """配置变化后生成新的参数快照并一次性替换（窗口规则、排除区域、DPI 与手势阈值），无需重启监听."""
+    global reload_count
+    with _reload_lock:
+        reload_count += 1
+        count = reload_count
+        new = params_from_config(conf.store, zones.zone_map)
+        if reload_count != count:
+            # 读取途中发现配置文件又有变化，内层的重新加载已按最新配置生效
+            return
+        current = params.current
+        provider = None
+        if (new.scale, new.use_system_dpi) != (current.scale, current.use_system_dpi):
+            provider = backend.display_provider(fallback_scale=new.scale, use_system_dpi=new.use_system_dpi)
+        # 先按新配置重建排除区域（不单独通知），再连同其他参数一次替换
+        zones.rebuild(new.zone_specs, notify=False, provider=provider)
+        swapped = params.update(lambda p: new._replace(zone_map=zones.zone_map))
+    if swapped is not current:
+        logger.info(f"监听参数已更新（第 {swapped.version} 版）：缩放 {swapped.scale}，"
+                    f"点击半径 {swapped.touch_slop}，排除区域 {[s.size for s in swapped.zone_specs]}")
+
+
+def on_config_changed(store):
+    """ConfigStore 变化回调：设置窗口写入或重新加载配置文件后立即生效."""
+    reload_config()
+
+
+def stop():
+    """停止鼠标监听，使 main 返回（可在任意线程调用）."""
+    hook.stop()
 
 
 def main():
     """启动鼠标监听，运行主循环."""
-    with mouse.Listener(on_click=on_click) as listener:
-        listener.join()
+    global trace_writer
+    trace_path = conf.read_conf('Performance', 'Trace_File')
+    if trace_path:
+        trace_writer = TraceWriter(trace_path)
+        logger.info(f"正在录制输入轨迹：{trace_path}")
+    zones.start()
+    conf.store.add_listener(on_config_changed)
+    stats.start_reporter(conf.store.get_float('Performance', 'Stats_Log_Interval', 300))
+    dispatcher = Dispatcher(event_queue, handle_click)
+    dispatcher.start()
+    if scheduler is not None:
+        scheduler.start()
+        # 放映开始时页码为 1，结束后未知（number 跳转方式使用）
+        window_tracker.on_change(lambda state: scheduler.reset_position(1 if state.active else None))
+    try:
+        if conf.read_conf('Performance', 'Hook_Mode') == 'always':
+            window_tracker.start()
+            hook.arm()
+        else:
+            # 先注册回调再启动跟踪器：启动时已在放映则立即安装钩子
+            window_tracker.on_change(hook.on_state)
+            window_tracker.start()
+        hook.wait()
+    finally:
+        conf.store.remove_listener(on_config_changed)
+        window_tracker.stop()
+        dispatcher.stop()
+        if scheduler is not None:
+            scheduler.stop()
+            logger.info(f"翻页调度统计：{scheduler.stats()}")
+        zones.stop()
+        stats.stop_reporter()
+        logger.info(f"鼠标钩子统计：{hook.stats()}")
+        logger.info(f"事件队列统计：{dispatcher.stats()}")
+        logger.info(f"性能统计：{stats.summary()}")
+        if trace_writer is not None:
+            trace_writer.close()
+            logger.info(f"轨迹录制结束，共 {trace_writer.count} 个事件")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,157 @@
+"""点击 / 滑动手势识别器。
+
+取代 func.py 中基于全局变量的判断逻辑：状态全部保存在 `__slots__` 对象上，
+事件处理只做整数比较，稳态下不分配任何新对象；输入是纯粹的事件序列，
+因此结果可复现，也能脱离 Windows 直接测试。
+
+识别阈值与排除区域判断放在不可变的参数对象 `params` 中，每个事件只读取一次；
+配置变化时整体替换该属性（单次赋值），识别线程无需加锁。
+"""
+
+from typing import Callable, NamedTuple, Optional
+
+# 按键编码（由调用方把平台的按键对象映射为整数）
+BUTTON_OTHER = 0
+BUTTON_LEFT = 1
+BUTTON_RIGHT = 2
+
+# 识别结果
+ACTION_NONE = 0
+ACTION_NEXT = 1   # 下一页
+ACTION_PREV = 2   # 上一页
+
+# 状态机
+STATE_IDLE = 0        # 空闲
+STATE_PRESSED = 1     # 左键已在有效区域按下
+STATE_EXCLUDED = 2    # 左键在菜单 / 任务栏区域按下
+
+# 在菜单区按下时需要忽略的释放次数：本次点击 + 随后在弹出菜单中的一次选择
+MENU_SUPPRESS_RELEASES = 2
+
+
+def _never_excluded(x: int, y: int) -> bool:
+    return False
+
+
+class GestureParams(NamedTuple):
+    """识别参数（不可变）。
+
+    TapRecognizer 只读取 slop_sq / tap_timeout / swipe_enabled / swipe_min_distance 与
+    is_excluded(x, y)，具有这些属性的其他不可变对象（如 listener_params.ListenerParams）也可使用。
+    """
+    touch_slop: int = 8
+    slop_sq: int = 64
+    tap_timeout: float = 1.0
+    swipe_enabled: bool = False
+    swipe_min_distance: int = 120
+    is_excluded: Callable[[int, int], bool] = _never_excluded
+
+
+def gesture_params(touch_slop: int = 8, tap_timeout: float = 1.0, swipe_enabled: bool = False,
+                   swipe_min_distance: int = 120,
+                   is_excluded: Optional[Callable[[int, int], bool]] = None) -> GestureParams:
+    return GestureParams(touch_slop, touch_slop * touch_slop, tap_timeout, swipe_enabled,
+                         swipe_min_distance, is_excluded or _never_excluded)
+
+
+class TapRecognizer:
+    """把原始鼠标事件识别为翻页动作的状态机。
+
+    - 左键按下后在 `touch_slop` 半径内释放、且按住不超过 `tap_timeout` 秒，视为点击 → 下一页；
+    - 启用滑动时，水平位移超过 `swipe_min_distance` 且明显大于竖直位移：
+      向左滑 → 下一页，向右滑 → 上一页；
+    - 在排除区域（菜单 / 任务栏）按下时忽略本次及下一次释放；右键同样忽略下一次释放。
+    """
+
+    __slots__ = ('params', 'state', 'down_x', 'down_y', 'down_t', 'suppress_releases',
+                 'taps', 'swipes', 'rejected', 'suppressed')
+
+    def __init__(self, touch_slop: int = 8, tap_timeout: float = 1.0,
+                 swipe_enabled: bool = False, swipe_min_distance: int = 120,
+                 is_excluded: Optional[Callable[[int, int], bool]] = None,
+                 params: Optional[GestureParams] = None):
+        """
+        参数:
+            touch_slop: 判定为点击的最大位移（像素）。
+            tap_timeout: 判定为点击的最长按住时间（秒），0 表示不限制。
+            swipe_enabled: 是否识别左右滑动。
+            swipe_min_distance: 判定为滑动的最小水平位移（像素）。
+            is_excluded: 判断坐标是否位于菜单 / 任务栏等排除区域的函数。
+            params: 直接给出参数对象（忽略以上各项），之后可整体替换 `params` 属性。
+        """
+        self.params = params or gesture_params(touch_slop, tap_timeout, swipe_enabled,
+                                               swipe_min_distance, is_excluded)
+        self.state = STATE_IDLE
+        self.down_x = 0
+        self.down_y = 0
+        self.down_t = 0.0
+        self.suppress_releases = 0
+        self.taps = 0
+        self.swipes = 0
+        self.rejected = 0
+        self.suppressed = 0     # 在菜单 / 任务栏排除区域内按下的次数
+
+    def reset(self) -> None:
+        """回到空闲状态（统计保留）。"""
+        self.state = STATE_IDLE
+        self.suppress_releases = 0
+
+    def feed(self, t: float, x: int, y: int, button: int, pressed: bool) -> int:
+        """输入一个事件，返回 ACTION_* 识别结果。
+
+        参数:
+            t: 事件时间戳（秒，单调时钟）。
+            x, y: 事件坐标。
+            button: BUTTON_* 编码。
+            pressed: True 为按下，False 为释放。
+        """
+        if button == BUTTON_RIGHT:
+            # 右键视作菜单操作，忽略下一次左键点击
+            if self.suppress_releases == 0:
+                self.suppress_releases = 1
+            return ACTION_NONE
+        if button != BUTTON_LEFT:
+            return ACTION_NONE
+        # 每个事件只读取一次参数，配置在其他线程中替换时也不会混用新旧参数
+        p = self.params
+
+        if pressed:
+            self.down_x = x
+            self.down_y = y
+            self.down_t = t
+            if p.is_excluded(x, y):
+                self.state = STATE_EXCLUDED
+                self.suppressed += 1
+                self.suppress_releases = MENU_SUPPRESS_RELEASES
+            else:
+                self.state = STATE_PRESSED
+            return ACTION_NONE
+
+        # ---------- 释放 ----------
+        state = self.state
+        self.state = STATE_IDLE
+        if self.suppress_releases:
+            self.suppress_releases -= 1
+            self.rejected += 1
+            return ACTION_NONE
+        if state != STATE_PRESSED:
+            return ACTION_NONE
+
+        dx = x - self.down_x
+        dy = y - self.down_y
+        if dx * dx + dy * dy <= p.slop_sq:
+            if p.tap_timeout and t - self.down_t > p.tap_timeout:
+                self.rejected += 1
+                return ACTION_NONE
+            self.taps += 1
+            return ACTION_NEXT
+
+        if p.swipe_enabled:
+            adx = dx if dx >= 0 else -dx
+            ady = dy if dy >= 0 else -dy
+            if adx >= p.swipe_min_distance and adx > ady + ady:
+                self.swipes += 1
+                return ACTION_NEXT if dx < 0 else ACTION_PREV
+
+        self.rejected += 1
+        return ACTION_NONE
@@ -0,0 +1,102 @@
+"""只在放映期间安装全局鼠标钩子。
+
+原先 `func.main` 在整个进程生命周期内都挂着 pynput 全局鼠标钩子，即使没有打开演示文稿，
+本机的每一次点击也都要经过 Python 回调，全天增加系统输入延迟与 CPU 唤醒。
+这里由放映窗口跟踪器（低频后台轮询）在放映开始时安装钩子、放映结束时卸载钩子，
+并统计钩子安装的累计时长、安装次数，以及钩子收到的事件中被处理 / 跳过的数量。
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from loguru import logger
+
+from os_backend import InputListener
+from window_tracker import SlideshowState
+
+
+class HookArmer:
+    """按放映状态安装 / 卸载鼠标钩子。
+
+    参数:
+        create_listener: 创建（未启动的）鼠标钩子，每次安装时调用一次。
+    """
+
+    def __init__(self, create_listener: Callable[[], InputListener]):
+        self._create = create_listener
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self.listener: Optional[InputListener] = None
+        self.arm_count = 0
+        # 钩子收到的事件：放映中交给队列处理的 / 未在放映而直接丢弃的（仅由钩子线程写入）
+        self.processed = 0
+        self.skipped = 0
+        self._armed_total = 0.0
+        self._armed_since: Optional[float] = None
+
+    @property
+    def armed(self) -> bool:
+        return self.listener is not None
+
+    @property
+    def armed_seconds(self) -> float:
+        """钩子安装的累计时长（秒），包括当前这一次。"""
+        since = self._armed_since
+        return self._armed_total + (time.monotonic() - since if since is not None else 0.0)
+
+    def on_state(self, state: SlideshowState) -> None:
+        """放映状态变化回调（在窗口跟踪线程中调用）。"""
+        if state.active:
+            self.arm()
+        else:
+            self.disarm()
+
+    def arm(self) -> None:
+        """安装钩子；已安装或已停止时不做任何事。"""
+        with self._lock:
+            if self.listener is not None or self._done.is_set():
+                return
+            listener = self._create()
+            listener.start()
+            self.listener = listener
+            self._armed_since = time.monotonic()
+            self.arm_count += 1
+        threading.Thread(target=self._watch, args=(listener,), name='HookWatch', daemon=True).start()
+        logger.info("检测到放映，已安装鼠标钩子")
+
+    def disarm(self) -> None:
+        """卸载钩子；未安装时不做任何事。"""
+        with self._lock:
+            listener, self.listener = self.listener, None
+            if listener is None:
+                return
+            self._armed_total += time.monotonic() - self._armed_since
+            self._armed_since = None
+        listener.stop()
+        listener.join(1)
+        logger.info(f"已卸载鼠标钩子（累计安装 {self.armed_seconds:.0f} 秒）")
+
+    def _watch(self, listener: InputListener) -> None:
+        # 钩子不是因为卸载而自行结束（如回调返回 False、脚本回放完毕）时，与原先一样结束监听
+        listener.join()
+        if self.listener is listener:
+            self._done.set()
+
+    def wait(self) -> None:
+        """阻塞直到 `stop` 被调用或已安装的钩子自行结束，然后卸载钩子。"""
+        self._done.wait()
+        self.disarm()
+
+    def stop(self) -> None:
+        """结束 `wait`（可在任意线程调用）。"""
+        self._done.set()
+
+    def stats(self) -> dict:
+        return {
+            'armed': self.armed,
+            'arm_count': self.arm_count,
+            'armed_seconds': round(self.armed_seconds, 1),
+            'processed': self.processed,
+            'skipped': self.skipped,
+        }
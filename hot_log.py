@@ -0,0 +1,101 @@
+"""热路径（鼠标事件处理）专用的日志接口。
+
+- 调试日志默认关闭，关闭时每次调用只做一次布尔判断，不格式化任何字符串；
+- 开启后消息通过 loguru 的参数延迟格式化（`"{}"` 占位符），只有真正输出时才拼接；
+- 每种消息类型独立限速（令牌桶）并可按 1/N 采样，被丢弃的条数在下一次输出时附带报告。
+
+日志 sink 本身的异步写入与后台压缩见 main.configure_logging。
+"""
+
+import threading
+import time
+from typing import Dict
+
+from loguru import logger
+
+# 热路径调试日志开关（configure 设置）
+enabled = False
+
+
+class _Bucket:
+    __slots__ = ('tokens', 'last', 'seen', 'suppressed')
+
+    def __init__(self, burst: float):
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.seen = 0
+        self.suppressed = 0
+
+
+class RateLimiter:
+    """按消息类型独立的令牌桶限速 + 采样。
+
+    参数:
+        rate: 每种消息每秒最多输出的条数。
+        burst: 允许的突发条数。
+        sample_every: 每 N 条只考虑 1 条（1 为不采样）。
+    """
+
+    def __init__(self, rate: float = 20.0, burst: float = 20.0, sample_every: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.sample_every = max(1, sample_every)
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> int:
+        """判断本条是否输出。
+
+        返回:
+            -1 表示丢弃；否则返回自上次输出以来被丢弃的条数（>= 0）。
+        """
+        with self._lock:
+            b = self._buckets.get(key)
+            if b is None:
+                b = self._buckets[key] = _Bucket(self.burst)
+            b.seen += 1
+            if b.seen % self.sample_every:
+                b.suppressed += 1
+                return -1
+            now = time.monotonic()
+            b.tokens = min(self.burst, b.tokens + (now - b.last) * self.rate)
+            b.last = now
+            if b.tokens < 1:
+                b.suppressed += 1
+                return -1
+            b.tokens -= 1
+            dropped, b.suppressed = b.suppressed, 0
+            return dropped
+
+    def suppressed_total(self) -> int:
+        with self._lock:
+            return sum(b.suppressed for b in self._buckets.values())
+
+
+limiter = RateLimiter()
+
+
+def configure(debug: bool = False, rate: float = 20.0, sample_every: int = 1) -> None:
+    """设置热路径调试日志开关、每类消息每秒上限与采样间隔。"""
+    global enabled, limiter
+    limiter = RateLimiter(rate, max(1.0, rate), sample_every)
+    enabled = debug
+
+
+def debug(key: str, message: str, *args) -> None:
+    """输出限速的热路径调试日志。
+
+    参数:
+        key: 消息类型（限速按类型独立计算）。
+        message: loguru 格式串，使用 "{}" 占位，仅在真正输出时格式化。
+        *args: 格式化参数。
+    """
+    if not enabled:
+        return
+    dropped = limiter.allow(key)
+    if dropped < 0:
+        return
+    if dropped:
+        logger.opt(depth=1).debug(message + "（此前 {} 条同类日志已限流）", *args, dropped)
+    else:
+        logger.opt(depth=1).debug(message, *args)
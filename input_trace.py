@@ -0,0 +1,153 @@
+"""输入事件轨迹：录制、读取、回放与合成。
+
+轨迹文件为定长二进制记录，便于 mmap 直接读取：
+
+    文件头（16 字节）：魔数 b'PPTTRACE' | 版本 u16 | 记录长度 u16 | 保留 4 字节
+    记录（20 字节）  ：时间戳 f64（perf_counter 秒）| x i32 | y i32 | 按键 u8 | 按下 u8 | 填充 2 字节
+
+按键使用 gesture.BUTTON_* 编码。回放时把事件按原速或加速送入 `InputPipeline`，
+统计吞吐量与单事件决策延迟的 p50 / p95 / p99。
+"""
+
+import mmap
+import random
+import struct
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from gesture import BUTTON_LEFT, BUTTON_RIGHT
+from pipeline import InputPipeline
+
+MAGIC = b'PPTTRACE'
+VERSION = 1
+HEADER = struct.Struct('<8sHH4x')
+RECORD = struct.Struct('<diiBB2x')
+
+Event = Tuple[float, int, int, int, bool]
+
+
+class TraceWriter:
+    """轨迹录制器：按定长记录追加写入（带缓冲）。"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._f = open(self.path, 'wb')
+        self._f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self.count = 0
+
+    def write(self, t: float, x: int, y: int, button: int, pressed: bool) -> None:
+        self._f.write(RECORD.pack(t, x, y, button, 1 if pressed else 0))
+        self.count += 1
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_trace(path: Union[str, Path]) -> List[Event]:
+    """用 mmap 读取轨迹文件，返回事件列表。"""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, size = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"不是有效的轨迹文件：{path}")
+            if version != VERSION or size != RECORD.size:
+                raise ValueError(f"不支持的轨迹版本：{version}（记录长度 {size}）")
+            body = memoryview(mm)[HEADER.size:]
+            usable = len(body) - len(body) % RECORD.size
+            try:
+                return [(t, x, y, b, bool(p)) for t, x, y, b, p in RECORD.iter_unpack(body[:usable])]
+            finally:
+                body.release()
+
+
+def write_trace(path: Union[str, Path], events: Iterable[Event]) -> int:
+    """把事件序列写成轨迹文件，返回写入的事件数。"""
+    with TraceWriter(path) as w:
+        for e in events:
+            w.write(*e)
+        return w.count
+
+
+def synthetic_events(n_gestures: int, rate_hz: float = 20.0, width: int = 1920, height: int = 1080,
+                     seed: int = 0) -> Iterator[Event]:
+    """生成合成事件流，用于压力测试。
+
+    每个手势为一次按下 + 释放，平均每秒 `rate_hz` 个手势；
+    组成约为：普通点击 70%、带抖动的点击 15%、菜单区点击 5%、右键 5%、滑动 5%。
+    """
+    rng = random.Random(seed)
+    t = 0.0
+    interval = 1.0 / rate_hz
+    for _ in range(n_gestures):
+        kind = rng.random()
+        x = rng.randint(200, width - 200)
+        y = rng.randint(100, height - 200)
+        hold = rng.uniform(0.03, 0.15)
+        if kind < 0.70:
+            x2, y2, button = x, y, BUTTON_LEFT
+        elif kind < 0.85:
+            x2, y2, button = x + rng.randint(-3, 3), y + rng.randint(-3, 3), BUTTON_LEFT
+        elif kind < 0.90:
+            x = x2 = rng.randint(0, 60)
+            y2, button = y, BUTTON_LEFT
+        elif kind < 0.95:
+            x2, y2, button = x, y, BUTTON_RIGHT
+        else:
+            x2, y2, button = x + rng.choice((-1, 1)) * rng.randint(150, 400), y, BUTTON_LEFT
+        yield t, x, y, button, True
+        yield t + hold, x2, y2, button, False
+        t += interval * rng.uniform(0.5, 1.5)
+
+
+def _percentile(sorted_values: List[int], q: float) -> int:
+    if not sorted_values:
+        return 0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def replay(events: List[Event], pipeline: InputPipeline, speed: float = 0.0) -> dict:
+    """把事件送入流水线并统计延迟。
+
+    参数:
+        events: 事件列表（时间戳单调递增）。
+        pipeline: 待测的翻页决策流水线。
+        speed: 回放倍速；1.0 为原速，2.0 为两倍速，0 表示不等待、尽快回放。
+
+    返回:
+        包含事件数、注入次数、吞吐量（事件/秒）与延迟百分位（微秒）的字典。
+    """
+    latencies = [0] * len(events)
+    handle = pipeline.handle
+    clock = time.perf_counter_ns
+    injected_before = pipeline.injected
+    t0 = events[0][0] if events else 0.0
+    start = time.perf_counter()
+    for i, (t, x, y, button, pressed) in enumerate(events):
+        if speed > 0:
+            delay = (t - t0) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        begin = clock()
+        handle(t, x, y, button, pressed)
+        latencies[i] = clock() - begin
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'events': len(events),
+        'injected': pipeline.injected - injected_before,
+        'elapsed_s': elapsed,
+        'throughput_eps': len(events) / elapsed if elapsed else 0.0,
+        'p50_us': _percentile(latencies, 0.50) / 1000,
+        'p95_us': _percentile(latencies, 0.95) / 1000,
+        'p99_us': _percentile(latencies, 0.99) / 1000,
+        'max_us': (latencies[-1] if latencies else 0) / 1000,
+    }
@@ -0,0 +1,205 @@
+"""翻页按键注入后端。
+
+`pyautogui.press` 每次调用都会检查失效保护角落并默认 sleep `PAUSE`（0.1 s），
+这些时间直接叠加在每次翻页上。这里把按键注入抽象为可替换的后端：
+
+- direct   ：直接调用 Win32 SendInput，一次提交按下 + 抬起，无额外等待（Windows 默认）
+- pynput   ：pynput.keyboard.Controller
+- pyautogui：旧实现，保留用于对比
+- recording：只在内存中记录按键，供测试 / 回放使用（任何平台可用）
+"""
+
+import sys
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from loguru import logger
+
+
+class KeyInjector:
+    """按键注入后端接口。
+
+    参数:
+        delay: 连续发送多个按键时，相邻按键之间的间隔（秒）。
+    """
+
+    name = 'base'
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.count = 0
+
+    def _press(self, key: str) -> None:
+        raise NotImplementedError
+
+    def press(self, key: str) -> None:
+        """发送一次按键（按下 + 抬起）。"""
+        self._press(key)
+        self.count += 1
+
+    def press_sequence(self, keys: Iterable[str]) -> None:
+        """依次发送多个按键，相邻按键之间等待 `delay` 秒。"""
+        first = True
+        for key in keys:
+            if not first and self.delay > 0:
+                time.sleep(self.delay)
+            self.press(key)
+            first = False
+
+
+class RecordingInjector(KeyInjector):
+    """把按键记录在内存中的后端：(perf_counter 时间戳, 按键名)。"""
+
+    name = 'recording'
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(delay)
+        self.keys: List[Tuple[float, str]] = []
+
+    def _press(self, key: str) -> None:
+        self.keys.append((time.perf_counter(), key))
+
+    def counts(self) -> Dict[str, int]:
+        result: Dict[str, int] = {}
+        for _, key in self.keys:
+            result[key] = result.get(key, 0) + 1
+        return result
+
+    def clear(self) -> None:
+        self.keys.clear()
+
+
+class PyAutoGuiInjector(KeyInjector):
+    """pyautogui 后端（旧实现）。"""
+
+    name = 'pyautogui'
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(delay)
+        import pyautogui
+        self._pyautogui = pyautogui
+
+    def _press(self, key: str) -> None:
+        self._pyautogui.press(key)
+
+
+class PynputInjector(KeyInjector):
+    """pynput 键盘后端。"""
+
+    name = 'pynput'
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(delay)
+        from pynput import keyboard
+        self._controller = keyboard.Controller()
+        self._keys = {
+            'space': keyboard.Key.space,
+            'left': keyboard.Key.left,
+            'right': keyboard.Key.right,
+            'enter': keyboard.Key.enter,
+            'f24': keyboard.KeyCode.from_vk(0x87),
+        }
+
+    def _press(self, key: str) -> None:
+        k = self._keys.get(key, key)
+        self._controller.press(k)
+        self._controller.release(k)
+
+
+class DirectInjector(KeyInjector):
+    """直接调用 SendInput 的 Windows 后端。
+
+    每个按键的 INPUT 数组（按下 + 抬起）首次使用时构建并缓存，之后每次注入只有一次系统调用。
+    """
+
+    name = 'direct'
+
+    # 按键名 -> (虚拟键码, 是否扩展键)
+    VK_CODES = {
+        'space': (0x20, False),
+        'enter': (0x0D, False),
+        'left': (0x25, True),
+        'right': (0x27, True),
+        'pageup': (0x21, True),
+        'pagedown': (0x22, True),
+        'f24': (0x87, False),
+        **{str(d): (0x30 + d, False) for d in range(10)},
+    }
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(delay)
+        if sys.platform != 'win32':
+            raise OSError("DirectInjector 仅支持 Windows")
+        import ctypes
+        from ctypes import wintypes
+
+        ULONG_PTR = wintypes.WPARAM
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                        ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ULONG_PTR)]
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                        ('time', wintypes.DWORD), ('dwExtraInfo', ULONG_PTR)]
+
+        class HARDWAREINPUT(ctypes.Structure):
+            _fields_ = [('uMsg', wintypes.DWORD), ('wParamL', wintypes.WORD), ('wParamH', wintypes.WORD)]
+
+        class _INPUTUNION(ctypes.Union):
+            _fields_ = [('mi', MOUSEINPUT), ('ki', KEYBDINPUT), ('hi', HARDWAREINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [('type', wintypes.DWORD), ('u', _INPUTUNION)]
+
+        self._ctypes = ctypes
+        self._INPUT = INPUT
+        self._KEYBDINPUT = KEYBDINPUT
+        self._send_input = ctypes.windll.user32.SendInput
+        self._cache: Dict[str, object] = {}
+
+    def _build(self, key: str):
+        try:
+            vk, extended = self.VK_CODES[key]
+        except KeyError:
+            raise ValueError(f"DirectInjector 不支持的按键：{key}") from None
+        INPUT_KEYBOARD, KEYEVENTF_EXTENDEDKEY, KEYEVENTF_KEYUP = 1, 0x0001, 0x0002
+        flags = KEYEVENTF_EXTENDEDKEY if extended else 0
+        arr = (self._INPUT * 2)()
+        for i, up in enumerate((0, KEYEVENTF_KEYUP)):
+            arr[i].type = INPUT_KEYBOARD
+            arr[i].u.ki = self._KEYBDINPUT(vk, 0, flags | up, 0, 0)
+        self._cache[key] = arr
+        return arr
+
+    def _press(self, key: str) -> None:
+        arr = self._cache.get(key) or self._build(key)
+        sent = self._send_input(2, arr, self._ctypes.sizeof(self._INPUT))
+        if sent != 2:
+            logger.warning(f"SendInput 只发送了 {sent}/2 个事件（按键：{key}）")
+
+
+BACKENDS = {
+    DirectInjector.name: DirectInjector,
+    PynputInjector.name: PynputInjector,
+    PyAutoGuiInjector.name: PyAutoGuiInjector,
+    RecordingInjector.name: RecordingInjector,
+}
+
+
+def create_injector(name: str = 'direct', delay: float = 0.0) -> KeyInjector:
+    """按名称创建注入后端；不可用时依次回退到 pynput、pyautogui。"""
+    for candidate in (name, PynputInjector.name, PyAutoGuiInjector.name):
+        cls = BACKENDS.get(candidate)
+        if cls is None:
+            logger.warning(f"未知的按键注入后端：{candidate}")
+            continue
+        try:
+            injector = cls(delay)
+        except Exception as e:
+            logger.warning(f"按键注入后端 {candidate} 不可用：{e}")
+            continue
+        if candidate != name:
+            logger.info(f"按键注入后端回退为：{candidate}")
+        return injector
+    raise RuntimeError("没有可用的按键注入后端")
@@ -0,0 +1,130 @@
+"""监听端的参数快照：运行中修改设置无需重启。
+
+原先 func.py 在导入时把 DPI、放映窗口标题、排除宽度等读成模块全局变量，设置窗口里的修改
+要重启程序才生效。这里把监听用到的参数预先计算成一个不可变对象 `ListenerParams`：
+
+- 排除区域（已按显示器与 DPI 编译的 ZoneMap）、放映窗口匹配器；
+- 按 DPI 缩放后的手势阈值（可直接作为 TapRecognizer 的 `params`）、翻页延迟告警阈值。
+
+`LiveParams` 持有当前快照。配置变化（ConfigStore 的变化回调）或显示器变化时，在锁内基于
+当前快照生成新快照并一次性替换，再通知订阅方；热路径只读一次属性，不加锁、不读配置。
+"""
+
+import re
+import threading
+from typing import Callable, List, NamedTuple, Tuple
+
+from loguru import logger
+
+from conf_file import ConfigStore, dpi_dict
+from screen_zones import ZONE_EXCLUDED, ZoneMap, ZoneSpec
+from title_matcher import TitleMatcher, matcher_from_config
+
+
+class ListenerParams(NamedTuple):
+    """监听参数快照（不可变，整体替换）。"""
+    version: int
+    scale: float                        # General/DPI 对应的缩放比例（系统 DPI 不可用时的显示器缩放）
+    use_system_dpi: bool
+    zone_specs: Tuple[ZoneSpec, ...]
+    zone_map: ZoneMap
+    matcher: TitleMatcher
+    # 手势阈值（已按 scale 缩放），字段名与 gesture.GestureParams 一致
+    touch_slop: int
+    slop_sq: int
+    tap_timeout: float
+    swipe_enabled: bool
+    swipe_min_distance: int
+    slo: float                          # 翻页总延迟告警阈值（秒）
+
+    def is_excluded(self, x: int, y: int) -> bool:
+        """坐标是否位于任务栏或 PPT 菜单区（在此按下不触发翻页）。"""
+        return self.zone_map.hit_test(x, y) == ZONE_EXCLUDED
+
+
+# ------------------------------------------------------------------
+# 从配置生成
+# ------------------------------------------------------------------
+def dpi_scale(store: ConfigStore) -> float:
+    """General/DPI 对应的缩放比例，读取失败时为 1。"""
+    return dpi_dict.get(store.get('General', 'DPI'), 1)
+
+
+def window_matcher(store: ConfigStore) -> TitleMatcher:
+    """按配置编译放映窗口匹配器（PPT_Title + Window_Patterns，配置未变化时返回缓存）。"""
+    title = store.get('General', 'PPT_Title') or 'PowerPoint 幻灯片放映'
+    try:
+        return matcher_from_config(title, store.get('General', 'Window_Patterns') or '')
+    except (re.error, ValueError) as e:
+        logger.error(f"窗口规则 Window_Patterns 无效，只按 PPT_Title 匹配：{e}")
+        return matcher_from_config(title)
+
+
+def zone_specs(store: ConfigStore) -> Tuple[ZoneSpec, ...]:
+    """按配置生成排除区域定义（底部任务栏、左右两侧放映菜单）。"""
+    return (
+        ZoneSpec(ZONE_EXCLUDED, 'bottom', store.get_int('Zones', 'Taskbar_Height', 95)),
+        ZoneSpec(ZONE_EXCLUDED, 'left', store.get_int('Zones', 'Menu_Width', 95)),
+        ZoneSpec(ZONE_EXCLUDED, 'right', store.get_int('Zones', 'Menu_Width', 95)),
+    )
+
+
+def params_from_config(store: ConfigStore, zone_map: ZoneMap, version: int = 0) -> ListenerParams:
+    """读取配置生成完整快照（排除区域须已按同一配置编译为 zone_map）。"""
+    scale = dpi_scale(store)
+    touch_slop = int(store.get_int('Gesture', 'Touch_Slop', 8) * scale)
+    return ListenerParams(
+        version=version,
+        scale=scale,
+        use_system_dpi=store.get_bool('Zones', 'Use_System_DPI'),
+        zone_specs=zone_specs(store),
+        zone_map=zone_map,
+        matcher=window_matcher(store),
+        touch_slop=touch_slop,
+        slop_sq=touch_slop * touch_slop,
+        tap_timeout=store.get_float('Gesture', 'Tap_Timeout', 1.0),
+        swipe_enabled=store.get_bool('Gesture', 'Swipe_Enabled'),
+        swipe_min_distance=int(store.get_int('Gesture', 'Swipe_Min_Distance', 120) * scale),
+        slo=store.get_float('Performance', 'Inject_SLO_ms', 50) / 1000,
+    )
+
+
+# ------------------------------------------------------------------
+# 当前快照
+# ------------------------------------------------------------------
+class LiveParams:
+    """持有当前参数快照。
+
+    读取方只读 `current`（单次属性读取，无锁）；写入方通过 `update` 在锁内由当前快照生成
+    新快照，内容有变化时替换、版本号加 1，并在锁内依次调用订阅回调（保证按替换顺序送达）。
+    回调中不要读取配置或等待其他线程。
+    """
+
+    def __init__(self, initial: ListenerParams):
+        self.current = initial
+        self.swaps = 0
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[ListenerParams], None]] = []
+
+    def subscribe(self, callback: Callable[[ListenerParams], None]) -> None:
+        """注册快照替换回调 callback(新快照)，注册时立即以当前快照调用一次。"""
+        with self._lock:
+            self._subscribers.append(callback)
+            callback(self.current)
+
+    def update(self, change: Callable[[ListenerParams], ListenerParams]) -> ListenerParams:
+        """以 change(当前快照) 的结果替换当前快照，返回替换后的快照（无变化时返回原快照）。"""
+        with self._lock:
+            old = self.current
+            new = change(old)._replace(version=old.version)
+            if new == old:
+                return old
+            new = new._replace(version=old.version + 1)
+            self.current = new
+            self.swaps += 1
+            for callback in self._subscribers:
+                try:
+                    callback(new)
+                except Exception as e:
+                    logger.error(f"参数快照回调出错：{e}")
+            return new
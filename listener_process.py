@@ -0,0 +1,341 @@
+"""在独立进程中运行鼠标钩子与手势识别。
+
+GUI 进程（托盘、设置对话框、更新解压）与钩子共用一个 GIL 时，界面上的重活会推迟翻页。
+开启 Performance/Listener_Mode = process 后：
+
+- 子进程运行 func.main（钩子 → 队列 → 识别 → 翻页），不加载任何窗口；
+- 每次翻页的分阶段延迟写入共享内存环形缓冲区，计数器与心跳写在其头部，
+  GUI 进程定期读取并合并到自己的 perf_stats.stats，托盘“性能统计”照常可用；
+- 配置变化通过控制管道通知子进程；
+- 子进程意外退出时由监督线程按退避间隔重启，短时间内频繁崩溃则放弃并记录错误。
+"""
+
+import multiprocessing
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait as wait_connections
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+# 头部：写入序号、子进程 PID、心跳时间（time.time）
+_HEADER = struct.Struct('<QQd')
+# 头部的两部分各只有一个写入方：序号由记录写入方更新，PID 与心跳由计数器发布方更新
+_SEQ = struct.Struct('<Q')
+_BEAT = struct.Struct('<Qd')
+# 计数器（子进程周期性整体写入）
+COUNTER_NAMES = ('pushed', 'dropped', 'handled', 'injected', 'taps', 'swipes', 'rejected', 'slo_violations',
+                 'hook_processed', 'hook_skipped', 'hook_armed_ms', 'nav_coalesced', 'nav_dropped',
+                 'suppressed', 'window_checks', 'window_check_us', 'config_reloads')
+_COUNTERS = struct.Struct('<' + 'Q' * len(COUNTER_NAMES))
+# 每次翻页一条记录：时间（time.time）、判断延迟、注入延迟、总延迟（秒）
+_RECORD = struct.Struct('<dddd')
+
+# 控制管道消息
+MSG_RELOAD = 'reload_config'
+MSG_STOP = 'stop'
+
+Record = Tuple[float, float, float, float]
+
+
+class StatsRing:
+    """共享内存中的单写单读环形缓冲区。
+
+    写端（子进程）先写记录再递增序号；读端记住自己读到的序号，
+    被写端套圈覆盖的记录计入 `lost`。不使用跨进程锁。
+
+    子进程中记录与计数器由不同线程写入：头部的序号只由 `write` 更新，PID 与心跳只由
+    `write_counters` 更新，两者不会用旧值互相覆盖。
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, owner: bool):
+        self.shm = shm
+        self.capacity = capacity
+        self.owner = owner
+        self.lost = 0
+        self._buf = shm.buf
+        self._seq = 0           # 写端：下一条序号；读端：下一条待读序号
+        self._write_lock = threading.Lock()
+        self._records_at = _HEADER.size + _COUNTERS.size
+
+    @staticmethod
+    def size_for(capacity: int) -> int:
+        return _HEADER.size + _COUNTERS.size + _RECORD.size * capacity
+
+    @classmethod
+    def create(cls, capacity: int = 1024) -> 'StatsRing':
+        shm = shared_memory.SharedMemory(create=True, size=cls.size_for(capacity))
+        shm.buf[:cls.size_for(capacity)] = bytes(cls.size_for(capacity))
+        return cls(shm, capacity, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, capacity: int) -> 'StatsRing':
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 没有 track 参数；spawn 出的子进程与父进程共用 resource_tracker，
+            # 重复登记不影响由创建方负责 unlink
+            shm = shared_memory.SharedMemory(name=name)
+        ring = cls(shm, capacity, owner=False)
+        # 子进程重启后接着已有序号写，读端不会把新记录误判为旧数据
+        ring._seq = ring._header()[0]
+        return ring
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _header(self) -> Tuple[int, int, float]:
+        return _HEADER.unpack_from(self._buf, 0)
+
+    # ---------- 写端 ----------
+    def write(self, record: Record) -> None:
+        # 翻页可能在分发线程或调度线程中记录，序号的读-改-写需串行
+        with self._write_lock:
+            seq = self._seq
+            _RECORD.pack_into(self._buf, self._records_at + (seq % self.capacity) * _RECORD.size, *record)
+            self._seq = seq + 1
+            _SEQ.pack_into(self._buf, 0, self._seq)
+
+    def write_counters(self, values: Dict[str, int], pid: int) -> None:
+        _COUNTERS.pack_into(self._buf, _HEADER.size, *(values.get(k, 0) for k in COUNTER_NAMES))
+        _BEAT.pack_into(self._buf, _SEQ.size, pid, time.time())
+
+    # ---------- 读端 ----------
+    def read_new(self) -> List[Record]:
+        """返回上次读取之后写入的记录。"""
+        head = self._header()[0]
+        start = self._seq
+        if head <= start:
+            return []
+        if head - start > self.capacity:
+            self.lost += head - start - self.capacity
+            start = head - self.capacity
+        records = [_RECORD.unpack_from(self._buf, self._records_at + (s % self.capacity) * _RECORD.size)
+                   for s in range(start, head)]
+        # 读取期间写端又套圈时，最早的几条可能已被覆盖，丢弃
+        # （写端先写记录再发布序号：正在写的下一条记录也会覆盖一个槽位，故 +1）
+        overrun = self._header()[0] + 1 - self.capacity - start
+        if overrun > 0:
+            self.lost += overrun
+            records = records[overrun:]
+        self._seq = head
+        return records
+
+    def counters(self) -> Dict[str, int]:
+        return dict(zip(COUNTER_NAMES, _COUNTERS.unpack_from(self._buf, _HEADER.size)))
+
+    def heartbeat(self) -> Tuple[int, float]:
+        """(子进程 PID, 最近一次心跳时间)。"""
+        _, pid, beat = self._header()
+        return pid, beat
+
+    def close(self) -> None:
+        self._buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# ------------------------------------------------------------------
+# 子进程
+# ------------------------------------------------------------------
+def _child_main(shm_name: str, capacity: int, conn, log_dir: Optional[str]) -> None:
+    """子进程入口：运行 func.main，把统计写入共享内存，处理控制消息。"""
+    import os
+    if log_dir:
+        logger.add(os.path.join(log_dir, "PowerPointTouchAssist_listener_{time:YYYY-MM-DD-HH-mm-ss}.log"),
+                   rotation="5 MB", retention="30 days", enqueue=True)
+    ring = StatsRing.attach(shm_name, capacity)
+    import conf_file
+    import func
+    pid = os.getpid()
+
+    def on_injection(decision: float, inject: float, total: float) -> None:
+        ring.write((time.time(), decision, inject, total))
+
+    func.stats.on_injection = on_injection
+
+    def publish() -> None:
+        q, r = func.event_queue, func.recognizer
+        ring.write_counters({
+            'pushed': q.pushed, 'dropped': q.dropped, 'handled': q.pushed - q.dropped - q.depth,
+            'injected': func.pipeline.injected, 'taps': r.taps, 'swipes': r.swipes,
+            'rejected': r.rejected, 'slo_violations': func.stats.slo_violations,
+            'hook_processed': func.hook.processed, 'hook_skipped': func.hook.skipped,
+            'hook_armed_ms': int(func.hook.armed_seconds * 1000),
+            'nav_coalesced': func.scheduler.coalesced if func.scheduler else 0,
+            'nav_dropped': func.scheduler.dropped_stale if func.scheduler else 0,
+            'suppressed': r.suppressed, 'window_checks': func.window_tracker.check_time.count,
+            'window_check_us': int(func.window_tracker.check_time.total * 1e6),
+            'config_reloads': func.reload_count,
+        }, pid)
+
+    stop = threading.Event()
+
+    def report_loop() -> None:
+        while not stop.wait(0.5):
+            publish()
+
+    def control_loop() -> None:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                # GUI 进程已退出
+                break
+            if msg == MSG_RELOAD:
+                # 重新加载触发配置变化回调，func 随之替换参数快照
+                conf_file.store.reload()
+                logger.info("监听进程已重新加载配置")
+            elif msg == MSG_STOP:
+                break
+        func.stop()
+
+    publish()
+    threading.Thread(target=report_loop, name='StatsPublisher', daemon=True).start()
+    threading.Thread(target=control_loop, name='ListenerControl', daemon=True).start()
+    logger.info(f"监听进程启动（PID {pid}）")
+    try:
+        func.main()
+    finally:
+        stop.set()
+        publish()
+        ring.close()
+        logger.info("监听进程退出")
+
+
+# ------------------------------------------------------------------
+# GUI 进程端
+# ------------------------------------------------------------------
+class ListenerSupervisor:
+    """启动并监督监听子进程。
+
+    参数:
+        capacity: 共享内存环形缓冲区的记录条数。
+        on_records: 读到新的翻页记录时调用 on_records(records)（在监督线程中调用）。
+        log_dir: 子进程日志目录（None 为不写文件）。
+        max_restarts / restart_window: restart_window 秒内重启超过 max_restarts 次则放弃。
+        poll_interval: 读取共享内存与检查子进程状态的间隔（秒）。
+    """
+
+    def __init__(self, capacity: int = 1024, on_records: Optional[Callable[[List[Record]], None]] = None,
+                 log_dir: Optional[str] = None, max_restarts: int = 5, restart_window: float = 60.0,
+                 poll_interval: float = 0.5):
+        self.capacity = capacity
+        self.on_records = on_records
+        self.log_dir = log_dir
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.poll_interval = poll_interval
+        self.restarts = 0
+        self.ring: Optional[StatsRing] = None
+        self._ctx = multiprocessing.get_context('spawn')
+        self._proc = None
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        self._restart_times: List[float] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    @property
+    def pid(self) -> Optional[int]:
+        """当前监听子进程的 PID（未启动时为 None）。"""
+        return self._proc.pid if self._proc is not None else None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self.ring = StatsRing.create(self.capacity)
+        self._spawn()
+        self._thread = threading.Thread(target=self._watch, name='ListenerSupervisor', daemon=True)
+        self._thread.start()
+
+    def _spawn(self) -> None:
+        parent_conn, child_conn = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_child_main, name='PPTTouchListener', daemon=True,
+                                 args=(self.ring.name, self.capacity, child_conn, self.log_dir))
+        proc.start()
+        child_conn.close()
+        with self._conn_lock:
+            self._proc, self._conn = proc, parent_conn
+        logger.info(f"监听子进程已启动（PID {proc.pid}）")
+
+    def send(self, msg) -> bool:
+        """向子进程发送控制消息，子进程不可用时返回 False。"""
+        with self._conn_lock:
+            if self._conn is None:
+                return False
+            try:
+                self._conn.send(msg)
+                return True
+            except (OSError, EOFError, ValueError) as e:
+                logger.warning(f"向监听进程发送消息失败：{e}")
+                return False
+
+    def reload_config(self) -> bool:
+        return self.send(MSG_RELOAD)
+
+    def drain(self) -> List[Record]:
+        records = self.ring.read_new() if self.ring is not None else []
+        if records and self.on_records is not None:
+            self.on_records(records)
+        return records
+
+    def counters(self) -> Dict[str, int]:
+        return self.ring.counters() if self.ring is not None else {}
+
+    def heartbeat_age(self) -> float:
+        """距子进程最近一次心跳的秒数（尚无心跳时为 inf）。"""
+        if self.ring is None:
+            return float('inf')
+        _, beat = self.ring.heartbeat()
+        return time.time() - beat if beat else float('inf')
+
+    def _watch(self) -> None:
+        while not self._stop.is_set():
+            proc = self._proc
+            wait_connections([proc.sentinel], timeout=self.poll_interval)
+            self.drain()
+            if self._stop.is_set() or proc.is_alive():
+                continue
+            logger.error(f"监听子进程意外退出（退出码 {proc.exitcode}）")
+            now = time.monotonic()
+            self._restart_times = [t for t in self._restart_times if now - t < self.restart_window]
+            if len(self._restart_times) >= self.max_restarts:
+                logger.error(f"{self.restart_window:.0f}s 内已重启 {self.max_restarts} 次，不再重启监听进程")
+                with self._conn_lock:
+                    self._conn = None
+                return
+            # 按最近的重启次数退避
+            delay = min(0.5 * 2 ** len(self._restart_times), 10)
+            self._restart_times.append(now)
+            if self._stop.wait(delay):
+                return
+            self.restarts += 1
+            self._spawn()
+
+    def stop(self, timeout: float = 3.0) -> None:
+        self._stop.set()
+        self.send(MSG_STOP)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        proc = self._proc
+        if proc is not None:
+            proc.join(timeout)
+            if proc.is_alive():
+                logger.warning("监听进程未按时退出，强制结束")
+                proc.terminate()
+                proc.join(1)
+        if self.ring is not None:
+            self.drain()
+            self.ring.close()
+            self.ring = None
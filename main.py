@@ -1,25 +1,33 @@
 # ======================  main.py  ======================
-import os
 import sys
-import json
 import time
+
+# 启动计时起点；--profile-startup 时需在其余导入之前安装导入计时器
+_MAIN_STARTED = time.perf_counter()
+PROFILE_STARTUP = '--profile-startup' in sys.argv
+if PROFILE_STARTUP:
+    import startup_profile
+    startup_profile.install()
+
+import os
+from PyQt6.QtWidgets import QApplication, QWidget, QSystemTrayIcon, QMenu, QMessageBox
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QCursor
 import multiprocessing
-from PyQt6.QtWidgets import QApplication, QWidget, QSystemTrayIcon, QMenu
-from PyQt6 import uic
-from PyQt6.QtCore import Qt, QTimer, QEvent
-from PyQt6.QtGui import QCursor, QIcon
 import threading
 import uuid
 from pathlib import Path
 from loguru import logger
 import conf_file
-import conf_ui
-from configparser import ConfigParser
+import perf_stats
+import ui_cache
+from resident import IdleReaper
 
 # --------------------------------------------------
-# ① 更新窗口模块（同级目录）
+# ① 更新窗口 / 设置窗口模块（同级目录）
+#    二者会带入 requests、urllib3 等网络栈与 .ui 解析，改为首次点击
+#    对应托盘菜单时再导入（见 TrayIcon.open_settings / open_updater）
 # --------------------------------------------------
-from updater_gui import UpdaterWindow
 
 # --------------------------------------------------
 # ② 实例 ID & 日志模板
@@ -29,7 +37,7 @@ CONFIG_TEMPLATE = f"""
 实例 ID        : {INSTANCE_ID}
 """.strip()
 
-print("""
+BANNER = """
     ____                          ____        _       __      ______                 __          ___              _      __ 
    / __ \____ _      _____  _____/ __ \____  (_)___  / /_    /_  __/___  __  _______/ /_        /   |  __________(_)____/ /_
   / /_/ / __ \ | /| / / _ \/ ___/ /_/ / __ \/ / __ \/ __/_____/ / / __ \/ / / / ___/ __ \______/ /| | / ___/ ___/ / ___/ __/
@@ -38,31 +46,17 @@ print("""
 
 钟表的指针周而复始，就像人的困惑、烦恼、软弱…摇摆不停。但最终，人们依旧要前进，就像你的指针，永远落在前方。
 
-""")
-try:
-    conf = ConfigParser()
-    conf.read('config.ini', encoding='utf-8')
-    version = conf['About']['version']
-except KeyError:
-    logger.bug("config.ini不存在，正在重新创建")
-    conf['General'] = {
-        'dpi': '0',
-        'ppt_title': 'PowerPoint 幻灯片放映',
-        'auto_startup': '0'
-    }
+"""
 
-    conf['Miscellaneous'] = {
-    'initialstartup': '0',
-    'ver': '1.1'
-}
 
-    conf['About'] = {
-        'version': '1.2.0'
-    }
+def print_banner():
+    """在托盘图标显示后再输出启动横幅，不占用冷启动时间."""
+    if sys.stdout is not None and sys.stdout.isatty():
+        print(BANNER)
 
-    with open('config.ini', 'w', encoding='utf-8') as f:
-        conf.write(f)
 
+# 程序目录 config.ini 中的版本号（由 conf_file.app_store 统一缓存，不存在时自动重建）
+version = conf_file.app_store.get('About', 'version')
 
 
 # --------------------------------------------------
@@ -83,13 +77,28 @@ class PathManager:
 path_manager = PathManager()
 
 
+def compress_in_background(path):
+    """日志轮转时由 loguru 调用：把旧日志交给后台线程打包为 tar.gz，不阻塞写日志的线程."""
+    def _run():
+        import tarfile
+        try:
+            with tarfile.open(f"{path}.tar.gz", "w:gz") as tar:
+                tar.add(path, arcname=os.path.basename(path))
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"压缩日志失败：{e}")
+
+    threading.Thread(target=_run, name="LogCompressor", daemon=True).start()
+
+
 def configure_logging():
     log_dir = path_manager.get_log_dir()
     logger.add(
         log_dir / f"PowerPointTouchAssist_{{time:YYYY-MM-DD-HH-mm-ss}}.log",
         rotation="5 MB",
         retention="30 days",
-        compression="tar.gz",
+        compression=compress_in_background,
+        enqueue=True,       # 写文件在 loguru 的后台线程进行，调用方只入队
         backtrace=True,
         diagnose=True,
         catch=True
@@ -104,7 +113,11 @@ def log_software_info():
 # --------------------------------------------------
 # ④ 单实例检测
 # --------------------------------------------------
-if sys.platform == 'win32':
+def ensure_single_instance():
+    """已有实例运行时退出（放在函数中，避免监听子进程导入本模块时误判）."""
+    global _mutex
+    if sys.platform != 'win32':
+        return
     import ctypes
 
     ERROR_ALREADY_EXISTS = 183
@@ -116,25 +129,18 @@ if sys.platform == 'win32':
         sys.exit(0)
 
 
-def resource(*relative_parts: str) -> str:
-    if getattr(sys, 'frozen', False):
-        base = sys._MEIPASS
-    else:
-        base = os.path.dirname(os.path.abspath(__file__))
-    return os.path.join(base, *relative_parts)
-
-
 # --------------------------------------------------
 # ⑤ 主窗口（无边框）
 # --------------------------------------------------
 class FramelessWindow(QWidget):
-    def __init__(self):
+    def __init__(self, auto_hide=True):
         super().__init__()
-        uic.loadUi(resource('main.ui'), self)
+        ui_cache.setup_ui('main', self)
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         self.m_flag = False
-        QTimer.singleShot(3000, self.hide)
+        if auto_hide:
+            QTimer.singleShot(3000, self.hide)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -156,16 +162,31 @@ class FramelessWindow(QWidget):
 # ⑥ 系统托盘
 # --------------------------------------------------
 class TrayIcon(QSystemTrayIcon):
+    # 后台版本检查发现新版本（由检查线程发出，在 GUI 线程处理）
+    update_available = pyqtSignal(str)
+
     def __init__(self, main_window: FramelessWindow, parent=None):
         super().__init__(parent)
         logger.info("开始创建托盘图标")
         self.main_window = main_window
+        self.release_checker = None
+        self.listener = None    # 独立进程模式下的 ListenerSupervisor
+        self.metrics_server = None
+        self.mirror = None      # 局域网更新镜像（Update/Mirror_Mode = serve）
+        self.updater_win = None
+        self._notified_ver = None
+        self._meter = None
+        self.update_available.connect(self.notify_update)
         self.set_icon()
+        self.init_reaper()
         self.menu = QMenu()
 
         settings_action = self.menu.addAction('设置')
         settings_action.triggered.connect(self.open_settings)
 
+        stats_action = self.menu.addAction('性能统计')
+        stats_action.triggered.connect(self.show_perf_stats)
+
         # ★ 新增「检查更新」
         self.menu.addSeparator()
         update_action = self.menu.addAction('检查更新')
@@ -176,19 +197,85 @@ class TrayIcon(QSystemTrayIcon):
         self.setContextMenu(self.menu)
         self.show()
         logger.info("创建托盘图标完成")
+        self.start_auto_check()
+        self.start_mirror()
 
     def set_icon(self):
-        icon_path = resource('icon.png')
-        if os.path.isfile(icon_path):
-            self.setIcon(QIcon(icon_path))
+        self.setIcon(ui_cache.icon('icon.png'))
+
+    # ---------- 常驻低占用：空闲时释放次要窗口 ----------
+    def init_reaper(self):
+        """按 Performance/Idle_Teardown_Minutes 注册可释放的窗口与图片缓存."""
+        minutes = conf_file.store.get_float('Performance', 'Idle_Teardown_Minutes')
+        self.reaper = IdleReaper(minutes * 60)
+        # 单次定时器，只在仍有未释放的资源时才启动，全部释放后托盘不再被定时唤醒
+        self.reap_timer = QTimer(self)
+        self.reap_timer.setSingleShot(True)
+        self.reap_timer.timeout.connect(self.reap_idle)
+        self.reaper.register('main_window', self.release_main_window)
+        self.reaper.register('settings', self.release_settings)
+        self.reaper.register('updater', self.release_updater)
+        # 图片缓存与界面模块最后释放（窗口释放后才不再被引用）
+        self.reaper.register('ui_cache', lambda: ui_cache.release() or True)
+        self.arm_reaper()
+
+    def touch(self, name):
+        """记录窗口被使用，重新开始空闲计时."""
+        self.reaper.touch(name)
+        self.reaper.touch('ui_cache')
+        self.arm_reaper()
+
+    def arm_reaper(self):
+        delay = self.reaper.next_deadline()
+        if delay is None:
+            self.reap_timer.stop()
         else:
-            self.setIcon(QIcon())
+            self.reap_timer.start(int(delay * 1000) + 100)
+
+    def reap_idle(self):
+        if self.reaper.reap():
+            logger.info("空闲释放后：" + self.resource_report())
+        self.arm_reaper()
+
+    def release_main_window(self):
+        if self.main_window is None:
+            return True
+        if self.main_window.isVisible():
+            return False
+        self.main_window.deleteLater()
+        self.main_window = None
+        return True
+
+    def release_settings(self):
+        if 'conf_ui' not in sys.modules:
+            return True
+        return sys.modules['conf_ui'].release()
+
+    def release_updater(self):
+        if self.updater_win is None:
+            return True
+        if self.updater_win.isVisible() or self.updater_win.busy():
+            return False
+        self.updater_win.deleteLater()
+        self.updater_win = None
+        return True
+
+    def resource_report(self):
+        """常驻内存与空闲唤醒（上下文切换）报告."""
+        if self._meter is None:
+            from resident import ResourceMeter
+            self._meter = ResourceMeter()
+        return f"{self._meter.report()}，已释放界面资源 {self.reaper.teardown_count} 次"
 
     def on_activated(self, reason):
         if reason == QSystemTrayIcon.ActivationReason.Trigger:
             self.toggle_window()
 
     def toggle_window(self):
+        self.touch('main_window')
+        if self.main_window is None:
+            # 空闲时已释放，按需重新创建
+            self.main_window = FramelessWindow(auto_hide=False)
         if self.main_window.isVisible():
             self.main_window.hide()
         else:
@@ -199,26 +286,149 @@ class TrayIcon(QSystemTrayIcon):
 
     def open_settings(self):
         logger.info("软件设置被打开")
-        conf_ui.main()
+        import conf_ui
+        self.touch('settings')
+        conf_ui.main(on_shown=lambda ms: logger.info(f"设置窗口打开耗时 {ms:.1f} ms"))
         logger.info("软件设置被关闭")
+        self.touch('settings')
+        self.apply_config()
+
+    def apply_config(self):
+        """设置保存后通知监听子进程重新加载配置（本进程内的 func 由配置变化回调即时更新）."""
+        if self.listener is not None:
+            self.listener.reload_config()
+
+    def show_perf_stats(self):
+        """显示翻页流水线各阶段的实时延迟百分位."""
+        stats = perf_stats.stats
+        lines = []
+        for name, s in stats.snapshot().items():
+            if s['count']:
+                lines.append(f"{name}：{s['count']} 次，p50 {s['p50_ms']:.2f} ms，"
+                             f"p95 {s['p95_ms']:.2f} ms，p99 {s['p99_ms']:.2f} ms，最大 {s['max_ms']:.2f} ms")
+            else:
+                lines.append(f"{name}：暂无数据")
+        lines.append(f"超过阈值（{stats.slo * 1000:.0f} ms）：{stats.slo_violations} 次")
+        if self.listener is not None:
+            c = self.listener.counters()
+            lines.append(f"监听进程：{'运行中' if self.listener.alive else '已停止'}，重启 {self.listener.restarts} 次，"
+                         f"事件 {c.get('pushed', 0)}，丢弃 {c.get('dropped', 0)}，翻页 {c.get('injected', 0)}")
+            lines.append(f"鼠标钩子：累计安装 {c.get('hook_armed_ms', 0) / 1000:.0f} 秒，"
+                         f"处理 {c.get('hook_processed', 0)} 个事件，跳过 {c.get('hook_skipped', 0)} 个")
+            lines.append(f"翻页调度：合并 {c.get('nav_coalesced', 0)} 次点击，丢弃过期 {c.get('nav_dropped', 0)} 次")
+        elif 'func' in sys.modules:
+            h = sys.modules['func'].hook
+            lines.append(f"鼠标钩子：{'已安装' if h.armed else '未安装'}，累计安装 {h.armed_seconds:.0f} 秒"
+                         f"（{h.arm_count} 次），处理 {h.processed} 个事件，跳过 {h.skipped} 个")
+            nav = sys.modules['func'].scheduler
+            if nav is not None:
+                lines.append(f"翻页调度：合并 {nav.coalesced} 次点击（跳转 {nav.jumps} 次），"
+                             f"丢弃过期 {nav.dropped_stale} 次，最大积压 {nav.max_pending}")
+        lines.append(self.resource_report())
+        QMessageBox.information(None, '性能统计', '\n'.join(lines))
+
+    def start_auto_check(self):
+        """按配置开启后台定期检查更新（失败时指数退避）."""
+        hours = conf_file.store.get_float('Update', 'Auto_Check_Hours')
+        if hours <= 0:
+            return
+        from release_info import PeriodicChecker
+        from update_mirror import create_checker
+
+        def on_result(info, changed):
+            if version < info['version']:
+                self.update_available.emit(info['version'])
+
+        self.release_checker = PeriodicChecker(create_checker(), hours * 3600, on_result)
+        self.release_checker.start()
+        logger.info(f"已开启后台检查更新，间隔 {hours} 小时")
+
+    def start_mirror(self):
+        """Update/Mirror_Mode 为 serve 时，在局域网内提供更新包（本机定期从源站同步）."""
+        if conf_file.store.get('Update', 'Mirror_Mode') != 'serve':
+            return
+        from update_mirror import MirrorService
+        mirror = MirrorService(port=conf_file.store.get_int('Update', 'Mirror_Port', 8765),
+                               sync_hours=conf_file.store.get_float('Update', 'Mirror_Sync_Hours', 6.0))
+        if mirror.start():
+            self.mirror = mirror
+
+    def notify_update(self, latest: str):
+        if latest == self._notified_ver:
+            return
+        self._notified_ver = latest
+        self.showMessage('PPT 触屏辅助', f'发现新版本 {latest}，可在托盘菜单「检查更新」中更新')
 
     # ★ 弹出更新窗口
     def open_updater(self):
         logger.info("用户手动打开更新窗口")
-        self.updater_win = UpdaterWindow(current_ver= version)  # 版本号可动态读
+        start = time.perf_counter()
+        self.touch('updater')
+        if self.updater_win is None:
+            from updater_gui import UpdaterWindow
+            self.updater_win = UpdaterWindow(current_ver= version)  # 版本号可动态读
+        else:
+            # 复用已创建的窗口，只重新检查版本
+            self.updater_win.refresh()
         self.updater_win.show()
+        self.updater_win.raise_()
+        self.updater_win.activateWindow()
+        logger.info(f"更新窗口打开耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
 
     def quit_app(self):
         logger.info("软件被关闭")
+        conf_file.flush()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        if self.mirror is not None:
+            self.mirror.stop()
+        if self.listener is not None:
+            self.listener.stop()
         QApplication.instance().quit()
 
 
 # --------------------------------------------------
-# ⑦ 业务线程（示例）
+# ⑦ 业务线程 / 监听进程
 # --------------------------------------------------
 def run_func():
-    # 这里放你的核心业务，例如监听 PowerPoint 触屏
+    """在后台线程中运行鼠标监听与翻页（func.main 阻塞直至监听停止）."""
     logger.info("业务线程启动")
+    import func
+    func.main()
+
+
+def start_listener(tray: 'TrayIcon'):
+    """按 Performance/Listener_Mode 在后台线程或独立子进程中启动监听."""
+    if conf_file.store.get('Performance', 'Listener_Mode') == 'process':
+        from listener_process import ListenerSupervisor
+
+        def merge(records):
+            for _, decision, inject, total in records:
+                perf_stats.stats.merge(decision, inject, total)
+
+        tray.listener = ListenerSupervisor(on_records=merge, log_dir=str(path_manager.get_log_dir()))
+        tray.listener.start()
+    else:
+        threading.Thread(target=run_func, daemon=True).start()
+
+
+def start_metrics(tray: 'TrayIcon'):
+    """Metrics/Enabled 时在 127.0.0.1 上启动指标端点（默认关闭）."""
+    if not conf_file.store.get_bool('Metrics', 'Enabled'):
+        return
+    from metrics_server import AppCollector, MetricsServer
+    server = MetricsServer(AppCollector(tray.listener, version), port=conf_file.store.get_int('Metrics', 'Port', 9464))
+    if server.start():
+        tray.metrics_server = server
+
+
+def report_startup():
+    """--profile-startup：托盘可见后输出导入耗时与启动耗时，然后退出."""
+    text = startup_profile.report(_MAIN_STARTED)
+    logger.info("启动耗时分析：\n" + text)
+    if sys.stdout is not None:
+        print(text)
+    QApplication.instance().quit()
 
 
 # --------------------------------------------------
@@ -237,7 +447,7 @@ def main():
     tray = TrayIcon(window)
 
     # 首次启动快捷方式 & 设置
-    if int(conf_file.read_conf('Miscellaneous', 'InitialStartUp') or 0) == 1:
+    if conf_file.store.get_bool('Miscellaneous', 'InitialStartUp'):
         conf_file.write_conf('Miscellaneous', 'InitialStartUp', '0')
         # 若 shortcut 模块不存在，下面三行可注释
         # s.add_to_desktop('PowerPoint_TouchAssist.exe')
@@ -245,11 +455,14 @@ def main():
         # s.add_to_startmenu('PowerPoint_TouchAssist.exe', name='PowerPoint 触屏辅助 - 设置', args='settings')
         # conf_ui.main()
     else:
-        t = threading.Thread(target=run_func, daemon=True)
-        t.start()
+        start_listener(tray)
+        start_metrics(tray)
 
     window.show()
     logger.info("软件启动")
+    QTimer.singleShot(0, print_banner)
+    if PROFILE_STARTUP:
+        QTimer.singleShot(0, report_startup)
     sys.exit(app.exec())
 
 
@@ -257,6 +470,9 @@ def main():
 # ⑨ 启动
 # --------------------------------------------------
 if __name__ == '__main__':
+    # 打包后启动监听子进程时，子进程在这里转入 multiprocessing 的入口
+    multiprocessing.freeze_support()
+    ensure_single_instance()
     configure_logging()
     log_software_info()
     main()
\ No newline at end of file
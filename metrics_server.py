@@ -0,0 +1,297 @@
+"""本机指标端点：Prometheus 文本格式与 JSON。
+
+在上百台教室电脑上运行时，除了各机 logs/ 下的日志外没有任何可观测性。开启
+Metrics/Enabled 后，main.py 在 127.0.0.1 上启动一个 HTTP 端点：
+
+    /metrics       Prometheus 文本格式（0.0.4）
+    /metrics.json  同样的数据，JSON 格式（直方图附带 p50/p95/p99）
+
+采集只在被抓取时进行：读取流水线已有的计数器与直方图（单写者、无锁），
+不在钩子路径上增加任何操作。只绑定回环地址，由本机的采集代理（如 node_exporter 的
+textfile / Prometheus agent）转发。
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+from perf_stats import LatencyHistogram
+
+PREFIX = 'ppt_touch_'
+CONTENT_TYPE_TEXT = 'text/plain; version=0.0.4; charset=utf-8'
+
+Labels = Dict[str, str]
+Sample = Tuple[str, Labels, float]     # (名称后缀, 标签, 值)
+
+
+class Metric(NamedTuple):
+    """一项指标及其全部样本。"""
+    name: str
+    kind: str                           # counter / gauge / histogram
+    help: str
+    samples: List[Sample]
+    # 直方图的百分位（仅 JSON 输出使用）：[(标签, {'p50': 秒, ...})]
+    quantiles: Optional[List[Tuple[Labels, Dict[str, float]]]] = None
+
+
+def counter(name: str, help: str, value: float, labels: Optional[Labels] = None) -> Metric:
+    return Metric(PREFIX + name, 'counter', help, [('', labels or {}, value)])
+
+
+def gauge(name: str, help: str, values: Iterable[Tuple[Labels, float]]) -> Metric:
+    return Metric(PREFIX + name, 'gauge', help, [('', labels, v) for labels, v in values])
+
+
+def histogram(name: str, help: str, hists: Iterable[Tuple[Labels, LatencyHistogram]]) -> Metric:
+    """由 LatencyHistogram 生成累积分桶（le 为秒）。
+
+    直方图只由写线程修改，这里复制一份分桶计数后再计算，读到的是近似一致的快照。
+    """
+    samples: List[Sample] = []
+    quantiles = []
+    for labels, h in hists:
+        counts = list(h.counts)
+        total = h.total
+        cumulative = 0
+        for bound, c in zip(h.bounds, counts):
+            cumulative += c
+            samples.append(('_bucket', {**labels, 'le': repr(bound)}, cumulative))
+        cumulative += counts[-1]
+        samples.append(('_bucket', {**labels, 'le': '+Inf'}, cumulative))
+        samples.append(('_sum', labels, total))
+        samples.append(('_count', labels, cumulative))
+        quantiles.append((labels, {f'p{int(q * 100)}': h.percentile(q) for q in (0.5, 0.95, 0.99)}))
+    return Metric(PREFIX + name, 'histogram', help, samples, quantiles)
+
+
+def summary_histogram(name: str, help: str, count: int, total: float,
+                      labels: Optional[Labels] = None) -> Metric:
+    """只有次数与总和的直方图（分桶数据在其他进程中时使用）。"""
+    labels = labels or {}
+    return Metric(PREFIX + name, 'histogram', help, [
+        ('_bucket', {**labels, 'le': '+Inf'}, count),
+        ('_sum', labels, total),
+        ('_count', labels, count),
+    ])
+
+
+# ------------------------------------------------------------------
+# 输出格式
+# ------------------------------------------------------------------
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(metrics: Iterable[Metric]) -> str:
+    lines = []
+    for m in metrics:
+        lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        for suffix, labels, value in m.samples:
+            label_text = ','.join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+            lines.append(f"{m.name}{suffix}{{{label_text}}} {_format_value(value)}" if label_text
+                         else f"{m.name}{suffix} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+def render_json(metrics: Iterable[Metric]) -> dict:
+    result = {}
+    for m in metrics:
+        entry = {'type': m.kind, 'help': m.help}
+        if m.kind == 'histogram':
+            series = {}
+            for suffix, labels, value in m.samples:
+                if suffix == '_bucket':
+                    continue
+                key = ','.join(f'{k}={v}' for k, v in labels.items())
+                series.setdefault(key, {'labels': labels})[suffix[1:]] = value
+            for labels, q in m.quantiles or ():
+                key = ','.join(f'{k}={v}' for k, v in labels.items())
+                series[key].update(q)
+            entry['series'] = list(series.values())
+        else:
+            entry['series'] = [{'labels': labels, 'value': value} for _, labels, value in m.samples]
+        result[m.name] = entry
+    return result
+
+
+# ------------------------------------------------------------------
+# HTTP 服务
+# ------------------------------------------------------------------
+class MetricsServer:
+    """只绑定回环地址的指标 HTTP 服务（后台线程）。
+
+    参数:
+        collect: 返回当前全部指标的函数，每次抓取时调用。
+        port: 端口；0 为由系统分配（实际端口见 `port` 属性）。
+    """
+
+    def __init__(self, collect: Callable[[], List[Metric]], port: int = 9464, host: str = '127.0.0.1'):
+        self.collect = collect
+        self.host = host
+        self.port = port
+        self.scrapes = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path not in ('/metrics', '/metrics.json'):
+                    self.send_error(404)
+                    return
+                try:
+                    metrics = server.collect()
+                except Exception as e:
+                    logger.exception(f"采集指标失败：{e}")
+                    self.send_error(500)
+                    return
+                server.scrapes += 1
+                if path == '/metrics':
+                    body = render_prometheus(metrics).encode('utf-8')
+                    ctype = CONTENT_TYPE_TEXT
+                else:
+                    body = json.dumps(render_json(metrics), ensure_ascii=False).encode('utf-8')
+                    ctype = 'application/json; charset=utf-8'
+                self.send_response(200)
+                self.send_header('Content-Type', ctype)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> bool:
+        """启动服务，端口被占用等失败时记录日志并返回 False。"""
+        if self._server is not None:
+            return True
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        except OSError as e:
+            logger.error(f"指标端点启动失败（{self.host}:{self.port}）：{e}")
+            return False
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='MetricsServer', daemon=True)
+        self._thread.start()
+        logger.info(f"指标端点已启动：http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+
+
+# ------------------------------------------------------------------
+# 本程序的指标
+# ------------------------------------------------------------------
+class AppCollector:
+    """采集本程序的指标。
+
+    线程模式下直接读取 func 模块中的计数器与直方图；独立进程模式下读取
+    ListenerSupervisor 的共享内存计数器，延迟直方图来自 GUI 进程合并后的 perf_stats。
+
+    参数:
+        supervisor: 独立进程模式下的 ListenerSupervisor。
+        version: 程序版本号（作为 info 指标的标签）。
+    """
+
+    def __init__(self, supervisor=None, version: str = ''):
+        self.supervisor = supervisor
+        self.version = version
+        self._procs = {}
+
+    def _rss(self, pid: int) -> Optional[int]:
+        try:
+            import psutil
+            proc = self._procs.get(pid)
+            if proc is None:
+                proc = self._procs[pid] = psutil.Process(pid)
+            return proc.memory_info().rss
+        except Exception:
+            self._procs.pop(pid, None)
+            return None
+
+    def _counters(self) -> Optional[dict]:
+        """监听端的计数器（与 listener_process.COUNTER_NAMES 同名）；监听未运行时为 None。"""
+        if self.supervisor is not None:
+            return self.supervisor.counters()
+        func = sys.modules.get('func')
+        if func is None:
+            return None
+        q, r, hook, nav = func.event_queue, func.recognizer, func.hook, func.scheduler
+        return {
+            'pushed': q.pushed, 'dropped': q.dropped, 'injected': func.pipeline.injected,
+            'taps': r.taps, 'swipes': r.swipes, 'rejected': r.rejected, 'suppressed': r.suppressed,
+            'slo_violations': func.stats.slo_violations,
+            'hook_processed': hook.processed, 'hook_skipped': hook.skipped,
+            'hook_armed_ms': int(hook.armed_seconds * 1000),
+            'nav_coalesced': nav.coalesced if nav else 0, 'nav_dropped': nav.dropped_stale if nav else 0,
+            'config_reloads': func.reload_count,
+        }
+
+    def __call__(self) -> List[Metric]:
+        import os
+        import perf_stats
+
+        c = self._counters() or {}
+        stats = perf_stats.stats
+        metrics = [
+            gauge('info', '程序信息', [({'version': self.version,
+                                         'listener': 'process' if self.supervisor else 'thread'}, 1)]),
+            counter('events_received_total', '鼠标钩子收到的事件数',
+                    c.get('hook_processed', 0) + c.get('hook_skipped', 0)),
+            counter('events_skipped_total', '未在放映时被钩子直接跳过的事件数', c.get('hook_skipped', 0)),
+            counter('events_dropped_total', '事件队列溢出丢弃的事件数', c.get('dropped', 0)),
+            counter('page_turns_total', '识别并提交注入的翻页次数', c.get('injected', 0)),
+            Metric(PREFIX + 'gestures_total', 'counter', '识别出的翻页手势数',
+                   [('', {'kind': 'tap'}, c.get('taps', 0)), ('', {'kind': 'swipe'}, c.get('swipes', 0))]),
+            counter('suppressed_taps_total', '在菜单 / 任务栏排除区域内被屏蔽的点击数', c.get('suppressed', 0)),
+            counter('rejected_releases_total', '未识别为翻页的释放事件数', c.get('rejected', 0)),
+            counter('nav_coalesced_total', '被合并为跳转的翻页点击数', c.get('nav_coalesced', 0)),
+            counter('nav_dropped_total', '因过期被丢弃的翻页点击数', c.get('nav_dropped', 0)),
+            counter('slo_violations_total', '翻页总延迟超过阈值的次数', stats.slo_violations),
+            counter('hook_armed_seconds_total', '鼠标钩子累计安装时长', c.get('hook_armed_ms', 0) / 1000),
+            counter('config_reloads_total', '配置重新加载次数', c.get('config_reloads', 0)),
+            histogram('latency_seconds', '翻页流水线各阶段延迟（decision：钩子到判断；inject：判断到注入；'
+                      'total：钩子到注入）', [({'stage': 'decision'}, stats.decision),
+                                           ({'stage': 'inject'}, stats.inject),
+                                           ({'stage': 'total'}, stats.total)]),
+        ]
+
+        func = sys.modules.get('func')
+        if self.supervisor is None and func is not None:
+            metrics.append(histogram('window_check_seconds', '枚举窗口判断是否放映的耗时',
+                                     [({}, func.window_tracker.check_time)]))
+        elif self.supervisor is not None:
+            metrics.append(summary_histogram('window_check_seconds', '枚举窗口判断是否放映的耗时',
+                                             c.get('window_checks', 0), c.get('window_check_us', 0) / 1e6))
+
+        rss = [({'process': 'gui'}, self._rss(os.getpid()))]
+        if self.supervisor is not None:
+            pid = self.supervisor.pid
+            if pid and self.supervisor.alive:
+                rss.append(({'process': 'listener'}, self._rss(pid)))
+        metrics.append(gauge('resident_memory_bytes', '进程常驻内存（RSS）',
+                             [(labels, v) for labels, v in rss if v is not None]))
+        return metrics
@@ -0,0 +1,240 @@
+"""翻页调度器：在手势识别与按键注入之间合并连续点击。
+
+演讲者快速连点跳页时，原先每次点击都在分发线程里同步注入一次空格。SendInput 立即返回，
+按键却在 PowerPoint 的消息队列里排队等待渲染；放映较慢或机器繁忙时就会落后好几页，随后又翻过头。
+调度器把翻页命令交给独立的注入线程：
+
+- 同时在途（已发送、估计放映尚未处理完）的翻页最多 `max_in_flight` 个，每个翻页按 `settle`
+  秒估算处理时间；超出时命令留在调度器中等待，而不是堆进 PowerPoint 的队列；
+- 等待中的命令达到 `coalesce_threshold` 条时合并为一次多页跳转（上一页 / 下一页相互抵消）：
+  keys 方式连续发送净页数个翻页键，number 方式输入目标页码 + 回车（需已知当前页，见 `reset_position`）；
+- 从钩子收到点击起超过 `deadline` 秒仍未注入的命令视为过期，丢弃并记录警告（默认不丢弃）；
+- 统计合并、丢弃、跳转与等待次数。
+
+局限：keys 方式的合并跳转仍发送净页数个翻页键，放映需逐页渲染，滞后与逐次注入相同，
+只省掉相互抵消的点击。number 方式只渲染一次，但页码是按经过调度器的翻页推算的：
+放映不从第 1 页开始，或用翻页笔 / 键盘翻过页后，推算的页码就不再正确，会跳到错误的页。
+因此调度器默认关闭（Navigation/Scheduler）。
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Iterable, List, Optional
+
+from loguru import logger
+
+from gesture import ACTION_NEXT, ACTION_PREV
+from perf_stats import PipelineStats
+
+JUMP_KEYS = 'keys'
+JUMP_NUMBER = 'number'
+
+
+class NavCommand:
+    """一条（可能已合并的）翻页命令。"""
+
+    __slots__ = ('t', 't_decided', 't_last', 'delta', 'count')
+
+    def __init__(self, t: float, t_decided: float, delta: int):
+        self.t = t                  # 最早一次点击的钩子时间戳（perf_counter）
+        self.t_decided = t_decided
+        self.t_last = t             # 最近一次并入的点击的钩子时间戳，用于判断是否过期
+        self.delta = delta          # 净翻页数：正数向后，负数向前
+        self.count = 1              # 合并的点击次数
+
+    def merge(self, other: 'NavCommand') -> None:
+        self.t_last = other.t_last
+        self.delta += other.delta
+        self.count += other.count
+
+
+class NavScheduler:
+    """翻页调度器。
+
+    参数:
+        press_sequence: 依次发送多个按键的函数（如 `KeyInjector.press_sequence`）。
+        coalesce_threshold: 等待中的命令达到多少条时合并为一次跳转。
+        max_in_flight: 同时在途的翻页上限。
+        settle: 估计放映处理一次翻页所需的时间（秒），0 为不限制在途数量。
+        deadline: 命令过期时间（秒），0 为不过期。
+        jump: 跳转方式，keys 或 number。
+        stats: 可选的分阶段延迟统计，命令实际注入后记录注入延迟。
+    """
+
+    def __init__(self, press_sequence: Callable[[Iterable[str]], None], coalesce_threshold: int = 3,
+                 max_in_flight: int = 2, settle: float = 0.1, deadline: float = 1.5,
+                 jump: str = JUMP_KEYS, stats: Optional[PipelineStats] = None):
+        if jump not in (JUMP_KEYS, JUMP_NUMBER):
+            raise ValueError(f"未知的跳转方式：{jump}")
+        self.press_sequence = press_sequence
+        self.coalesce_threshold = max(2, coalesce_threshold)
+        self.max_in_flight = max(1, max_in_flight)
+        self.settle = settle
+        self.deadline = deadline
+        self.jump = jump
+        self._perf = stats
+        # 当前页码（number 方式需要；None 为未知，此时退回 keys 方式）
+        self.position: Optional[int] = None
+        self._pending: Deque[NavCommand] = deque()
+        # 在途翻页的预计处理完成时间（只由调度线程读写）
+        self._in_flight: Deque[float] = deque()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # 统计
+        self.submitted = 0
+        self.injected = 0           # 实际注入的命令（合并后的一次跳转算一条）
+        self.coalesced = 0          # 被并入其他命令的点击
+        self.cancelled = 0          # 合并后净页数为 0 而未发送的命令
+        self.dropped_stale = 0      # 因过期丢弃的点击
+        self.jumps = 0
+        self.keys_sent = 0
+        self.throttled = 0          # 因在途翻页已满而等待的次数
+        self.max_pending = 0
+
+    # ---------- 提交（分发线程） ----------
+    def submit(self, action: int, t: float, t_decided: float) -> None:
+        """提交一个翻页动作（gesture.ACTION_*），立即返回。"""
+        delta = 1 if action == ACTION_NEXT else -1 if action == ACTION_PREV else 0
+        if not delta:
+            return
+        with self._lock:
+            self.submitted += 1
+            self._pending.append(NavCommand(t, t_decided, delta))
+            if len(self._pending) > self.max_pending:
+                self.max_pending = len(self._pending)
+        self._ready.set()
+
+    @property
+    def pending(self) -> int:
+        """等待注入的命令数。"""
+        return len(self._pending)
+
+    def reset_position(self, slide: Optional[int]) -> None:
+        """设置当前页码（放映开始时为 1，结束时为 None）。
+
+        之后的页码只按经过调度器的翻页推算，看不到翻页笔、键盘等其他方式的翻页。
+        """
+        self.position = slide
+
+    # ---------- 注入（调度线程） ----------
+    def _plan(self, batch: List[NavCommand], now: float) -> List[NavCommand]:
+        """丢弃过期命令；等待中的命令达到阈值时合并为一条。"""
+        if self.deadline > 0:
+            fresh = []
+            for c in batch:
+                age = now - c.t_last
+                if age <= self.deadline:
+                    fresh.append(c)
+                    continue
+                self.dropped_stale += c.count
+                logger.warning(f"丢弃过期的翻页点击 {c.count} 次（净 {c.delta:+d} 页，"
+                               f"已等待 {age * 1000:.0f} ms，超过 {self.deadline * 1000:.0f} ms）")
+            batch = fresh
+        if len(batch) >= self.coalesce_threshold:
+            merged = batch[0]
+            for c in batch[1:]:
+                merged.merge(c)
+            self.coalesced += len(batch) - 1
+            batch = [merged]
+        return batch
+
+    def _wait_slot(self) -> None:
+        """在途翻页已满时等待最早的一个处理完（停止时立即返回）。"""
+        if self.settle <= 0:
+            return
+        in_flight = self._in_flight
+        now = time.perf_counter()
+        while in_flight and in_flight[0] <= now:
+            in_flight.popleft()
+        if len(in_flight) >= self.max_in_flight:
+            self.throttled += 1
+            self._stop.wait(in_flight[0] - now)
+            in_flight.popleft()
+
+    def _keys(self, delta: int) -> List[str]:
+        if abs(delta) > 1 and self.jump == JUMP_NUMBER and self.position is not None:
+            target = max(1, self.position + delta)
+            return list(str(target)) + ['enter']
+        return ['space' if delta > 0 else 'left'] * abs(delta)
+
+    def _inject(self, cmd: NavCommand) -> None:
+        if cmd.delta == 0:
+            self.cancelled += 1
+            return
+        keys = self._keys(cmd.delta)
+        self.press_sequence(keys)
+        now = time.perf_counter()
+        if self._perf is not None:
+            self._perf.record_injection(cmd.t, cmd.t_decided, now)
+        if self.settle > 0:
+            # 页码跳转只渲染一次；连续翻页键每个都要渲染
+            renders = 1 if keys[-1] == 'enter' else len(keys)
+            start = max(now, self._in_flight[-1]) if self._in_flight else now
+            for i in range(1, renders + 1):
+                self._in_flight.append(start + i * self.settle)
+        if self.position is not None:
+            self.position = max(1, self.position + cmd.delta)
+        if abs(cmd.delta) > 1:
+            self.jumps += 1
+        self.injected += 1
+        self.keys_sent += len(keys)
+
+    def flush(self, wait: bool = True) -> None:
+        """逐条注入等待中的命令；wait 为 False 时不等待在途翻页（停止时使用）。"""
+        while True:
+            if wait:
+                self._wait_slot()
+            with self._lock:
+                batch = list(self._pending)
+                self._pending.clear()
+            if not batch:
+                return
+            planned = self._plan(batch, time.perf_counter())
+            if not planned:
+                continue
+            # 每次只注入一条，其余放回队首，与等待期间新到的命令一起重新规划
+            with self._lock:
+                self._pending.extendleft(reversed(planned[1:]))
+            try:
+                self._inject(planned[0])
+            except Exception as e:
+                logger.error(f"注入翻页按键失败：{e}")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._ready.wait()
+            # 先清除再取，确保清除之后提交的命令会重新唤醒本线程
+            self._ready.clear()
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='NavScheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """停止调度线程，并注入尚未过期的等待中的命令。"""
+        self._stop.set()
+        self._ready.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self.flush(wait=False)
+
+    def stats(self) -> dict:
+        return {
+            'submitted': self.submitted,
+            'injected': self.injected,
+            'coalesced': self.coalesced,
+            'cancelled': self.cancelled,
+            'dropped_stale': self.dropped_stale,
+            'jumps': self.jumps,
+            'keys_sent': self.keys_sent,
+            'throttled': self.throttled,
+            'max_pending': self.max_pending,
+        }
@@ -0,0 +1,297 @@
+"""操作系统后端：屏幕信息、窗口枚举、鼠标钩子、按键注入与快捷方式管理。
+
+核心逻辑（func / pipeline / gesture 等）只通过这里的接口访问系统，
+平台相关的库（win32api、pygetwindow、pynput、pyautogui、win32com）都在方法内部按需导入，
+因此在 Linux 上也能导入核心模块，并用模拟后端无界面地跑完整条“点击 → 翻页”流水线：
+
+- windows  ：现有实现（Windows 默认）
+- simulated：脚本化的鼠标事件、虚拟窗口与显示器、内存中记录的按键和快捷方式
+
+后端按 `get_backend()` 选择：环境变量 PPT_TOUCH_BACKEND 优先，否则按平台自动选择。
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from gesture import BUTTON_LEFT, BUTTON_OTHER, BUTTON_RIGHT
+from key_injector import KeyInjector, RecordingInjector, create_injector
+from screen_zones import DisplayProvider, Monitor, StaticDisplayProvider, Win32DisplayProvider
+from window_tracker import PyGetWindowSource, StaticWindowSource, WindowInfo, WindowSource
+
+# 钩子回调：(x, y, 按键编码 BUTTON_*, 是否按下)
+ClickCallback = Callable[[int, int, int, bool], None]
+
+# 快捷方式位置
+SHORTCUT_STARTUP = 'startup'
+SHORTCUT_DESKTOP = 'desktop'
+SHORTCUT_STARTMENU = 'startmenu'
+
+
+class InputListener:
+    """全局鼠标钩子接口。"""
+
+    def start(self) -> None:
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        raise NotImplementedError
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    @property
+    def running(self) -> bool:
+        raise NotImplementedError
+
+
+class OSBackend:
+    """操作系统后端接口。"""
+
+    name = 'base'
+
+    def display_provider(self, fallback_scale: float = 1.0, use_system_dpi: bool = True) -> DisplayProvider:
+        raise NotImplementedError
+
+    def window_source(self) -> WindowSource:
+        raise NotImplementedError
+
+    def create_listener(self, on_click: ClickCallback) -> InputListener:
+        raise NotImplementedError
+
+    def key_injector(self, name: str = 'direct', delay: float = 0.0) -> KeyInjector:
+        raise NotImplementedError
+
+    # ---------- 快捷方式 ----------
+    def shortcut_dir(self, kind: str) -> str:
+        """快捷方式所在目录（SHORTCUT_*）。"""
+        raise NotImplementedError
+
+    def create_shortcut(self, path: str, target: str, icon: str = '', args: str = '') -> None:
+        """创建（已存在时先删除再重建）快捷方式。"""
+        raise NotImplementedError
+
+    def remove_shortcut(self, path: str) -> None:
+        raise NotImplementedError
+
+
+# ------------------------------------------------------------------
+# Windows
+# ------------------------------------------------------------------
+class PynputListener(InputListener):
+    """pynput 全局鼠标钩子，回调前把 pynput 的按键对象转换为按键编码。"""
+
+    def __init__(self, on_click: ClickCallback):
+        from pynput import mouse
+        codes = {mouse.Button.left: BUTTON_LEFT, mouse.Button.right: BUTTON_RIGHT}
+
+        def _on_click(x, y, button, pressed):
+            on_click(x, y, codes.get(button, BUTTON_OTHER), pressed)
+
+        self._listener = mouse.Listener(on_click=_on_click)
+
+    def start(self) -> None:
+        self._listener.start()
+        self._listener.wait()
+
+    def stop(self) -> None:
+        self._listener.stop()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._listener.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._listener.running
+
+
+class WindowsBackend(OSBackend):
+    name = 'windows'
+
+    def display_provider(self, fallback_scale: float = 1.0, use_system_dpi: bool = True) -> DisplayProvider:
+        return Win32DisplayProvider(fallback_scale, use_system_dpi)
+
+    def window_source(self) -> WindowSource:
+        return PyGetWindowSource()
+
+    def create_listener(self, on_click: ClickCallback) -> InputListener:
+        return PynputListener(on_click)
+
+    def key_injector(self, name: str = 'direct', delay: float = 0.0) -> KeyInjector:
+        return create_injector(name, delay)
+
+    def shortcut_dir(self, kind: str) -> str:
+        programs = os.path.join(os.getenv('APPDATA', ''), 'Microsoft', 'Windows', 'Start Menu', 'Programs')
+        if kind == SHORTCUT_STARTUP:
+            return os.path.join(programs, 'Startup')
+        if kind == SHORTCUT_STARTMENU:
+            return programs
+        if kind == SHORTCUT_DESKTOP:
+            return os.path.join(os.environ['USERPROFILE'], 'Desktop')
+        raise ValueError(f"未知的快捷方式位置：{kind}")
+
+    def create_shortcut(self, path: str, target: str, icon: str = '', args: str = '') -> None:
+        from win32com.client import Dispatch
+        # 先删再建
+        if os.path.exists(path):
+            os.remove(path)
+        shell = Dispatch('WScript.Shell')
+        shortcut = shell.CreateShortCut(path)
+        shortcut.Targetpath = target
+        if args:
+            shortcut.Arguments = args
+        shortcut.WorkingDirectory = os.path.dirname(target)
+        shortcut.IconLocation = icon or target
+        shortcut.save()
+
+    def remove_shortcut(self, path: str) -> None:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# ------------------------------------------------------------------
+# 模拟后端
+# ------------------------------------------------------------------
+# 脚本事件：(相对开始的时间（秒）, x, y, 按键编码, 是否按下)
+ScriptEvent = Tuple[float, int, int, int, bool]
+
+
+class SimulatedListener(InputListener):
+    """按脚本回放鼠标事件的“钩子”。
+
+    参数:
+        script: 脚本事件序列。
+        speed: 回放速度倍数；0 表示不等待，尽快回放。
+        keep_alive: 脚本放完后是否继续运行（等待 `inject` 或 `stop`）。
+    """
+
+    def __init__(self, on_click: ClickCallback, script: Sequence[ScriptEvent] = (),
+                 speed: float = 0.0, keep_alive: bool = False):
+        self.on_click = on_click
+        self.script = script
+        self.speed = speed
+        self.keep_alive = keep_alive
+        self.delivered = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def inject(self, x: int, y: int, button: int, pressed: bool) -> None:
+        """立即送入一个鼠标事件（在调用方线程中回调）。"""
+        self.on_click(x, y, button, pressed)
+        self.delivered += 1
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='SimulatedListener', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        start = time.perf_counter()
+        for t, x, y, button, pressed in self.script:
+            if self._stop.is_set():
+                return
+            if self.speed > 0:
+                delay = start + t / self.speed - time.perf_counter()
+                if delay > 0 and self._stop.wait(delay):
+                    return
+            self.inject(x, y, button, pressed)
+        if self.keep_alive:
+            self._stop.wait()
+
+
+class SimulatedBackend(OSBackend):
+    """无界面的模拟后端：虚拟显示器、虚拟窗口、脚本化输入与内存中的按键记录。
+
+    参数:
+        monitors: 虚拟显示器布局，默认为一台 1920x1080 的 100% 缩放显示器。
+        windows: 初始的虚拟窗口列表。
+        script: 监听器启动后回放的鼠标事件。
+        speed: 脚本回放速度（0 为尽快回放）。
+    """
+
+    name = 'simulated'
+
+    def __init__(self, monitors: Optional[Sequence[Monitor]] = None,
+                 windows: Optional[Iterable[WindowInfo]] = None,
+                 script: Sequence[ScriptEvent] = (), speed: float = 0.0):
+        self.displays = StaticDisplayProvider(monitors or [Monitor(0, 0, 1920, 1080, 1.0)])
+        self.windows = StaticWindowSource(windows)
+        self.script = script
+        self.speed = speed
+        self.injector = RecordingInjector()
+        self.listeners: List[SimulatedListener] = []
+        self.shortcuts: Dict[str, Dict[str, str]] = {}
+
+    def display_provider(self, fallback_scale: float = 1.0, use_system_dpi: bool = True) -> DisplayProvider:
+        if use_system_dpi:
+            return self.displays
+        return StaticDisplayProvider([m._replace(scale=fallback_scale) for m in self.displays.monitors()])
+
+    def window_source(self) -> WindowSource:
+        return self.windows
+
+    def create_listener(self, on_click: ClickCallback) -> InputListener:
+        # 没有脚本时像真实钩子一样一直运行，直到 stop
+        listener = SimulatedListener(on_click, self.script, self.speed, keep_alive=not self.script)
+        self.listeners.append(listener)
+        return listener
+
+    def key_injector(self, name: str = 'direct', delay: float = 0.0) -> KeyInjector:
+        self.injector.delay = delay
+        return self.injector
+
+    def shortcut_dir(self, kind: str) -> str:
+        if kind not in (SHORTCUT_STARTUP, SHORTCUT_DESKTOP, SHORTCUT_STARTMENU):
+            raise ValueError(f"未知的快捷方式位置：{kind}")
+        return os.path.join('simulated', kind)
+
+    def create_shortcut(self, path: str, target: str, icon: str = '', args: str = '') -> None:
+        self.shortcuts[path] = {'target': target, 'icon': icon or target, 'args': args}
+
+    def remove_shortcut(self, path: str) -> None:
+        self.shortcuts.pop(path, None)
+
+
+# ------------------------------------------------------------------
+# 选择
+# ------------------------------------------------------------------
+BACKENDS = {
+    WindowsBackend.name: WindowsBackend,
+    SimulatedBackend.name: SimulatedBackend,
+}
+
+_backend: Optional[OSBackend] = None
+
+
+def get_backend() -> OSBackend:
+    """返回进程内使用的后端（首次调用时创建）。"""
+    global _backend
+    if _backend is None:
+        name = os.environ.get('PPT_TOUCH_BACKEND') or ('windows' if sys.platform == 'win32' else 'simulated')
+        cls = BACKENDS.get(name)
+        if cls is None:
+            raise ValueError(f"未知的系统后端：{name}")
+        _backend = cls()
+        logger.info(f"系统后端：{name}")
+    return _backend
+
+
+def set_backend(backend: OSBackend) -> None:
+    """指定进程内使用的后端（须在导入 func 之前调用）。"""
+    global _backend
+    _backend = backend
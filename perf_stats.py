@@ -0,0 +1,163 @@
+"""输入流水线分阶段延迟统计。
+
+在钩子入口、判断完成、按键注入完成三个时间点打点，汇总为固定分桶的直方图：
+分桶边界预先计算，记录一次只是一次二分查找加一次列表元素自增，没有逐事件分配，
+也不加锁（只有分发线程写入；读取方拿到的是近似快照，足够用于展示百分位）。
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+# 分桶上界（秒）：10 µs 起按 √2 倍递增，约到 10 s，最后一个桶收容更大的值
+BUCKET_BOUNDS: List[float] = [1e-5 * 2 ** (i / 2) for i in range(41)]
+
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图（单写者）。"""
+
+    __slots__ = ('name', 'bounds', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, name: str, bounds: Sequence[float] = BUCKET_BOUNDS):
+        self.name = name
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """返回第 q 分位（0~1）所在分桶的上界（秒），不超过观测到的最大值。"""
+        counts = list(self.counts)
+        n = sum(counts)
+        if n == 0:
+            return 0.0
+        rank = q * n
+        seen = 0
+        for i, c in enumerate(counts):
+            seen += c
+            if seen >= rank and c:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def reset(self) -> None:
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def summary(self) -> str:
+        if not self.count:
+            return f"{self.name}: 无数据"
+        return (f"{self.name}: n={self.count} "
+                f"p50={self.percentile(0.5) * 1000:.2f}ms "
+                f"p95={self.percentile(0.95) * 1000:.2f}ms "
+                f"p99={self.percentile(0.99) * 1000:.2f}ms "
+                f"max={self.max * 1000:.2f}ms")
+
+
+class PipelineStats:
+    """翻页流水线的分阶段统计。
+
+    - decision：钩子入口 → 判断完成（含排队等待）
+    - inject  ：判断完成 → 按键注入完成
+    - total   ：钩子入口 → 按键注入完成，超过 `slo_ms` 时计数并告警
+    """
+
+    def __init__(self, slo_ms: float = 50.0, warn_interval: float = 10.0):
+        self.decision = LatencyHistogram('判断')
+        self.inject = LatencyHistogram('注入')
+        self.total = LatencyHistogram('总计')
+        self.slo = slo_ms / 1000
+        self.slo_violations = 0
+        self.warn_interval = warn_interval
+        self._last_warn = 0.0
+        # 每次翻页后调用 on_injection(判断延迟, 注入延迟, 总延迟)，用于把数据转发给其他进程
+        self.on_injection: Optional[Callable[[float, float, float], None]] = None
+        self._reporter: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def histograms(self) -> List[LatencyHistogram]:
+        return [self.decision, self.inject, self.total]
+
+    def record_decision(self, t_hook: float, t_decided: float) -> None:
+        self.decision.record(t_decided - t_hook)
+
+    def record_injection(self, t_hook: float, t_decided: float, t_injected: float) -> None:
+        self.inject.record(t_injected - t_decided)
+        total = t_injected - t_hook
+        self.total.record(total)
+        if self.on_injection is not None:
+            self.on_injection(t_decided - t_hook, t_injected - t_decided, total)
+        if total > self.slo:
+            self.slo_violations += 1
+            if t_injected - self._last_warn >= self.warn_interval:
+                self._last_warn = t_injected
+                logger.warning(f"翻页延迟 {total * 1000:.1f}ms 超过阈值 {self.slo * 1000:.0f}ms"
+                               f"（累计 {self.slo_violations} 次）")
+
+    def merge(self, decision: float, inject: float, total: float) -> None:
+        """合并一次在其他进程中测得的翻页延迟（秒）。"""
+        self.decision.record(decision)
+        self.inject.record(inject)
+        self.total.record(total)
+        if total > self.slo:
+            self.slo_violations += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """各阶段的 p50/p95/p99/max（毫秒）与样本数。"""
+        return {
+            h.name: {
+                'count': h.count,
+                'p50_ms': h.percentile(0.5) * 1000,
+                'p95_ms': h.percentile(0.95) * 1000,
+                'p99_ms': h.percentile(0.99) * 1000,
+                'max_ms': h.max * 1000,
+            }
+            for h in self.histograms
+        }
+
+    def summary(self) -> str:
+        """单行汇总。"""
+        return ' | '.join(h.summary() for h in self.histograms) + f" | 超阈值 {self.slo_violations} 次"
+
+    def reset(self) -> None:
+        for h in self.histograms:
+            h.reset()
+        self.slo_violations = 0
+
+    # ---------- 定期汇总日志 ----------
+    def start_reporter(self, interval: float = 300.0) -> None:
+        """每隔 interval 秒通过 loguru 写一行汇总（有新样本时）。"""
+        if self._reporter is not None or interval <= 0:
+            return
+        self._stop.clear()
+
+        def _run():
+            last = -1
+            while not self._stop.wait(interval):
+                if self.decision.count != last:
+                    last = self.decision.count
+                    logger.info(f"性能统计：{self.summary()}")
+
+        self._reporter = threading.Thread(target=_run, name='PerfStatsReporter', daemon=True)
+        self._reporter.start()
+
+    def stop_reporter(self) -> None:
+        self._stop.set()
+        self._reporter = None
+
+
+# 进程内共享的统计实例
+stats = PipelineStats()
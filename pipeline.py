@@ -0,0 +1,63 @@
+"""与平台无关的翻页决策流水线。
+
+把“手势识别 → 放映判断 → 发送翻页键”串起来：func.py 用真实的窗口状态与按键注入组装它，
+回放 / 基准工具则用假的窗口状态与按键接收端组装同一条流水线。
+"""
+
+import time
+from typing import Callable, Optional
+
+from gesture import ACTION_NEXT, ACTION_PREV, TapRecognizer
+from nav_scheduler import NavScheduler
+from perf_stats import PipelineStats
+
+# 动作 -> 发送的按键
+ACTION_KEYS = {
+    ACTION_NEXT: 'space',
+    ACTION_PREV: 'left',
+}
+
+
+class InputPipeline:
+    """翻页决策流水线。
+
+    参数:
+        recognizer: 手势识别器。
+        is_showing: 返回当前是否正在放映的函数（应为 O(1) 的缓存读取）。
+        press: 发送按键的函数，参数为按键名（如 'space'）。
+        stats: 可选的分阶段延迟统计；t 需为钩子入口的 perf_counter 时间戳。
+        scheduler: 可选的翻页调度器；设置后翻页动作交给它异步注入（注入延迟由调度器记录），
+            press 不再使用。
+    """
+
+    def __init__(self, recognizer: TapRecognizer, is_showing: Callable[[], bool],
+                 press: Callable[[str], None], stats: Optional[PipelineStats] = None,
+                 scheduler: Optional[NavScheduler] = None):
+        self.recognizer = recognizer
+        self.is_showing = is_showing
+        self.press = press
+        self.stats = stats
+        self.scheduler = scheduler
+        self.injected = 0
+
+    def handle(self, t: float, x: int, y: int, button: int, pressed: bool) -> int:
+        """处理一个事件（button 为 gesture.BUTTON_* 编码），返回识别出的动作。"""
+        action = self.recognizer.feed(t, x, y, button, pressed)
+        if action and self.is_showing():
+            stats = self.stats
+            if self.scheduler is not None:
+                t_decided = time.perf_counter()
+                if stats is not None:
+                    stats.record_decision(t, t_decided)
+                self.scheduler.submit(action, t, t_decided)
+            elif stats is None:
+                self.press(ACTION_KEYS[action])
+            else:
+                t_decided = time.perf_counter()
+                stats.record_decision(t, t_decided)
+                self.press(ACTION_KEYS[action])
+                stats.record_injection(t, t_decided, time.perf_counter())
+            self.injected += 1
+        elif self.stats is not None:
+            self.stats.record_decision(t, time.perf_counter())
+        return action
@@ -0,0 +1,159 @@
+"""远程版本信息（version.json）的获取与缓存。
+
+- 结果连同 ETag / Last-Modified 缓存在用户配置目录，更新窗口打开时先显示缓存，不等网络；
+- 再次检查时发送 If-None-Match / If-Modified-Since 条件请求，未变化时服务器返回 304；
+- `PeriodicChecker` 可在后台定期检查，失败时按指数退避重试。
+
+网络栈（requests）在首次真正发起请求时才导入，不影响冷启动。
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from loguru import logger
+
+import conf_file
+
+DEFAULT_VERSION_URL = "https://wrd1145.dev/version.json"
+CACHE_PATH = os.path.join(conf_file.CONFIG_DIR, 'release_cache.json')
+
+
+class ReleaseChecker:
+    """带磁盘缓存与条件请求的版本检查器。"""
+
+    def __init__(self, url: str = DEFAULT_VERSION_URL, cache_path: str = CACHE_PATH,
+                 timeout: float = 10, session=None):
+        self.url = url
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self._session = session
+        self._lock = threading.Lock()
+        self.not_modified_count = 0
+
+    # ---------- 缓存 ----------
+    def _load_cache(self) -> dict:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # 版本地址变化后旧缓存作废
+        return cache if cache.get('url') == self.url else {}
+
+    def _save_cache(self, cache: dict) -> None:
+        tmp = self.cache_path + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            logger.warning(f"保存版本缓存失败：{e}")
+
+    def cached(self) -> Optional[dict]:
+        """返回上次成功获取的版本信息（没有缓存时为 None）。"""
+        return self._load_cache().get('info')
+
+    def cached_at(self) -> Optional[float]:
+        """上次成功检查的时间戳。"""
+        return self._load_cache().get('checked_at')
+
+    # ---------- 网络 ----------
+    def check(self) -> Tuple[dict, bool]:
+        """向服务器检查版本信息。
+
+        返回:
+            (版本信息, 是否有变化)：收到 304 时返回缓存内容与 False。
+        异常:
+            网络错误或返回内容无效时抛出异常，由调用方处理。
+        """
+        with self._lock:
+            if self._session is None:
+                from downloader import get_session
+                self._session = get_session()
+            cache = self._load_cache()
+            headers = {}
+            if cache.get('info'):
+                if cache.get('etag'):
+                    headers['If-None-Match'] = cache['etag']
+                if cache.get('last_modified'):
+                    headers['If-Modified-Since'] = cache['last_modified']
+            resp = self._session.get(self.url, headers=headers, timeout=self.timeout)
+            if resp.status_code == 304 and cache.get('info'):
+                self.not_modified_count += 1
+                cache['checked_at'] = time.time()
+                self._save_cache(cache)
+                return cache['info'], False
+            resp.raise_for_status()
+            info = resp.json()
+            if 'version' not in info or 'url' not in info:
+                raise ValueError("版本信息缺少 version / url 字段")
+            changed = info != cache.get('info')
+            self._save_cache({
+                'url': self.url,
+                'etag': resp.headers.get('ETag'),
+                'last_modified': resp.headers.get('Last-Modified'),
+                'checked_at': time.time(),
+                'info': info,
+            })
+            return info, changed
+
+
+class PeriodicChecker:
+    """后台定期检查版本，失败时指数退避。
+
+    参数:
+        checker: 版本检查器。
+        interval: 正常检查间隔（秒）。
+        on_result: 每次检查成功后调用 on_result(info, changed)（在后台线程中调用）。
+        initial_delay: 首次检查前的等待（秒），避免与开机启动抢资源。
+        min_backoff: 失败后的首次重试等待（秒），之后每次翻倍，不超过 interval。
+    """
+
+    def __init__(self, checker: ReleaseChecker, interval: float,
+                 on_result: Callable[[dict, bool], None],
+                 initial_delay: float = 60.0, min_backoff: float = 60.0):
+        self.checker = checker
+        self.interval = interval
+        self.on_result = on_result
+        self.initial_delay = initial_delay
+        self.min_backoff = min_backoff
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def next_delay(self) -> float:
+        """根据连续失败次数计算下一次检查前的等待时间。"""
+        if self.failures == 0:
+            return self.interval
+        return min(self.interval, self.min_backoff * 2 ** (self.failures - 1))
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='ReleaseChecker', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def _run(self) -> None:
+        delay = self.initial_delay
+        while not self._stop.wait(delay):
+            try:
+                info, changed = self.checker.check()
+            except Exception as e:
+                self.failures += 1
+                delay = self.next_delay()
+                logger.warning(f"后台检查更新失败（第 {self.failures} 次）：{e}，{delay:.0f}s 后重试")
+                continue
+            self.failures = 0
+            delay = self.next_delay()
+            try:
+                self.on_result(info, changed)
+            except Exception as e:
+                logger.exception(f"处理版本检查结果失败：{e}")
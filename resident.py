@@ -0,0 +1,110 @@
+"""常驻托盘时的低占用模式与资源占用报告。
+
+程序在教室电脑的托盘里一挂就是一整天，而设置对话框、更新窗口、启动提示窗口及其图片缓存
+创建后从不释放。`IdleReaper` 记录每个次要窗口最近一次被使用的时间，空闲超过阈值后调用
+注册的释放函数（窗口下次打开时再重新创建）；`ResourceMeter` 用 psutil 报告常驻内存与
+空闲唤醒次数（上下文切换）。
+
+本模块不依赖 Qt：定时由调用方驱动（main.py 中为单次触发的 QTimer，没有活动时不会周期性唤醒）。
+"""
+
+import gc
+import time
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+
+class IdleReaper:
+    """空闲释放器。
+
+    参数:
+        idle_timeout: 空闲多少秒后释放（0 为不释放）。
+    """
+
+    def __init__(self, idle_timeout: float):
+        self.idle_timeout = idle_timeout
+        self.teardown_count = 0
+        self._releasers: Dict[str, Callable[[], bool]] = {}
+        self._last_used: Dict[str, float] = {}
+
+    def register(self, name: str, release: Callable[[], bool]) -> None:
+        """注册可释放的资源；release() 返回是否真的释放了（如窗口正在显示时可拒绝）。"""
+        self._releasers[name] = release
+        self._last_used.setdefault(name, time.monotonic())
+
+    def touch(self, name: str) -> None:
+        """记录资源被使用。"""
+        self._last_used[name] = time.monotonic()
+
+    def next_deadline(self) -> Optional[float]:
+        """距最早一个资源到期的秒数；没有可释放资源或已关闭时为 None。"""
+        if self.idle_timeout <= 0 or not self._last_used:
+            return None
+        now = time.monotonic()
+        return max(0.0, min(t + self.idle_timeout - now for t in self._last_used.values()))
+
+    def reap(self, force: bool = False) -> int:
+        """释放所有空闲超时（force 时为全部）的资源，返回释放的数量。"""
+        now = time.monotonic()
+        released = 0
+        for name, release in self._releasers.items():
+            last = self._last_used.get(name)
+            if last is None or (not force and now - last < self.idle_timeout):
+                continue
+            try:
+                ok = release()
+            except Exception as e:
+                logger.warning(f"释放 {name} 失败：{e}")
+                ok = False
+            if ok:
+                # 已释放的资源在下次使用（touch）前不再计时
+                del self._last_used[name]
+                released += 1
+            else:
+                self._last_used[name] = now
+        if released:
+            gc.collect()
+            self.teardown_count += released
+            logger.info(f"空闲释放 {released} 项界面资源")
+        return released
+
+
+class ResourceMeter:
+    """进程资源占用：常驻内存（RSS）、线程数、CPU 时间与空闲唤醒次数。
+
+    唤醒次数以上下文切换数近似，`report()` 同时给出自上次报告以来的平均每秒唤醒。
+    """
+
+    def __init__(self):
+        import psutil
+        self._proc = psutil.Process()
+        self._last: Optional[tuple] = None
+
+    def sample(self) -> dict:
+        p = self._proc
+        with p.oneshot():
+            mem = p.memory_info()
+            ctx = p.num_ctx_switches()
+            cpu = p.cpu_times()
+            threads = p.num_threads()
+        now = time.monotonic()
+        switches = ctx.voluntary + ctx.involuntary
+        rate = None
+        if self._last is not None and now > self._last[0]:
+            rate = (switches - self._last[1]) / (now - self._last[0])
+        self._last = (now, switches)
+        return {
+            'rss_mb': mem.rss / 1048576,
+            'vms_mb': mem.vms / 1048576,
+            'threads': threads,
+            'cpu_s': cpu.user + cpu.system,
+            'ctx_switches': switches,
+            'wakeups_per_s': rate,
+        }
+
+    def report(self) -> str:
+        s = self.sample()
+        rate = '—' if s['wakeups_per_s'] is None else f"{s['wakeups_per_s']:.1f}/s"
+        return (f"常驻内存 {s['rss_mb']:.1f} MB，线程 {s['threads']}，CPU 时间 {s['cpu_s']:.1f} s，"
+                f"上下文切换 {s['ctx_switches']}（自上次 {rate}）")
@@ -0,0 +1,347 @@
+"""屏幕区域索引：多显示器、按显示器 DPI 缩放的排除 / 动作区域。
+
+原先 func.py 在导入时按主屏分辨率和用户选择的缩放比例算出一组阈值，
+接投影仪等多显示器场景下并不正确，显示设置变化后也不会更新。这里：
+
+1. `DisplayProvider` 提供显示器列表（Windows 下读取每个显示器的真实 DPI，测试时可用固定布局）；
+2. 每个显示器按 `ZoneSpec` 生成区域矩形（以 96 DPI 下的像素为单位，按该显示器缩放）；
+3. 编译为 `ZoneMap`：把虚拟桌面划分为固定大小的网格，每格预先记录区域类型，
+   只有跨越区域边界的格子才需要检查少量矩形，命中测试为 O(1)；
+4. `ZoneMapManager` 在显示器变化时重建并整体替换 `zone_map` 属性，读取方无需加锁。
+"""
+
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from loguru import logger
+
+# 区域类型
+ZONE_ACTION = 0     # 普通区域：点击可翻页
+ZONE_EXCLUDED = 1   # 排除区域：菜单 / 任务栏等，点击不翻页
+
+_CELL_MIXED = 255   # 网格内含多种区域，需逐个矩形检查
+
+
+class Monitor(NamedTuple):
+    """显示器（物理像素坐标）与其缩放比例（DPI / 96）。"""
+    left: int
+    top: int
+    width: int
+    height: int
+    scale: float = 1.0
+
+    @property
+    def right(self) -> int:
+        return self.left + self.width
+
+    @property
+    def bottom(self) -> int:
+        return self.top + self.height
+
+
+class ZoneSpec(NamedTuple):
+    """相对显示器边缘定义的区域（单位为 96 DPI 下的像素）。
+
+    edge 取值：
+        'bottom' / 'top' / 'left' / 'right'：贴边的条带，size 为条带宽度；
+        'rect'：矩形，rect 为相对显示器左上角的 (x, y, w, h)。
+    """
+    kind: int
+    edge: str
+    size: int = 0
+    rect: Tuple[int, int, int, int] = (0, 0, 0, 0)
+
+
+# 默认区域：底部任务栏、左右两侧 PPT 放映菜单按钮（与原先 95 像素的阈值一致）
+DEFAULT_SPECS = (
+    ZoneSpec(ZONE_EXCLUDED, 'bottom', 95),
+    ZoneSpec(ZONE_EXCLUDED, 'left', 95),
+    ZoneSpec(ZONE_EXCLUDED, 'right', 95),
+)
+
+Rect = Tuple[int, int, int, int, int]   # (x0, y0, x1, y1, 区域类型)，右、下边界不含
+
+
+def _spec_rect(mon: Monitor, spec: ZoneSpec) -> Tuple[int, int, int, int]:
+    s = int(round(spec.size * mon.scale))
+    if spec.edge == 'bottom':
+        return mon.left, mon.bottom - s, mon.right, mon.bottom
+    if spec.edge == 'top':
+        return mon.left, mon.top, mon.right, mon.top + s
+    if spec.edge == 'left':
+        return mon.left, mon.top, mon.left + s, mon.bottom
+    if spec.edge == 'right':
+        return mon.right - s, mon.top, mon.right, mon.bottom
+    if spec.edge == 'rect':
+        x, y, w, h = (int(round(v * mon.scale)) for v in spec.rect)
+        return mon.left + x, mon.top + y, mon.left + x + w, mon.top + y + h
+    raise ValueError(f"未知的区域类型：{spec.edge}")
+
+
+class ZoneMap:
+    """编译后的区域索引（不可变）。
+
+    每个显示器先整体记为 ZONE_ACTION，再按顺序叠加各区域（后者覆盖前者）；
+    不在任何显示器上的坐标按 `offscreen` 处理。
+    """
+
+    def __init__(self, monitors: Sequence[Monitor], specs: Sequence[ZoneSpec] = DEFAULT_SPECS,
+                 cell: int = 32, offscreen: int = ZONE_EXCLUDED):
+        self.monitors = tuple(monitors)
+        self.offscreen = offscreen
+        self.cell = cell
+        # 按绘制顺序排列的矩形：显示器底色在前，区域在后
+        rects: List[Rect] = []
+        for mon in self.monitors:
+            rects.append((mon.left, mon.top, mon.right, mon.bottom, ZONE_ACTION))
+            for spec in specs:
+                x0, y0, x1, y1 = _spec_rect(mon, spec)
+                # 区域裁剪到所属显示器内
+                x0, y0 = max(x0, mon.left), max(y0, mon.top)
+                x1, y1 = min(x1, mon.right), min(y1, mon.bottom)
+                if x0 < x1 and y0 < y1:
+                    rects.append((x0, y0, x1, y1, spec.kind))
+        self.rects = tuple(rects)
+
+        if self.monitors:
+            self.x0 = min(m.left for m in self.monitors)
+            self.y0 = min(m.top for m in self.monitors)
+            x1 = max(m.right for m in self.monitors)
+            y1 = max(m.bottom for m in self.monitors)
+        else:
+            self.x0 = self.y0 = x1 = y1 = 0
+        self.cols = max(1, -(-(x1 - self.x0) // cell))
+        self.rows = max(1, -(-(y1 - self.y0) // cell))
+        self._cells = bytearray(self.cols * self.rows)
+        self._mixed: Dict[int, Tuple[Rect, ...]] = {}
+        self._compile()
+
+    def _compile(self) -> None:
+        cell = self.cell
+        for row in range(self.rows):
+            cy0 = self.y0 + row * cell
+            cy1 = cy0 + cell
+            for col in range(self.cols):
+                cx0 = self.x0 + col * cell
+                cx1 = cx0 + cell
+                hits = tuple(r for r in self.rects if r[0] < cx1 and r[2] > cx0 and r[1] < cy1 and r[3] > cy0)
+                idx = row * self.cols + col
+                # 最后叠加的矩形完整覆盖该格时，格子类型可直接确定
+                if not hits:
+                    kind = self.offscreen
+                else:
+                    r = hits[-1]
+                    full = r[0] <= cx0 and r[2] >= cx1 and r[1] <= cy0 and r[3] >= cy1
+                    kind = r[4] if full else None
+                if kind is None:
+                    self._cells[idx] = _CELL_MIXED
+                    self._mixed[idx] = hits
+                else:
+                    self._cells[idx] = kind
+
+    def hit_test(self, x: int, y: int) -> int:
+        """返回坐标所在区域的类型（ZONE_*）。"""
+        col = (x - self.x0) // self.cell
+        row = (y - self.y0) // self.cell
+        if col < 0 or row < 0 or col >= self.cols or row >= self.rows:
+            return self.offscreen
+        idx = row * self.cols + col
+        kind = self._cells[idx]
+        if kind != _CELL_MIXED:
+            return kind
+        for r in reversed(self._mixed[idx]):
+            if r[0] <= x < r[2] and r[1] <= y < r[3]:
+                return r[4]
+        return self.offscreen
+
+    def is_excluded(self, x: int, y: int) -> bool:
+        return self.hit_test(x, y) == ZONE_EXCLUDED
+
+
+# ------------------------------------------------------------------
+# 显示器来源
+# ------------------------------------------------------------------
+class DisplayProvider:
+    """显示器列表来源接口。"""
+
+    def monitors(self) -> List[Monitor]:
+        raise NotImplementedError
+
+    def primary_monitor(self) -> Monitor:
+        """读取显示器列表失败时使用的单屏布局（主显示器分辨率）。"""
+        raise NotImplementedError
+
+
+class StaticDisplayProvider(DisplayProvider):
+    """固定（可手动替换）的显示器布局，用于测试或无桌面环境。"""
+
+    def __init__(self, monitors: Sequence[Monitor]):
+        self._monitors = list(monitors)
+
+    def monitors(self) -> List[Monitor]:
+        return list(self._monitors)
+
+    def primary_monitor(self) -> Monitor:
+        return self._monitors[0]
+
+    def set_monitors(self, monitors: Sequence[Monitor]) -> None:
+        self._monitors = list(monitors)
+
+
+class Win32DisplayProvider(DisplayProvider):
+    """通过 EnumDisplayMonitors + GetDpiForMonitor 读取显示器与各自 DPI。
+
+    参数:
+        fallback_scale: 无法读取 DPI（旧系统）时使用的缩放比例。
+        use_system_dpi: 为 False 时忽略系统 DPI，所有显示器都使用 fallback_scale。
+    """
+
+    def __init__(self, fallback_scale: float = 1.0, use_system_dpi: bool = True):
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self.fallback_scale = fallback_scale
+        self.use_system_dpi = use_system_dpi
+        self._user32 = ctypes.windll.user32
+        try:
+            # 让坐标与 DPI 都以物理像素返回（与鼠标钩子的坐标一致）
+            self._user32.SetProcessDpiAwarenessContext(ctypes.c_void_p(-4))
+        except Exception:
+            pass
+        try:
+            self._shcore = ctypes.windll.shcore
+        except OSError:
+            self._shcore = None
+
+    def _dpi_scale(self, hmon) -> float:
+        if not self.use_system_dpi or self._shcore is None:
+            return self.fallback_scale
+        dpi_x = self._wintypes.UINT()
+        dpi_y = self._wintypes.UINT()
+        # MDT_EFFECTIVE_DPI = 0
+        if self._shcore.GetDpiForMonitor(hmon, 0, self._ctypes.byref(dpi_x), self._ctypes.byref(dpi_y)) != 0:
+            return self.fallback_scale
+        return dpi_x.value / 96
+
+    def monitors(self) -> List[Monitor]:
+        ctypes, wintypes = self._ctypes, self._wintypes
+
+        class MONITORINFO(ctypes.Structure):
+            _fields_ = [('cbSize', wintypes.DWORD), ('rcMonitor', wintypes.RECT),
+                        ('rcWork', wintypes.RECT), ('dwFlags', wintypes.DWORD)]
+
+        result: List[Monitor] = []
+        MONITORENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HMONITOR, wintypes.HDC,
+                                             ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+
+        def _cb(hmon, hdc, rect, lparam):
+            info = MONITORINFO()
+            info.cbSize = ctypes.sizeof(MONITORINFO)
+            if self._user32.GetMonitorInfoW(hmon, ctypes.byref(info)):
+                r = info.rcMonitor
+                result.append(Monitor(r.left, r.top, r.right - r.left, r.bottom - r.top, self._dpi_scale(hmon)))
+            return 1
+
+        self._user32.EnumDisplayMonitors(None, None, MONITORENUMPROC(_cb), 0)
+        return result
+
+    def primary_monitor(self) -> Monitor:
+        # SM_CXSCREEN / SM_CYSCREEN，与原先按主屏分辨率计算排除区域相同
+        return Monitor(0, 0, self._user32.GetSystemMetrics(0), self._user32.GetSystemMetrics(1),
+                       self.fallback_scale)
+
+
+# ------------------------------------------------------------------
+# 管理器
+# ------------------------------------------------------------------
+class ZoneMapManager:
+    """持有当前 `zone_map`，显示器变化时原子替换。
+
+    Windows 的 WM_DISPLAYCHANGE 只发给顶层窗口，这里用低频轮询显示器列表检测变化；
+    也可由外部（如 Qt 的 screenAdded / screenRemoved）调用 `notify()` 立即检查。
+    """
+
+    def __init__(self, provider: DisplayProvider, specs: Sequence[ZoneSpec] = DEFAULT_SPECS,
+                 poll_interval: float = 2.0, on_rebuild: Optional[Callable[[ZoneMap], None]] = None):
+        self.provider = provider
+        self.specs = tuple(specs)
+        self.poll_interval = poll_interval
+        self.on_rebuild = on_rebuild
+        self.rebuild_count = 0
+        self.zone_map = ZoneMap([], self.specs, offscreen=ZONE_ACTION)
+        # 串行化重建（后台轮询与配置重新加载可能同时触发），读取 zone_map 仍无需加锁
+        self._rebuild_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.rebuild()
+
+    def is_excluded(self, x: int, y: int) -> bool:
+        return self.zone_map.hit_test(x, y) == ZONE_EXCLUDED
+
+    def _fallback_monitors(self, error: Exception) -> Tuple[Monitor, ...]:
+        """显示器列表不可用时沿用当前布局；尚无布局时退回主显示器单屏布局，仍失败时返回空。"""
+        if self.zone_map.monitors:
+            logger.warning(f"读取显示器信息失败，沿用当前布局：{error}")
+            return self.zone_map.monitors
+        try:
+            primary = self.provider.primary_monitor()
+        except Exception as e:
+            logger.error(f"读取显示器信息失败（{error}），也无法读取主显示器分辨率：{e}")
+            return ()
+        logger.warning(f"读取显示器信息失败，按主显示器单屏布局计算排除区域 {primary}：{error}")
+        return (primary,)
+
+    def rebuild(self, specs: Optional[Sequence[ZoneSpec]] = None, notify: bool = True,
+                provider: Optional[DisplayProvider] = None) -> bool:
+        """读取显示器列表；布局或区域定义变化时重新编译并替换，返回是否重建。
+
+        provider 不为 None 时在锁内替换显示器来源，与 specs 一起生效（避免后台轮询用新来源
+        编译旧区域定义）。notify 为 False 时不调用 on_rebuild（调用方会自行读取新的 zone_map）。
+        """
+        if specs is not None:
+            specs = tuple(specs)
+        with self._rebuild_lock:
+            if provider is not None:
+                self.provider = provider
+            try:
+                monitors = tuple(self.provider.monitors())
+                if not monitors:
+                    raise RuntimeError("未枚举到显示器")
+            except Exception as e:
+                monitors = self._fallback_monitors(e)
+            if monitors == self.zone_map.monitors and (specs is None or specs == self.specs):
+                return False
+            if specs is not None:
+                self.specs = specs
+            # 完全没有显示器信息时屏幕外按可翻页处理，避免所有点击都被排除
+            new_map = ZoneMap(monitors, self.specs, offscreen=ZONE_EXCLUDED if monitors else ZONE_ACTION)
+            self.zone_map = new_map
+            self.rebuild_count += 1
+            logger.info(f"屏幕区域已重建：{len(monitors)} 个显示器 {list(monitors)}")
+            if notify and self.on_rebuild is not None:
+                self.on_rebuild(new_map)
+            return True
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='DisplayWatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if not self._stop.is_set():
+                self.rebuild()
@@ -1,11 +1,10 @@
 import os
-from win32com.client import Dispatch
+from os_backend import SHORTCUT_DESKTOP, SHORTCUT_STARTMENU, SHORTCUT_STARTUP, get_backend
 
 program_name = 'PowerPoint 触屏辅助'
 
 
-def add_to_startup(file_path="", icon_path=""):
-    """添加开机自启快捷方式"""
+def _resolve(file_path, icon_path):
     if file_path == "":
         file_path = os.path.realpath(__file__)
     else:
@@ -13,80 +12,39 @@ def add_to_startup(file_path="", icon_path=""):
 
     if icon_path == "":
         icon_path = file_path
+    return file_path, icon_path
 
-    startup_folder = os.path.join(os.getenv('APPDATA'), 'Microsoft', 'Windows', 'Start Menu', 'Programs', 'Startup')
-    shortcut_path = os.path.join(startup_folder, f'{program_name}.lnk')
 
-    # 先删再建
-    if os.path.exists(shortcut_path):
-        os.remove(shortcut_path)
-
-    shell = Dispatch('WScript.Shell')
-    shortcut = shell.CreateShortCut(shortcut_path)
-    shortcut.Targetpath = file_path
-    shortcut.WorkingDirectory = os.path.dirname(file_path)
-    shortcut.IconLocation = icon_path
-    shortcut.save()
+def add_to_startup(file_path="", icon_path=""):
+    """添加开机自启快捷方式"""
+    file_path, icon_path = _resolve(file_path, icon_path)
+    backend = get_backend()
+    shortcut_path = os.path.join(backend.shortcut_dir(SHORTCUT_STARTUP), f'{program_name}.lnk')
+    backend.create_shortcut(shortcut_path, file_path, icon_path)
 
 
 def remove_from_startup():
     """移除开机自启快捷方式"""
-    startup_folder = os.path.join(os.getenv('APPDATA'), 'Microsoft', 'Windows', 'Start Menu', 'Programs', 'Startup')
-    shortcut_path = os.path.join(startup_folder, f'{program_name}.lnk')
-    if os.path.exists(shortcut_path):
-        os.remove(shortcut_path)
+    backend = get_backend()
+    shortcut_path = os.path.join(backend.shortcut_dir(SHORTCUT_STARTUP), f'{program_name}.lnk')
+    backend.remove_shortcut(shortcut_path)
 
 
 def add_to_desktop(file_path="", icon_path=""):
     """添加桌面快捷方式"""
-    if file_path == "":
-        file_path = os.path.realpath(__file__)
-    else:
-        file_path = os.path.abspath(file_path)
-
-    if icon_path == "":
-        icon_path = file_path
-
-    desktop_folder = os.path.join(os.environ['USERPROFILE'], 'Desktop')
-    shortcut_path = os.path.join(desktop_folder, f'{program_name}.lnk')
-
-    # 先删再建
-    if os.path.exists(shortcut_path):
-        os.remove(shortcut_path)
-
-    shell = Dispatch('WScript.Shell')
-    shortcut = shell.CreateShortCut(shortcut_path)
-    shortcut.Targetpath = file_path
-    shortcut.WorkingDirectory = os.path.dirname(file_path)
-    shortcut.IconLocation = icon_path
-    shortcut.save()
+    file_path, icon_path = _resolve(file_path, icon_path)
+    backend = get_backend()
+    shortcut_path = os.path.join(backend.shortcut_dir(SHORTCUT_DESKTOP), f'{program_name}.lnk')
+    backend.create_shortcut(shortcut_path, file_path, icon_path)
 
 
 def add_to_startmenu(file_path="", icon_path="", name='PowerPoint 触屏辅助', args=''):
     """添加开始菜单快捷方式"""
-    if file_path == "":
-        file_path = os.path.realpath(__file__)
-    else:
-        file_path = os.path.abspath(file_path)
-
-    if icon_path == "":
-        icon_path = file_path
-
-    menu_folder = os.path.join(os.getenv('APPDATA'), 'Microsoft', 'Windows', 'Start Menu', 'Programs')
-    shortcut_path = os.path.join(menu_folder, f'{name}.lnk')
-
-    # ****** 关键：先删再建 ******
-    if os.path.exists(shortcut_path):
-        os.remove(shortcut_path)
-
-    shell = Dispatch('WScript.Shell')
-    shortcut = shell.CreateShortCut(shortcut_path)
-    shortcut.Targetpath = file_path
-    shortcut.Arguments = args
-    shortcut.WorkingDirectory = os.path.dirname(file_path)
-    shortcut.IconLocation = icon_path
-    shortcut.save()
+    file_path, icon_path = _resolve(file_path, icon_path)
+    backend = get_backend()
+    shortcut_path = os.path.join(backend.shortcut_dir(SHORTCUT_STARTMENU), f'{name}.lnk')
+    backend.create_shortcut(shortcut_path, file_path, icon_path, args)
 
 
 if __name__ == '__main__':
-    add_to_startup('PowerPoint_TouchAssist.exe')
\ No newline at end of file
+    add_to_startup('PowerPoint_TouchAssist.exe')
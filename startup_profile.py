@@ -0,0 +1,114 @@
+"""启动耗时分析（main.py --profile-startup）。
+
+在 sys.meta_path 最前面插入一个计时查找器，包装每个模块的 `exec_module`，
+记录各模块的自身耗时与累计耗时（含其导入的子模块）；托盘图标显示后
+输出导入耗时排行与“启动至托盘可见”的总耗时。打包后的 exe 中同样可用。
+"""
+
+import sys
+import time
+from importlib.abc import MetaPathFinder
+from typing import Dict, List, Optional, Tuple
+
+# 模块名 -> [自身耗时, 累计耗时]（秒）
+_timings: Dict[str, List[float]] = {}
+_stack: List[List[float]] = []
+_finder: Optional['_TimingFinder'] = None
+
+
+class _TimedLoader:
+    """代理原始 loader，只对 exec_module 计时，其余属性原样转发。"""
+
+    def __init__(self, loader, name: str):
+        self._loader = loader
+        self._name = name
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # 子模块耗时累加到 frame[0]，用于从累计耗时中扣除
+        frame = [0.0]
+        _stack.append(frame)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            # 执行结束后还原 loader，避免影响 importlib.reload 等后续操作
+            if getattr(module, '__loader__', None) is self:
+                module.__loader__ = self._loader
+            spec = getattr(module, '__spec__', None)
+            if spec is not None and spec.loader is self:
+                spec.loader = self._loader
+            total = time.perf_counter() - start
+            _stack.pop()
+            if _stack:
+                _stack[-1][0] += total
+            _timings[self._name] = [total - frame[0], total]
+
+
+class _TimingFinder(MetaPathFinder):
+    """委托给其余查找器，并把找到的 loader 换成计时代理。"""
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, fullname)
+                return spec
+        return None
+
+
+def install() -> None:
+    """开始记录模块导入耗时（应在其他导入之前调用）。"""
+    global _finder
+    if _finder is None:
+        _finder = _TimingFinder()
+        sys.meta_path.insert(0, _finder)
+
+
+def uninstall() -> None:
+    global _finder
+    if _finder is not None:
+        sys.meta_path.remove(_finder)
+        _finder = None
+
+
+def top_imports(limit: int = 25) -> List[Tuple[str, float, float]]:
+    """按累计耗时排序的 (模块名, 自身毫秒, 累计毫秒)。"""
+    rows = [(name, t[0] * 1000, t[1] * 1000) for name, t in _timings.items()]
+    rows.sort(key=lambda r: r[2], reverse=True)
+    return rows[:limit]
+
+
+def process_age() -> Optional[float]:
+    """进程创建至今的秒数（需要 psutil），不可用时返回 None。"""
+    try:
+        import psutil
+        return time.time() - psutil.Process().create_time()
+    except Exception:
+        return None
+
+
+def report(main_started: float, limit: int = 25) -> str:
+    """生成启动耗时报告。
+
+    参数:
+        main_started: main.py 开始执行时的 perf_counter 时间戳。
+    """
+    lines = [f"{'模块':<40}{'自身(ms)':>12}{'累计(ms)':>12}"]
+    for name, self_ms, total_ms in top_imports(limit):
+        lines.append(f"{name:<40}{self_ms:>12.1f}{total_ms:>12.1f}")
+    lines.append(f"已计时模块数：{len(_timings)}，"
+                 f"导入总耗时：{sum(t[0] for t in _timings.values()) * 1000:.1f} ms")
+    lines.append(f"main.py 开始执行至托盘可见：{(time.perf_counter() - main_started) * 1000:.1f} ms")
+    age = process_age()
+    if age is not None:
+        lines.append(f"进程创建至托盘可见：{age * 1000:.1f} ms")
+    return '\n'.join(lines)
@@ -0,0 +1,127 @@
+"""放映窗口匹配器：把多条窗口规则编译为一次匹配。
+
+原先只能配置一个标题子串（General/PPT_Title），同时使用 PowerPoint、WPS 演示、
+LibreOffice Impress 且界面语言不同的机器需要多轮枚举。这里每条规则一行：
+
+    标题子串
+    re:标题正则
+    标题子串 ; class=窗口类名 ; process=进程名.exe
+
+- 不带前缀的标题按普通子串匹配（与原先的 PPT_Title 相同），`re:` 前缀为正则表达式；
+- class / process 可选，不区分大小写，须完全相同；标题留空时只按类名 / 进程名匹配；
+- 所有标题规则合并为一个正则，每个窗口标题只扫描一遍；
+- 进程名读取较慢，仅在标题（及类名）已匹配、且规则要求进程名时才查询。
+
+`matcher_from_config` 按配置文本缓存，配置未变化时不会重新编译。
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class WindowRule(NamedTuple):
+    """一条窗口规则。"""
+    pattern: str                    # 正则表达式（普通子串已转义）
+    class_name: str = ''            # 小写；空为不限
+    process: str = ''               # 小写；空为不限
+    source: str = ''                # 原始配置文本（用于日志）
+
+
+def parse_rule(line: str) -> Optional[WindowRule]:
+    """解析一行规则；空行与 # 开头的注释返回 None。"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    parts = [p.strip() for p in line.split(';')]
+    title, options = parts[0], parts[1:]
+    if title.startswith('re:'):
+        pattern = title[3:]
+        re.compile(pattern)     # 无效正则在此处报错，而不是合并后才报错
+    else:
+        pattern = re.escape(title)
+    class_name = process = ''
+    for opt in options:
+        key, _, value = opt.partition('=')
+        key = key.strip().lower()
+        if key == 'class':
+            class_name = value.strip().lower()
+        elif key == 'process':
+            process = value.strip().lower()
+        elif key:
+            raise ValueError(f"未知的窗口规则选项：{opt}")
+    return WindowRule(pattern, class_name, process, line)
+
+
+class TitleMatcher:
+    """编译后的窗口匹配器（不可变）。"""
+
+    def __init__(self, rules: Sequence[WindowRule]):
+        self.rules: Tuple[WindowRule, ...] = tuple(rules)
+        self.needs_class = any(r.class_name for r in self.rules)
+        self.needs_process = any(r.process for r in self.rules)
+        # 无附加条件的规则只需知道“是否有任意一条命中”，合并为一个无分组的正则
+        plain = [r.pattern for r in self.rules if not r.class_name and not r.process]
+        self._plain = re.compile('|'.join(f'(?:{p})' for p in plain)) if plain else None
+        # 带条件的规则用命名分组，命中后再检查对应的类名 / 进程名
+        self._conditional = [r for r in self.rules if r.class_name or r.process]
+        self._cond_re = (re.compile('|'.join(f'(?P<r{i}>{r.pattern})' for i, r in enumerate(self._conditional)))
+                         if self._conditional else None)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def match(self, title: str, class_name: str = '',
+              process: Optional[Callable[[], str]] = None) -> bool:
+        """判断窗口是否为放映窗口。
+
+        参数:
+            title: 窗口标题。
+            class_name: 窗口类名。
+            process: 返回进程名的函数，仅在需要时调用。
+        """
+        if self._plain is not None and self._plain.search(title):
+            return True
+        if self._cond_re is None:
+            return False
+        m = self._cond_re.search(title)
+        if m is None:
+            return False
+        # 合并正则只报告最先命中的一条；它的附加条件不满足时，再逐条检查其余规则
+        first = next(i for i in range(len(self._conditional)) if m.group(f'r{i}') is not None)
+        order = [first] + [i for i in range(len(self._conditional)) if i != first]
+        proc_name: Optional[str] = None
+        lowered_class = class_name.lower()
+        for i in order:
+            rule = self._conditional[i]
+            if i != first and not re.search(rule.pattern, title):
+                continue
+            if rule.class_name and rule.class_name != lowered_class:
+                continue
+            if rule.process:
+                if proc_name is None:
+                    proc_name = (process() if process is not None else '').lower()
+                if rule.process != proc_name:
+                    continue
+            return True
+        return False
+
+
+def parse_rules(text: str) -> List[WindowRule]:
+    """解析多行规则文本。"""
+    rules = []
+    for line in text.splitlines():
+        rule = parse_rule(line)
+        if rule is not None:
+            rules.append(rule)
+    return rules
+
+
+@lru_cache(maxsize=8)
+def matcher_from_config(title: str, patterns: str = '') -> TitleMatcher:
+    """由 General/PPT_Title（普通子串）与 General/Window_Patterns（多行规则）编译匹配器。
+
+    按两项配置的文本缓存，配置未变化时直接返回已编译的匹配器。
+    """
+    rules = [WindowRule(re.escape(title), source=title)] if title else []
+    return TitleMatcher(rules + parse_rules(patterns))
@@ -0,0 +1,226 @@
+"""预编译的界面与资源包。
+
+原先主窗口与设置对话框每次构造都用 `uic.loadUi` 解析 .ui XML，更新窗口每次打开都从
+相对路径重新读取 img/favicon.ico（工作目录不是程序目录时还会读不到）。这里：
+
+- 把 main.ui / settings.ui / updater.ui 编译为 ui_generated/ui_<名称>.py，文件头记录源文件的
+  SHA-256，源码运行时 .ui 变化后自动重新生成；
+- 把 img/ 与 icon.png 打包为 ui_generated/resources.py，界面中的图片都从这里加载并按名称缓存；
+- 打包（frozen）后不再检查源文件，直接导入生成的模块；生成模块缺失时回退到 `uic.loadUi`。
+
+构建前生成 / 刷新：python ui_cache.py [--force]
+"""
+
+import base64
+import hashlib
+import importlib
+import io
+import os
+import re
+import sys
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+import paths
+
+# 生成器逻辑变化时递增，使旧的生成文件失效
+GENERATOR_VERSION = 1
+UI_NAMES = ('main', 'settings', 'updater')
+RESOURCE_FILES = ('icon.png', 'img')
+PACKAGE = 'ui_generated'
+GENERATED_DIR = paths.resource(PACKAGE)
+
+_HASH_PREFIX = '# source-sha256: '
+_PIXMAP_RE = re.compile(r'QtGui\.QPixmap\("([^"]*)"\)')
+_FROZEN = getattr(sys, 'frozen', False)
+
+
+# ------------------------------------------------------------------
+# 生成
+# ------------------------------------------------------------------
+def _digest(chunks: List[bytes]) -> str:
+    h = hashlib.sha256(str(GENERATOR_VERSION).encode())
+    for chunk in chunks:
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def _generated_hash(path: str) -> Optional[str]:
+    """读取生成文件头部记录的源文件哈希。"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for _ in range(3):
+                line = f.readline()
+                if line.startswith(_HASH_PREFIX):
+                    return line[len(_HASH_PREFIX):].strip()
+    except OSError:
+        pass
+    return None
+
+
+def _write(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    init = os.path.join(os.path.dirname(path), '__init__.py')
+    if not os.path.exists(init):
+        with open(init, 'w', encoding='utf-8') as f:
+            f.write('"""由 ui_cache.py 生成的界面与资源模块，请勿手动修改。"""\n')
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _resource_paths() -> Dict[str, str]:
+    """资源名（相对程序目录的 POSIX 路径）-> 文件路径。"""
+    result = {}
+    for entry in RESOURCE_FILES:
+        full = paths.resource(entry)
+        if os.path.isdir(full):
+            for name in sorted(os.listdir(full)):
+                result[f'{entry}/{name}'] = os.path.join(full, name)
+        elif os.path.isfile(full):
+            result[entry] = full
+    return result
+
+
+def compile_ui(name: str, force: bool = False) -> bool:
+    """把 <name>.ui 编译为 ui_generated/ui_<name>.py，源文件未变化时跳过，返回是否重新生成。"""
+    src = paths.resource(f'{name}.ui')
+    with open(src, 'rb') as f:
+        digest = _digest([f.read()])
+    out = os.path.join(GENERATED_DIR, f'ui_{name}.py')
+    if not force and _generated_hash(out) == digest:
+        return False
+    from PyQt6 import uic
+    buf = io.StringIO()
+    uic.compileUi(src, buf)
+    base = os.path.dirname(src)
+
+    def _pixmap(m):
+        # 图片改为从资源包加载，不依赖工作目录
+        rel = os.path.relpath(m.group(1), base).replace(os.sep, '/')
+        return f'_res.pixmap("{rel}")'
+
+    code = _PIXMAP_RE.sub(_pixmap, buf.getvalue())
+    code = code.replace(src, f'{name}.ui')
+    code = code.replace('from PyQt6 import QtCore, QtGui, QtWidgets',
+                        'from PyQt6 import QtCore, QtGui, QtWidgets\nimport ui_cache as _res', 1)
+    _write(out, f'{_HASH_PREFIX}{digest}\n{code}')
+    logger.info(f"已生成界面模块：{out}")
+    return True
+
+
+def build_resources(force: bool = False) -> bool:
+    """把图片打包为 ui_generated/resources.py，内容未变化时跳过，返回是否重新生成。"""
+    files = _resource_paths()
+    blobs = {}
+    for name, path in files.items():
+        with open(path, 'rb') as f:
+            blobs[name] = f.read()
+    digest = _digest([n.encode() + b'\0' + d for n, d in blobs.items()])
+    out = os.path.join(GENERATED_DIR, 'resources.py')
+    if not force and _generated_hash(out) == digest:
+        return False
+    lines = [f'{_HASH_PREFIX}{digest}', '"""界面图片资源包（base64），由 ui_cache.py 生成。"""', '', 'DATA = {']
+    for name, data in blobs.items():
+        encoded = base64.b64encode(data).decode('ascii')
+        lines.append(f'    {name!r}: (')
+        lines.extend(f'        {encoded[i:i + 96]!r}' for i in range(0, len(encoded), 96))
+        lines.append('    ),')
+    lines.append('}')
+    _write(out, '\n'.join(lines) + '\n')
+    logger.info(f"已生成资源包：{out}（{len(blobs)} 个文件）")
+    return True
+
+
+def ensure_all(force: bool = False) -> None:
+    """生成 / 刷新全部界面模块与资源包。"""
+    build_resources(force)
+    for name in UI_NAMES:
+        compile_ui(name, force)
+
+
+# ------------------------------------------------------------------
+# 运行时加载
+# ------------------------------------------------------------------
+_checked = set()
+
+
+def _import(module: str, refresh) -> Optional[object]:
+    """导入生成的模块；源码运行时先按哈希检查是否需要重新生成（每个进程只检查一次）。"""
+    if not _FROZEN and module not in _checked:
+        _checked.add(module)
+        try:
+            if refresh():
+                sys.modules.pop(f'{PACKAGE}.{module}', None)
+        except Exception as e:
+            logger.warning(f"生成 {module} 失败：{e}")
+    try:
+        return importlib.import_module(f'{PACKAGE}.{module}')
+    except ImportError as e:
+        logger.warning(f"无法导入 {module}：{e}")
+        return None
+
+
+def setup_ui(name: str, widget) -> None:
+    """把 <name>.ui 的界面构建到 widget 上，子控件同样设置为 widget 的属性（与 uic.loadUi 一致）。"""
+    module = _import(f'ui_{name}', lambda: compile_ui(name))
+    if module is None:
+        from PyQt6 import uic
+        uic.loadUi(paths.resource(f'{name}.ui'), widget)
+        return
+    cls = next(v for k, v in vars(module).items() if k.startswith('Ui_') and isinstance(v, type))
+    ui = cls()
+    ui.setupUi(widget)
+    for attr, value in vars(ui).items():
+        setattr(widget, attr, value)
+
+
+@lru_cache(maxsize=None)
+def _data(name: str) -> Optional[bytes]:
+    module = _import('resources', build_resources)
+    encoded = getattr(module, 'DATA', {}).get(name) if module is not None else None
+    if encoded is not None:
+        return base64.b64decode(encoded)
+    try:
+        with open(paths.resource(name), 'rb') as f:
+            return f.read()
+    except OSError:
+        logger.warning(f"找不到界面资源：{name}")
+        return None
+
+
+@lru_cache(maxsize=None)
+def pixmap(name: str):
+    """按资源名（如 'img/favicon.ico'）返回缓存的 QPixmap。"""
+    from PyQt6.QtGui import QPixmap
+    pm = QPixmap()
+    data = _data(name)
+    if data is not None:
+        pm.loadFromData(data)
+    return pm
+
+
+@lru_cache(maxsize=None)
+def icon(name: str):
+    """按资源名返回缓存的 QIcon。"""
+    from PyQt6.QtGui import QIcon
+    return QIcon(pixmap(name))
+
+
+def release() -> None:
+    """释放图片缓存与已导入的生成模块（空闲时调用，下次使用时重新加载）。
+
+    托盘图标等仍在使用的 QPixmap / QIcon 由 Qt 引用计数持有，不受影响。
+    """
+    icon.cache_clear()
+    pixmap.cache_clear()
+    _data.cache_clear()
+    for module in [m for m in sys.modules if m.startswith(f'{PACKAGE}.')]:
+        del sys.modules[module]
+
+
+if __name__ == '__main__':
+    ensure_all(force='--force' in sys.argv)
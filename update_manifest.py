@@ -0,0 +1,256 @@
+"""基于文件清单的增量更新。
+
+version.json 可附带每个文件的清单：
+
+    {
+        "version": "1.3.0",
+        "url": "https://.../PowerPoint-Touch-Assist.zip",
+        "size": 41234567,
+        "files_base_url": "https://.../1.3.0/",
+        "files": [{"path": "main.exe", "size": 1234, "sha256": "..."}, ...]
+    }
+
+更新时先对本地安装目录做哈希并与清单比较，只下载变化的文件；
+变化量超过阈值（占完整包大小的比例）时回退到下载完整 zip。
+
+下载完整 zip 时，`extract_package` 一次顺序读取 zip，把与本地文件 CRC32 / 大小不同的条目
+直接解压到安装目录内的 staging 目录（固定大小的缓冲区），再由 `apply_staging` 重命名到位。
+
+命令行生成清单：python update_manifest.py <发布目录> [--base-url URL]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import zipfile
+import zlib
+from pathlib import Path, PurePosixPath, PureWindowsPath
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import quote, urljoin
+
+# 不参与更新的文件 / 目录（与整包覆盖时的忽略列表一致）
+IGNORE_NAMES = {'logs', 'config.ini'}
+
+_HASH_BLOCK = 1024 * 1024
+
+
+class FileEntry(NamedTuple):
+    path: str       # 相对安装目录的 POSIX 路径
+    size: int
+    sha256: str
+
+
+class DeltaPlan(NamedTuple):
+    """增量更新计划。"""
+    changed: List[FileEntry]
+    unchanged: int
+    changed_bytes: int
+    package_bytes: int
+    scan_seconds: float
+
+    @property
+    def ratio(self) -> float:
+        return self.changed_bytes / self.package_bytes if self.package_bytes else 1.0
+
+    @property
+    def bytes_saved(self) -> int:
+        return max(0, self.package_bytes - self.changed_bytes)
+
+
+class ExtractResult(NamedTuple):
+    extracted: int          # 解压到 staging 的文件数
+    skipped: int            # 与本地文件相同而跳过的文件数
+    extracted_bytes: int
+    skipped_bytes: int
+    seconds: float
+
+
+def hash_file(path: Path) -> str:
+    """计算文件的 SHA-256（分块读取，内存占用固定）。"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def crc_file(path: Path) -> int:
+    """计算文件的 CRC32（与 zip 条目中记录的相同算法）。"""
+    crc = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def _is_ignored(rel: Path) -> bool:
+    return any(part in IGNORE_NAMES for part in rel.parts)
+
+
+def build_manifest(root: Path) -> List[FileEntry]:
+    """为发布目录生成文件清单。"""
+    root = Path(root)
+    entries = []
+    for path in sorted(root.rglob('*')):
+        if not path.is_file():
+            continue
+        rel = path.relative_to(root)
+        if _is_ignored(rel):
+            continue
+        entries.append(FileEntry(rel.as_posix(), path.stat().st_size, hash_file(path)))
+    return entries
+
+
+def _escapes_root(path: str) -> bool:
+    """清单路径是否可能越出安装目录。
+
+    同时按 POSIX 与 Windows 规则检查（与运行平台无关）：Windows 上 `/x`、`C:x` 不算绝对路径，
+    但与安装目录拼接后同样会指向目录之外。
+    """
+    return any(p.anchor or '..' in p.parts for p in (PurePosixPath(path), PureWindowsPath(path)))
+
+
+def parse_manifest(files: Iterable[dict]) -> List[FileEntry]:
+    """把 version.json 中的 files 列表转换为 FileEntry，并拒绝越出安装目录的路径。"""
+    entries = []
+    for item in files:
+        rel = Path(item['path'])
+        if _escapes_root(item['path']):
+            raise ValueError(f"清单中的路径不合法：{item['path']}")
+        entries.append(FileEntry(rel.as_posix(), int(item['size']), item['sha256'].lower()))
+    return entries
+
+
+def plan_delta(manifest: List[FileEntry], root: Path, package_bytes: int = 0) -> DeltaPlan:
+    """比较本地安装目录与清单，得出需要下载的文件。
+
+    大小不同的文件直接视为已变化，无需计算哈希。
+    """
+    start = time.perf_counter()
+    root = Path(root)
+    changed = []
+    unchanged = 0
+    for entry in manifest:
+        if _is_ignored(Path(entry.path)):
+            continue
+        local = root / entry.path
+        try:
+            same = local.stat().st_size == entry.size and hash_file(local) == entry.sha256
+        except OSError:
+            same = False
+        if same:
+            unchanged += 1
+        else:
+            changed.append(entry)
+    changed_bytes = sum(e.size for e in changed)
+    return DeltaPlan(changed, unchanged, changed_bytes,
+                     package_bytes or sum(e.size for e in manifest),
+                     time.perf_counter() - start)
+
+
+def fetch_delta(plan: DeltaPlan, base_url: str, staging: Path, download: Callable[[str, Path], Path],
+                progress: Optional[Callable[[int, int], None]] = None) -> None:
+    """下载变化的文件到 staging 目录并逐个校验 SHA-256。
+
+    参数:
+        download: 下载函数 (url, 目标路径) -> 目标路径，通常为 Downloader.download。
+        progress: (已完成字节, 总字节) 回调，每个文件完成后调用一次。
+    """
+    staging = Path(staging)
+    base = base_url if base_url.endswith('/') else base_url + '/'
+    done = 0
+    for entry in plan.changed:
+        dest = staging / entry.path
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        download(urljoin(base, quote(entry.path)), dest)
+        actual = hash_file(dest)
+        if actual != entry.sha256:
+            raise ValueError(f"文件校验失败：{entry.path}（期望 {entry.sha256}，实际 {actual}）")
+        done += entry.size
+        if progress is not None:
+            progress(done, plan.changed_bytes)
+
+
+def extract_package(zip_path: Path, root: Path, staging: Path,
+                    progress: Optional[Callable[[int, int], None]] = None) -> ExtractResult:
+    """把完整更新包中与安装目录不同的文件解压到 staging 目录。
+
+    大小与 CRC32 都和本地文件一致的条目跳过（大小不同时不读本地文件）；解压时 zipfile
+    会校验每个条目的 CRC，损坏时抛出 zipfile.BadZipFile。
+
+    参数:
+        progress: (已处理字节, 总字节) 回调，按未压缩大小计，每个条目完成后调用一次。
+    """
+    start = time.perf_counter()
+    root, staging = Path(root), Path(staging)
+    staging_abs = staging.resolve()
+    extracted = skipped = extracted_bytes = skipped_bytes = 0
+    with zipfile.ZipFile(zip_path) as zf:
+        infos = [i for i in zf.infolist() if not i.is_dir() and not _is_ignored(Path(i.filename))]
+        total = sum(i.file_size for i in infos)
+        done = 0
+        for info in infos:
+            dest = (staging / info.filename).resolve()
+            if staging_abs not in dest.parents:
+                raise ValueError(f"更新包中的路径无效：{info.filename}")
+            local = root / info.filename
+            try:
+                same = local.stat().st_size == info.file_size and crc_file(local) == info.CRC
+            except OSError:
+                same = False
+            if same:
+                skipped += 1
+                skipped_bytes += info.file_size
+            else:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                with zf.open(info) as src, open(dest, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, _HASH_BLOCK)
+                extracted += 1
+                extracted_bytes += info.file_size
+            done += info.file_size
+            if progress is not None:
+                progress(done, total)
+    return ExtractResult(extracted, skipped, extracted_bytes, skipped_bytes, time.perf_counter() - start)
+
+
+def apply_staging(staging: Path, root: Path) -> int:
+    """把 staging 中的文件重命名到安装目录，返回替换的文件数。
+
+    staging 须与安装目录同盘（调用方建在安装目录内）。目标文件被占用时 os.replace 抛出 OSError：
+    已移动的文件留在安装目录，其余仍在 staging，由调用方改用延迟脚本完成替换。
+    """
+    staging, root = Path(staging), Path(root)
+    count = 0
+    for src in staging.rglob('*'):
+        if not src.is_file():
+            continue
+        dst = root / src.relative_to(staging)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(src, dst)
+        count += 1
+    return count
+
+
+def manifest_to_json(entries: List[FileEntry]) -> List[Dict]:
+    return [e._asdict() for e in entries]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description='为发布目录生成 version.json 的文件清单')
+    parser.add_argument('root', help='发布目录（如 dist/PowerPoint-Touch-Assist）')
+    parser.add_argument('--base-url', default='', help='单文件下载的基础 URL')
+    args = parser.parse_args(argv)
+    entries = build_manifest(Path(args.root))
+    out = {'files': manifest_to_json(entries)}
+    if args.base_url:
+        out['files_base_url'] = args.base_url
+    json.dump(out, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
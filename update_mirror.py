@@ -0,0 +1,546 @@
+"""局域网更新镜像：一台机器下载更新包，其余机器从它获取。
+
+每台机器的更新窗口都直接从 DEFAULT_VERSION_URL 获取 version.json 与完整 zip，
+全校同时更新时会占满出口带宽。开启镜像后：
+
+- 服务端（Update/Mirror_Mode = serve）：后台定期从源站检查版本，下载并校验更新包后缓存在
+  用户配置目录，通过 HTTP 在局域网内提供 /version.json 与 /package/<文件名>（支持 Range，
+  可续传、可分段并行），并应答 UDP 发现请求；
+- 客户端：使用 Update/Mirror_URL 配置的镜像，或（开启 Update/Mirror_Discovery 时）广播发现；
+  镜像不可用时回退到源站。
+
+局域网内任何机器都能应答发现请求，因此镜像只提供下载地址：客户端总是从源站获取 version.json
+（很小，且为条件请求），更新包按源站给出的 sha256 校验，增量更新的单文件清单（files /
+files_base_url）也只用源站的。源站未提供 sha256 时无法校验镜像的包，不使用镜像。
+服务端与客户端都只依赖标准库与 downloader，可完全在本机回环地址上测试。
+"""
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import zipfile
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from loguru import logger
+
+import conf_file
+from release_info import CACHE_PATH, DEFAULT_VERSION_URL, PeriodicChecker, ReleaseChecker
+from update_manifest import hash_file
+
+MIRROR_DIR = os.path.join(conf_file.CONFIG_DIR, 'mirror')
+MIRROR_CACHE_PATH = os.path.join(conf_file.CONFIG_DIR, 'release_cache_mirror.json')
+DEFAULT_PORT = 8765
+
+# UDP 发现协议：客户端广播 PROBE，服务端回复 "REPLY <HTTP 端口>"
+DISCOVERY_PROBE = b'PPT-TOUCH-ASSIST-MIRROR?'
+DISCOVERY_REPLY = b'PPT-TOUCH-ASSIST-MIRROR'
+
+
+# ------------------------------------------------------------------
+# 服务端：缓存
+# ------------------------------------------------------------------
+class MirrorCache:
+    """镜像缓存目录：version.json（源站信息 + 本地包信息）与当前版本的更新包。
+
+    参数:
+        root: 缓存目录。
+        download: 下载函数 (url, 目标路径) -> 目标路径，通常为 Downloader.download。
+    """
+
+    def __init__(self, root: str = MIRROR_DIR, download=None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._download = download
+        self._lock = threading.Lock()
+        self.syncs = 0
+
+    @property
+    def info_path(self) -> Path:
+        return self.root / 'version.json'
+
+    def info(self) -> Optional[dict]:
+        """已缓存的版本信息（含 package / package_sha256 / package_size）；没有时为 None。"""
+        try:
+            return json.loads(self.info_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def package_path(self, name: str) -> Optional[Path]:
+        """按文件名返回已缓存的更新包路径（只允许当前版本的包）。"""
+        info = self.info()
+        if not info or name != info.get('package'):
+            return None
+        path = self.root / name
+        return path if path.is_file() else None
+
+    @staticmethod
+    def _package_name(info: dict) -> str:
+        name = os.path.basename(info['url'].split('?', 1)[0]) or 'package.zip'
+        return f"{info['version']}-{name}"
+
+    def sync(self, info: dict) -> bool:
+        """确保缓存的是 info 描述的版本：下载、校验并发布，返回是否有更新。"""
+        with self._lock:
+            current = self.info()
+            name = self._package_name(info)
+            if current and current.get('package') == name and current.get('origin') == info \
+                    and (self.root / name).is_file():
+                return False
+            if self._download is None:
+                from downloader import Downloader
+                self._download = Downloader(segments=conf_file.store.get_int('Update', 'Download_Segments', 4)).download
+            tmp = self.root / (name + '.tmp')
+            logger.info(f"镜像开始下载更新包：{info['url']}")
+            self._download(info['url'], tmp)
+            digest = self._verify(tmp, info)
+            os.replace(tmp, self.root / name)
+            published = {
+                'origin': info,
+                'package': name,
+                'package_sha256': digest,
+                'package_size': (self.root / name).stat().st_size,
+                'synced_at': time.time(),
+            }
+            tmp_info = self.info_path.with_suffix('.tmp')
+            tmp_info.write_text(json.dumps(published, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_info, self.info_path)
+            # 只保留当前版本的包
+            for old in self.root.iterdir():
+                if old.is_file() and old.name not in (name, self.info_path.name):
+                    old.unlink(missing_ok=True)
+            self.syncs += 1
+            logger.info(f"镜像已缓存版本 {info['version']}：{name}（{published['package_size']} 字节）")
+            return True
+
+    @staticmethod
+    def _verify(path: Path, info: dict) -> str:
+        """校验更新包：源站提供 sha256 时比对哈希，并检查 zip 完整性，返回 SHA-256。"""
+        digest = hash_file(path)
+        expected = (info.get('sha256') or '').lower()
+        if expected and digest != expected:
+            path.unlink(missing_ok=True)
+            raise ValueError(f"更新包校验失败（期望 {expected}，实际 {digest}）")
+        try:
+            with zipfile.ZipFile(path) as zf:
+                bad = zf.testzip()
+        except zipfile.BadZipFile as e:
+            path.unlink(missing_ok=True)
+            raise ValueError(f"更新包不是有效的 zip：{e}") from None
+        if bad is not None:
+            path.unlink(missing_ok=True)
+            raise ValueError(f"更新包中的文件损坏：{bad}")
+        return digest
+
+    def published_info(self, base_url: str) -> Optional[dict]:
+        """对外提供的 version.json：url 指向镜像，origin_url 保留源站地址。
+
+        sha256 / size 保持源站的值；增量清单不转发（客户端只用源站的）。
+        """
+        cached = self.info()
+        if not cached:
+            return None
+        info = {k: v for k, v in cached['origin'].items() if k not in ('files', 'files_base_url')}
+        info['origin_url'] = info['url']
+        info['url'] = f"{base_url}/package/{cached['package']}"
+        info['mirror'] = True
+        return info
+
+
+# ------------------------------------------------------------------
+# 服务端：HTTP 与 UDP 发现
+# ------------------------------------------------------------------
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """解析单个 "bytes=a-b" / "bytes=a-" / "bytes=-n"，返回 (起始, 结束含)；无法满足时返回 None。
+
+    多段 Range 不支持，调用方应按整个文件返回 200。
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        raise ValueError(header)
+    start_s, _, end_s = spec.strip().partition('-')
+    if start_s:
+        start = int(start_s)
+        end = int(end_s) if end_s else size - 1
+    else:
+        length = int(end_s)
+        if length <= 0:
+            return None
+        start, end = max(0, size - length), size - 1
+    end = min(end, size - 1)
+    if start > end:
+        return None
+    return start, end
+
+
+class MirrorServer:
+    """在局域网内提供 /version.json 与 /package/<文件名> 的 HTTP 服务（后台线程）。
+
+    参数:
+        cache: 镜像缓存。
+        port: 端口；0 为由系统分配（实际端口见 `port` 属性）。
+        host: 绑定地址，默认所有网卡。
+    """
+
+    def __init__(self, cache: MirrorCache, port: int = DEFAULT_PORT, host: str = '0.0.0.0'):
+        self.cache = cache
+        self.host = host
+        self.port = port
+        self.bytes_served = 0
+        self.requests = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        # 保持中的连接（HTTP/1.1 keep-alive），停止时一并关闭
+        self._conns = set()
+        self._conns_lock = threading.Lock()
+
+    def _handler(self):
+        mirror = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with mirror._conns_lock:
+                    mirror._conns.add(self.connection)
+
+            def finish(self):
+                with mirror._conns_lock:
+                    mirror._conns.discard(self.connection)
+                super().finish()
+
+            def do_HEAD(self):
+                self._serve(head=True)
+
+            def do_GET(self):
+                self._serve(head=False)
+
+            def _serve(self, head: bool):
+                mirror.requests += 1
+                path = self.path.split('?', 1)[0]
+                if path == '/version.json':
+                    self._version(head)
+                elif path.startswith('/package/'):
+                    self._package(path[len('/package/'):], head)
+                else:
+                    self.send_error(404)
+
+            def _version(self, head: bool):
+                host = self.headers.get('Host') or f'{self.server.server_address[0]}:{mirror.port}'
+                info = mirror.cache.published_info(f'http://{host}')
+                if info is None:
+                    self.send_error(503, 'Mirror not synced yet')     # 状态行只能是 ASCII
+                    return
+                body = json.dumps(info, ensure_ascii=False).encode('utf-8')
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+
+            def _package(self, name: str, head: bool):
+                path = mirror.cache.package_path(name)
+                if path is None:
+                    self.send_error(404)
+                    return
+                st = path.stat()
+                size = st.st_size
+                # 更新包同名即同版本，但仍以大小与修改时间作为验证器，供客户端续传时比对
+                etag = f'"{size:x}-{st.st_mtime_ns:x}"'
+                last_modified = formatdate(st.st_mtime, usegmt=True)
+                start, end, status = 0, size - 1, 200
+                range_header = self.headers.get('Range')
+                if_range = self.headers.get('If-Range')
+                if range_header and if_range and if_range not in (etag, last_modified):
+                    range_header = None     # 客户端已有的部分属于旧文件：返回完整内容
+                if range_header:
+                    try:
+                        rng = parse_range(range_header, size)
+                    except ValueError:
+                        rng = ()            # 不支持的 Range：按整个文件返回
+                    if rng is None:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f'bytes */{size}')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    if rng:
+                        (start, end), status = rng, 206
+                length = end - start + 1
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/zip')
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Content-Length', str(length))
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', last_modified)
+                if status == 206:
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+                self.end_headers()
+                if head:
+                    return
+                with open(path, 'rb') as f:
+                    try:
+                        sent = self.connection.sendfile(f, start, length)
+                    except (ConnectionError, OSError):
+                        return
+                mirror.bytes_served += sent
+
+            def log_message(self, format, *args):
+                logger.debug(f"镜像请求：{self.address_string()} {format % args}")
+
+        return Handler
+
+    def start(self) -> bool:
+        if self._server is not None:
+            return True
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        except OSError as e:
+            logger.error(f"更新镜像启动失败（{self.host}:{self.port}）：{e}")
+            return False
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name='MirrorServer', daemon=True).start()
+        logger.info(f"更新镜像已启动：端口 {self.port}")
+        return True
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        with self._conns_lock:
+            conns, self._conns = self._conns, set()
+        for conn in conns:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class DiscoveryResponder:
+    """应答 UDP 发现请求，告知客户端镜像的 HTTP 端口。
+
+    参数:
+        http_port: 镜像 HTTP 端口。
+        port: 监听的 UDP 端口；0 为由系统分配。
+        host: 绑定地址。
+    """
+
+    def __init__(self, http_port: int, port: int = DEFAULT_PORT, host: str = ''):
+        self.http_port = http_port
+        self.host = host
+        self.port = port
+        self.replies = 0
+        self._sock: Optional[socket.socket] = None
+
+    def start(self) -> bool:
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, self.port))
+        except OSError as e:
+            logger.error(f"镜像发现服务启动失败（UDP {self.port}）：{e}")
+            return False
+        self._sock = sock
+        self.port = sock.getsockname()[1]
+        threading.Thread(target=self._run, args=(sock,), name='MirrorDiscovery', daemon=True).start()
+        return True
+
+    def _run(self, sock: socket.socket) -> None:
+        while True:
+            try:
+                data, addr = sock.recvfrom(256)
+            except OSError:
+                return      # 已关闭
+            if data.strip() == DISCOVERY_PROBE:
+                try:
+                    sock.sendto(DISCOVERY_REPLY + b' %d' % self.http_port, addr)
+                    self.replies += 1
+                except OSError as e:
+                    logger.debug(f"回复发现请求失败：{e}")
+
+    def stop(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class MirrorService:
+    """镜像服务端：定期同步源站 + HTTP 服务 + UDP 发现（main.py 在 serve 模式下启动）。"""
+
+    def __init__(self, origin_url: str = DEFAULT_VERSION_URL, port: int = DEFAULT_PORT,
+                 sync_hours: float = 6.0, root: str = MIRROR_DIR):
+        self.cache = MirrorCache(root)
+        self.server = MirrorServer(self.cache, port)
+        self.responder: Optional[DiscoveryResponder] = None
+        # 服务端自身始终从源站检查
+        self.checker = PeriodicChecker(ReleaseChecker(origin_url), sync_hours * 3600,
+                                       self._on_release, initial_delay=5.0)
+
+    def _on_release(self, info: dict, changed: bool) -> None:
+        try:
+            self.cache.sync(info)
+        except Exception as e:
+            logger.error(f"镜像同步更新包失败：{e}")
+
+    def start(self) -> bool:
+        if not self.server.start():
+            return False
+        self.responder = DiscoveryResponder(self.server.port, self.server.port)
+        self.responder.start()
+        self.checker.start()
+        return True
+
+    def stop(self) -> None:
+        self.checker.stop()
+        if self.responder is not None:
+            self.responder.stop()
+        self.server.stop()
+
+
+# ------------------------------------------------------------------
+# 客户端
+# ------------------------------------------------------------------
+def discover(port: int = DEFAULT_PORT, timeout: float = 0.5, address: str = '<broadcast>') -> Optional[str]:
+    """广播发现请求，返回最先应答的镜像地址（如 http://10.0.0.5:8765），没有应答时返回 None。"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sock.settimeout(timeout)
+        sock.sendto(DISCOVERY_PROBE, (address, port))
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                data, (ip, _) = sock.recvfrom(256)
+            except socket.timeout:
+                break
+            head, _, http_port = data.partition(b' ')
+            if head == DISCOVERY_REPLY and http_port.strip().isdigit():
+                return f'http://{ip}:{int(http_port)}'
+    except OSError as e:
+        logger.debug(f"镜像发现失败：{e}")
+    finally:
+        sock.close()
+    return None
+
+
+class FallbackChecker:
+    """从源站检查版本、从局域网镜像下载的版本检查器（接口与 ReleaseChecker 相同）。
+
+    版本信息（sha256、增量清单等）总是来自源站；镜像缓存的正是源站当前的更新包时，
+    只把 url 换成镜像地址，origin_url 保留源站地址供下载失败时回退。
+
+    参数:
+        origin_url: 源站 version.json 地址。
+        mirror_url: 配置的镜像地址（如 http://10.0.0.5:8765）；为空且 discovery 时广播发现。
+        discovery: 未配置镜像时是否广播发现。
+        port: 发现使用的 UDP 端口。
+        mirror_timeout: 请求镜像的超时（秒），镜像不可用时尽快回退。
+    """
+
+    def __init__(self, origin_url: str = DEFAULT_VERSION_URL, mirror_url: str = '', discovery: bool = False,
+                 port: int = DEFAULT_PORT, mirror_timeout: float = 3.0, discovery_address: str = '<broadcast>',
+                 cache_path: str = CACHE_PATH, mirror_cache_path: str = MIRROR_CACHE_PATH, session=None):
+        self.origin = ReleaseChecker(origin_url, cache_path=cache_path, session=session)
+        self.mirror_url = mirror_url.rstrip('/')
+        self.discovery = discovery
+        self.port = port
+        self.mirror_timeout = mirror_timeout
+        self.discovery_address = discovery_address
+        self.mirror_cache_path = mirror_cache_path
+        self._session = session
+        self._mirror_session = None
+        self.source: Optional[str] = None       # 最近一次检查得到的下载地址来自哪里（镜像或源站的 version.json）
+
+    def _mirror(self) -> Optional[ReleaseChecker]:
+        base = self.mirror_url
+        if not base and self.discovery:
+            base = discover(self.port, address=self.discovery_address) or ''
+            if base:
+                logger.info(f"发现局域网更新镜像：{base}")
+        if not base:
+            return None
+        if self._mirror_session is None:
+            # 共享 Session 对连接失败会退避重试数秒；镜像不可用时应立即回退源站，不重试
+            import requests
+            self._mirror_session = self._session or requests.Session()
+        return ReleaseChecker(f'{base}/version.json', cache_path=self.mirror_cache_path,
+                              timeout=self.mirror_timeout, session=self._mirror_session)
+
+    def cached(self) -> Optional[dict]:
+        """上次从源站获取的版本信息（镜像地址只在在线检查时使用）。"""
+        return self.origin.cached()
+
+    def cached_at(self) -> Optional[float]:
+        return self.origin.cached_at()
+
+    def _mirror_package(self, info: dict) -> Optional[str]:
+        """镜像上与源站 info 相同的更新包地址；镜像不可用或缓存的不是这个包时返回 None。"""
+        if not info.get('sha256'):
+            logger.info("源站版本信息未提供 sha256，无法校验镜像的更新包，从源站下载")
+            return None
+        mirror = self._mirror()
+        if mirror is None:
+            return None
+        try:
+            published, _ = mirror.check()
+        except Exception as e:
+            logger.warning(f"更新镜像不可用，从源站下载：{e}")
+            return None
+        base = mirror.url[:-len('/version.json')]
+        url = published.get('url') or ''
+        if published.get('version') != info['version'] or published.get('origin_url') != info['url'] \
+                or not url.startswith(f'{base}/package/'):
+            logger.warning(f"更新镜像 {base} 提供的不是源站当前的更新包（版本 {published.get('version')}），"
+                           f"从源站下载")
+            return None
+        self.source = mirror.url
+        return url
+
+    def check(self) -> Tuple[dict, bool]:
+        """从源站检查版本；镜像缓存了同一个包时只替换下载地址（sha256 等仍为源站的值）。"""
+        info, changed = self.origin.check()
+        self.source = self.origin.url
+        url = self._mirror_package(info)
+        if url:
+            info = dict(info, url=url, origin_url=info['url'], mirror=True)
+        return info, changed
+
+
+def create_checker(version_url: str = DEFAULT_VERSION_URL):
+    """按 Update 配置创建版本检查器：未开启镜像客户端时即为源站的 ReleaseChecker。"""
+    store = conf_file.store
+    mode = store.get('Update', 'Mirror_Mode')
+    mirror_url = store.get('Update', 'Mirror_URL')
+    discovery = store.get_bool('Update', 'Mirror_Discovery')
+    if mode == 'serve' or not (mirror_url or discovery):
+        return ReleaseChecker(version_url)
+    return FallbackChecker(version_url, mirror_url, discovery,
+                           port=store.get_int('Update', 'Mirror_Port', DEFAULT_PORT))
+
+
+def download_urls(info: dict) -> List[str]:
+    """更新包的下载地址：镜像优先，失败时回退源站；没有 sha256 可校验时只用源站。"""
+    if not info.get('sha256') and info.get('origin_url'):
+        return [info['origin_url']]
+    urls = [info['url']]
+    if info.get('origin_url') and info['origin_url'] not in urls:
+        urls.append(info['origin_url'])
+    return urls
+
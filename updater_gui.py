@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 """
 updater_gui.py
-功能：下载 zip → 解压 → 除 logs & config.ini 外全部覆盖 → 重启
+功能：下载 zip（边下载边校验 SHA-256）→ 只把有变化的文件解压到 staging
+      → 除 logs & config.ini 外重命名覆盖 → 重启
       若主程序被占用（Windows）→ 生成延迟 bat 脚本完成覆盖与重启
 """
 import json
@@ -11,26 +12,26 @@ import sys
 import platform
 import shutil
 import tempfile
-import zipfile
+import time
 from pathlib import Path
 from typing import Optional
 
-import requests
 from PyQt6.QtCore import QThread, pyqtSignal, Qt, QCoreApplication
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QProgressBar, QTextEdit, QApplication)
-from PyQt6.QtGui import QIcon
 
 # -------------- 日志 --------------
 from loguru import logger
 
 # -------------- 读 config.ini --------------
-from configparser import ConfigParser
-
-conf = ConfigParser()
-conf.read('config.ini', encoding='utf-8')
-CURRENT_VERSION = conf.get('About', 'version', fallback='1.0.0')
-DEFAULT_VERSION_URL = "https://wrd1145.dev/version.json"
+import conf_file
+import ui_cache
+from downloader import Downloader
+from release_info import DEFAULT_VERSION_URL, ReleaseChecker
+from update_mirror import create_checker, download_urls
+from update_manifest import apply_staging, extract_package, fetch_delta, parse_manifest, plan_delta
+
+CURRENT_VERSION = conf_file.app_store.get('About', 'version', fallback='1.0.0')
 # 主程序路径
 MAIN_PATH = Path(sys.executable) if getattr(sys, 'frozen', False) else Path(__file__).resolve()
 APP_DIR = MAIN_PATH.parent
@@ -40,34 +41,125 @@ APP_DIR = MAIN_PATH.parent
 # 下载线程
 # ------------------------------------------------------------------
 class _DownloadThread(QThread):
-    progress = pyqtSignal(int)          # 0-100
-    finished = pyqtSignal(Path)
+    progress = pyqtSignal(int)          # 0-100（下载占前 80%，解压占后 20%）
+    finished = pyqtSignal(object)       # (ExtractResult, staging 目录)
     error = pyqtSignal(str)
 
-    def __init__(self, url: str):
+    def __init__(self, urls: list, sha256: str = ''):
         super().__init__()
-        self.url = url
+        # 依次尝试（局域网镜像在前，源站在后）
+        self.urls = urls
+        self.sha256 = sha256
+        # 持久 Session + 断点续传 + 大文件分段并行；进度回调已按固定频率节流
+        self.downloader = Downloader(segments=conf_file.store.get_int('Update', 'Download_Segments', 4))
+
+    def _on_progress(self, done: int, total: int):
+        if total:
+            self.progress.emit(int(done * 80 / total))
+
+    def _on_extract(self, done: int, total: int):
+        if total:
+            self.progress.emit(80 + int(done * 20 / total))
+
+    def _download(self) -> Optional[Path]:
+        for i, url in enumerate(self.urls):
+            try:
+                # SHA-256 随下载计算；version.json 未提供时只计算，由解压时的 CRC 校验兜底
+                tmp = self.downloader.download(url, MAIN_PATH.with_suffix('.tmp.zip'), self._on_progress,
+                                               sha256=self.sha256)
+                logger.info(f"下载完成：{tmp}，SHA-256 {self.downloader.sha256}"
+                            f"{'（已校验）' if self.sha256 else '（版本信息未提供，未校验）'}")
+                return tmp
+            except Exception as e:
+                logger.error(f"下载失败：{url}：{e}")
+                # 有 sha256 时下一个地址（源站）从已下载的部分续传，最终按源站的哈希校验；
+                # 没有 sha256 时只有源站一个地址
+                if i == len(self.urls) - 1:
+                    self.error.emit(str(e))
+        return None
 
     def run(self):
+        tmp = self._download()
+        if tmp is None:
+            return
+        # staging 放在安装目录内，保证替换时是同盘重命名
+        staging = Path(tempfile.mkdtemp(prefix='update_full_', dir=APP_DIR))
         try:
-            resp = requests.get(self.url, stream=True, timeout=15)
-            resp.raise_for_status()
-            total = int(resp.headers.get('content-length', 0))
-            tmp = MAIN_PATH.with_suffix('.tmp.zip')
-            down = 0
-            with open(tmp, 'wb') as f:
-                for chunk in resp.iter_content(8192):
-                    if not chunk:
-                        continue
-                    f.write(chunk)
-                    down += len(chunk)
-                    if total:
-                        self.progress.emit(int(down * 100 / total))
-            logger.info(f"下载完成：{tmp}")
-            self.finished.emit(tmp)
+            result = extract_package(tmp, APP_DIR, staging, self._on_extract)
+        except Exception as e:
+            logger.error(f"解压失败：{e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            tmp.unlink(missing_ok=True)
+            self.error.emit(f"更新包损坏：{e}")
+            return
+        tmp.unlink(missing_ok=True)
+        logger.info(f"解压完成：{result.extracted} 个文件有变化（{result.extracted_bytes} 字节），"
+                    f"{result.skipped} 个未变，耗时 {result.seconds:.2f}s")
+        self.finished.emit((result, staging))
+
+
+# ------------------------------------------------------------------
+# 版本检查线程（条件请求，结果缓存在磁盘）
+# ------------------------------------------------------------------
+class _VersionCheckThread(QThread):
+    checked = pyqtSignal(dict, bool)    # (版本信息, 是否有变化)
+    error = pyqtSignal(str)
+
+    def __init__(self, checker: ReleaseChecker):
+        super().__init__()
+        self.checker = checker
+
+    def run(self):
+        try:
+            info, changed = self.checker.check()
         except Exception as e:
-            logger.error(f"下载失败：{e}")
             self.error.emit(str(e))
+            return
+        self.checked.emit(info, changed)
+
+
+# ------------------------------------------------------------------
+# 增量更新线程：哈希本地文件 → 比较清单 → 只下载变化的文件
+# ------------------------------------------------------------------
+class _DeltaThread(QThread):
+    progress = pyqtSignal(int)          # 0-100
+    finished = pyqtSignal(object)       # (DeltaPlan, staging 目录)
+    fallback = pyqtSignal(str)          # 改用完整 zip 的原因（所有失败都经此回退，不单独报错）
+
+    def __init__(self, files: list, base_url: str, package_bytes: int, threshold: float):
+        super().__init__()
+        self.files = files
+        self.base_url = base_url
+        self.package_bytes = package_bytes
+        self.threshold = threshold
+        self.downloader = Downloader(segments=1)
+
+    def _on_progress(self, done: int, total: int):
+        if total:
+            self.progress.emit(int(done * 100 / total))
+
+    def run(self):
+        try:
+            manifest = parse_manifest(self.files)
+            plan = plan_delta(manifest, APP_DIR, self.package_bytes)
+        except Exception as e:
+            self.fallback.emit(f"清单比较失败：{e}")
+            return
+        logger.info(f"增量比较：{len(plan.changed)} 个文件变化，{plan.unchanged} 个未变，"
+                    f"需下载 {plan.changed_bytes} / {plan.package_bytes} 字节，"
+                    f"扫描耗时 {plan.scan_seconds:.2f}s")
+        if plan.ratio > self.threshold:
+            self.fallback.emit(f"变化量 {plan.ratio:.0%} 超过阈值 {self.threshold:.0%}")
+            return
+        # staging 放在安装目录内，保证替换时是同盘重命名
+        staging = Path(tempfile.mkdtemp(prefix='update_delta_', dir=APP_DIR))
+        try:
+            fetch_delta(plan, self.base_url, staging, self.downloader.download, self._on_progress)
+        except Exception as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            self.fallback.emit(f"增量下载失败：{e}")
+            return
+        self.finished.emit((plan, staging))
 
 
 # ------------------------------------------------------------------
@@ -83,7 +175,10 @@ class UpdaterWindow(QWidget):
         self.version_url = version_url
         self.latest_ver: Optional[str] = None
         self.download_url: Optional[str] = None
+        self.release_info: dict = {}
         self.changelog: str = ""
+        # 配置了局域网镜像时先问镜像，失败回退源站
+        self.checker = create_checker(version_url)
 
         # 普通窗口，保留系统标题栏
         self.setWindowTitle("软件更新")
@@ -166,7 +261,7 @@ class UpdaterWindow(QWidget):
         # logo 行
         foot = QHBoxLayout()
         self.lb_logo = QLabel()
-        self.lb_logo.setPixmap(QIcon("img/favicon.ico").pixmap(30, 30))
+        self.lb_logo.setPixmap(ui_cache.icon("img/favicon.ico").pixmap(30, 30))
         self.lb_txt = QLabel("PPT 触屏辅助")
         self.lb_txt.setStyleSheet("color:gray;font:12pt;font-weight:bold;")
         foot.addWidget(self.lb_logo)
@@ -179,18 +274,47 @@ class UpdaterWindow(QWidget):
         main.addLayout(bot)
         main.addLayout(foot)
 
+    def busy(self) -> bool:
+        """是否有版本检查 / 下载 / 增量更新正在进行."""
+        # self.thread 在开始下载前是 QObject.thread 方法，因此按类型判断
+        return any(isinstance(t, QThread) and t.isRunning() for t in
+                   (getattr(self, 'check_thread', None), getattr(self, 'thread', None),
+                    getattr(self, 'delta_thread', None)))
+
+    def refresh(self):
+        """复用窗口再次打开时重新检查版本（正在下载 / 检查时保持现状）."""
+        if not self.busy():
+            self._check_version()
+
     # ---------------- 版本检查 ----------------
     def _check_version(self):
-        self.log.append("正在检查版本…")
-        try:
-            info = requests.get(self.version_url, timeout=10).json()
-            self.latest_ver = info["version"]
-            self.download_url = info["url"]
-            self.changelog = info.get("changelog", "暂无说明")
-        except Exception as e:
-            logger.error(f"获取版本信息失败：{e}")
-            self.log.append(f"<font color=red>检查失败：{e}</font>")
-            return
+        """先显示缓存的版本信息，再在后台线程发起条件请求，不阻塞 GUI 线程."""
+        cached = self.checker.cached()
+        if cached:
+            self.log.append("已载入上次检查的结果，正在后台确认…")
+            self._apply_release_info(cached)
+        else:
+            self.log.append("正在检查版本…")
+        self.check_thread = _VersionCheckThread(self.checker)
+        self.check_thread.checked.connect(self._on_version_checked)
+        self.check_thread.error.connect(self._on_version_error)
+        self.check_thread.start()
+
+    def _on_version_checked(self, info: dict, changed: bool):
+        if changed or info != self.release_info:
+            self._apply_release_info(info)
+        else:
+            self.log.append("版本信息未变化。")
+
+    def _on_version_error(self, msg: str):
+        logger.error(f"获取版本信息失败：{msg}")
+        self.log.append(f"<font color=red>检查失败：{msg}</font>")
+
+    def _apply_release_info(self, info: dict):
+        self.latest_ver = info["version"]
+        self.download_url = info["url"]
+        self.release_info = info
+        self.changelog = info.get("changelog", "暂无说明")
 
         self.lb_remote.setText(f"远程版本：{self.latest_ver}")
         if self.current_ver < self.latest_ver:
@@ -199,6 +323,7 @@ class UpdaterWindow(QWidget):
             self.log.append(self.changelog)
             logger.info(f"发现新版本：{self.latest_ver}")
         else:
+            self.btn.setEnabled(False)
             self.log.append("已是最新版本。")
             logger.info("当前已是最新版本")
 
@@ -208,75 +333,85 @@ class UpdaterWindow(QWidget):
             return
         self.btn.setEnabled(False)
         self.bar.setVisible(True)
+        info = self.release_info
+        if info.get("files") and info.get("files_base_url"):
+            self.log.append("正在比较本地文件…")
+            self.delta_thread = _DeltaThread(
+                info["files"], info["files_base_url"], int(info.get("size") or 0),
+                conf_file.store.get_float('Update', 'Delta_Threshold', 0.6))
+            self.delta_thread.progress.connect(self.bar.setValue)
+            self.delta_thread.finished.connect(self._on_delta_ready)
+            self.delta_thread.fallback.connect(self._on_delta_fallback)
+            self.delta_thread.start()
+            return
+        self._download_full()
+
+    def _on_delta_fallback(self, reason: str):
+        logger.info(f"改为下载完整更新包：{reason}")
+        self.log.append(f"{reason}，改为下载完整更新包")
+        self._download_full()
+
+    def _download_full(self):
+        self.bar.setValue(0)
         self.log.append("开始下载…")
         logger.info(f"开始下载更新包：{self.download_url}")
-        self.thread = _DownloadThread(self.download_url)
+        self.thread = _DownloadThread(download_urls(self.release_info), self.release_info.get("sha256") or '')
         self.thread.progress.connect(self.bar.setValue)
         self.thread.finished.connect(self._on_downloaded)
         self.thread.error.connect(self._on_error)
         self.thread.start()
 
-    # ---------------- 下载完成 → 覆盖 ----------------
-    def _on_downloaded(self, tmp: Path):
-        """tmp 是下载到的 zip 路径"""
-        logger.info(f"下载完成：{tmp}")
-        self.log.append("下载完成，开始解压并覆盖…")
-
-        # 1. 解压到临时目录
-        with zipfile.ZipFile(tmp, 'r') as zf:
-            temp_dir = Path(tempfile.mkdtemp(prefix='update_'))
-            zf.extractall(temp_dir)
-            logger.info(f"解压完成：{temp_dir}")
-
-        # 2. 忽略列表（不覆盖）
-        ignore_patterns = {'logs', 'config.ini'}
-
-        def ignore_func(src, names):
-            return [n for n in names if n in ignore_patterns]
-
-        # 3. 覆盖（除忽略外全部）
-        app_dir = MAIN_PATH.parent
-        for item in temp_dir.iterdir():
-            dst = app_dir / item.name
-            try:
-                if item.is_dir():
-                    if dst.exists():
-                        logger.info(f"删除旧目录：{dst}")
-                        shutil.rmtree(dst)
-                    logger.info(f"复制目录：{item} → {dst}")
-                    shutil.copytree(item, dst, ignore=ignore_func)
-                else:
-                    if item.name not in ignore_patterns:
-                        logger.info(f"复制文件：{item} → {dst}")
-                        shutil.copy2(item, dst)
-            except Exception as e:
-                logger.warning(f"复制失败（可能被占用）：{e} → 将使用延迟脚本")
-                # 一旦复制失败（Windows 占用）立即切到 bat 方案
-                self._win_delayed_replace(tmp, temp_dir)
-                return
+    # ---------------- 增量文件下载完成 → 替换 ----------------
+    def _on_delta_ready(self, result):
+        plan, staging = result
+        start = time.perf_counter()
+        try:
+            count = apply_staging(staging, APP_DIR)
+        except Exception as e:
+            logger.warning(f"替换失败（可能被占用）：{e} → 将使用延迟脚本")
+            self._win_delayed_copy(staging)
+            return
+        shutil.rmtree(staging, ignore_errors=True)
+        elapsed = time.perf_counter() - start
+        logger.info(f"增量更新完成：替换 {count} 个文件，节省下载 {plan.bytes_saved} 字节，"
+                    f"安装耗时 {elapsed:.2f}s")
+        self.log.append(f"增量更新完成：替换 {count} 个文件，少下载 {plan.bytes_saved / 1048576:.1f} MB，"
+                        f"安装耗时 {elapsed:.2f} 秒，即将重启…")
+        self._restart()
 
-        # 4. 清理
-        shutil.rmtree(temp_dir)
-        tmp.unlink(missing_ok=True)
-        logger.info("覆盖完成，准备重启")
+    # ---------------- 下载并解压完成 → 替换 ----------------
+    def _on_downloaded(self, result):
+        extract, staging = result
+        start = time.perf_counter()
+        self.log.append(f"下载完成，{extract.extracted} 个文件有变化，开始替换…")
+        try:
+            count = apply_staging(staging, APP_DIR)
+        except Exception as e:
+            logger.warning(f"替换失败（可能被占用）：{e} → 将使用延迟脚本")
+            self._win_delayed_copy(staging)
+            return
+        shutil.rmtree(staging, ignore_errors=True)
+        logger.info(f"覆盖完成：替换 {count} 个文件，跳过 {extract.skipped} 个未变文件，"
+                    f"安装耗时 {time.perf_counter() - start:.2f}s，准备重启")
         self.log.append("覆盖完成，3 秒后重启…")
         self.thread.msleep(1500)
         self._restart()
 
     # ---------------- Windows 占用时的延迟覆盖 ----------------
-    def _win_delayed_replace(self, zip_path: Path, temp_dir: Path):
+    def _win_delayed_copy(self, staging: Path):
+        """文件被占用：退出后由 bat 把 staging 目录复制到安装目录."""
         logger.info("生成延迟脚本（bat）以解决文件占用")
         bat = APP_DIR / "updater.bat"
         bat.write_text(f"""@echo off
 timeout /t 2 /nobreak > NUL
-powershell -command "Expand-Archive -Path '{zip_path}' -DestinationPath '{APP_DIR}' -Force"
-del "{zip_path}"
+xcopy "{staging}" "{APP_DIR}" /E /Y /I /Q > NUL
+rmdir /S /Q "{staging}"
 start "" "{MAIN_PATH}"
 del "{bat}"
 """, encoding='gbk')
         logger.info(f"启动延迟脚本：{bat}")
         os.startfile(str(bat))
-        QApplication.quit()          # 旧进程立即退出，bat 接管后续
+        QApplication.quit()
 
     # ---------------- 重启自己 ----------------
     def _restart(self):
@@ -0,0 +1,286 @@
+"""放映窗口状态跟踪器。
+
+`is_powerpoint_showing()` 原先在每次左键释放时都要枚举全部顶层窗口并读取标题，
+窗口较多时每次翻页都会多出数十毫秒。这里改为由后台线程按 TTL 周期
+（或收到窗口变化通知时）刷新一份缓存状态，热路径只需读取 `tracker.showing`。
+
+窗口来源通过 `WindowSource` 接口注入：Windows 下使用 `PyGetWindowSource`，
+在 Linux / 测试环境中可使用 `StaticWindowSource` 提供一份假窗口列表。
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from loguru import logger
+
+from perf_stats import LatencyHistogram
+from title_matcher import TitleMatcher, matcher_from_config
+
+
+class WindowInfo(NamedTuple):
+    """单个顶层窗口的快照。"""
+    handle: int
+    title: str
+    left: int = 0
+    top: int = 0
+    width: int = 0
+    height: int = 0
+    class_name: str = ''
+
+
+class SlideshowState(NamedTuple):
+    """放映窗口状态：是否放映中、窗口句柄与几何信息。"""
+    active: bool
+    handle: int = 0
+    left: int = 0
+    top: int = 0
+    width: int = 0
+    height: int = 0
+
+
+INACTIVE = SlideshowState(False)
+
+
+# ------------------------------------------------------------------
+# 窗口来源
+# ------------------------------------------------------------------
+class WindowSource:
+    """窗口来源接口。
+
+    子类需实现 `list_windows`；若平台支持窗口变化通知，可重写 `subscribe`。
+    """
+
+    def list_windows(self, with_class: bool = False) -> Iterable[WindowInfo]:
+        """返回当前所有顶层窗口；with_class 为 True 时同时填写窗口类名。"""
+        raise NotImplementedError
+
+    def process_name(self, handle: int) -> str:
+        """返回窗口所属进程的可执行文件名（如 POWERPNT.EXE），未知时为空串。"""
+        return ''
+
+    def subscribe(self, callback: Callable[[], None]) -> bool:
+        """注册窗口变化通知回调。
+
+        返回:
+            bool: 支持通知时为 True；默认实现不支持，返回 False（仅靠 TTL 轮询）。
+        """
+        return False
+
+
+class StaticWindowSource(WindowSource):
+    """由调用方提供窗口列表的来源，用于测试或无桌面环境。"""
+
+    def __init__(self, windows: Optional[Iterable[WindowInfo]] = None,
+                 processes: Optional[Dict[int, str]] = None):
+        self._windows: List[WindowInfo] = list(windows or [])
+        self.processes: Dict[int, str] = dict(processes or {})
+        self._callbacks: List[Callable[[], None]] = []
+
+    def list_windows(self, with_class: bool = False) -> Iterable[WindowInfo]:
+        return list(self._windows)
+
+    def process_name(self, handle: int) -> str:
+        return self.processes.get(handle, '')
+
+    def set_windows(self, windows: Iterable[WindowInfo]) -> None:
+        """替换窗口列表，并像真实平台一样发出变化通知。"""
+        self._windows = list(windows)
+        for cb in self._callbacks:
+            cb()
+
+    def subscribe(self, callback: Callable[[], None]) -> bool:
+        self._callbacks.append(callback)
+        return True
+
+
+class PyGetWindowSource(WindowSource):
+    """基于 pygetwindow 的 Windows 窗口来源，并通过 SetWinEventHook 监听前台窗口切换。"""
+
+    # EVENT_SYSTEM_FOREGROUND / EVENT_SYSTEM_MINIMIZEEND
+    _EVENTS = (0x0003, 0x0017)
+
+    def __init__(self):
+        self._watch_thread: Optional[threading.Thread] = None
+
+    def list_windows(self, with_class: bool = False) -> Iterable[WindowInfo]:
+        import pygetwindow as gw
+        class_name = self._class_name if with_class else None
+        result = []
+        for w in gw.getAllWindows():
+            title = w.title
+            if not title:
+                continue
+            hwnd = w._hWnd
+            result.append(WindowInfo(hwnd, title, w.left, w.top, w.width, w.height,
+                                     class_name(hwnd) if class_name else ''))
+        return result
+
+    @staticmethod
+    def _class_name(hwnd: int) -> str:
+        import ctypes
+        buf = ctypes.create_unicode_buffer(256)
+        ctypes.windll.user32.GetClassNameW(hwnd, buf, 256)
+        return buf.value
+
+    def process_name(self, handle: int) -> str:
+        import ctypes
+        import os
+        from ctypes import wintypes
+        user32, kernel32 = ctypes.windll.user32, ctypes.windll.kernel32
+        pid = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(handle, ctypes.byref(pid))
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        h = kernel32.OpenProcess(0x1000, False, pid.value)
+        if not h:
+            return ''
+        try:
+            buf = ctypes.create_unicode_buffer(260)
+            size = wintypes.DWORD(260)
+            if not kernel32.QueryFullProcessImageNameW(h, 0, buf, ctypes.byref(size)):
+                return ''
+            return os.path.basename(buf.value)
+        finally:
+            kernel32.CloseHandle(h)
+
+    def subscribe(self, callback: Callable[[], None]) -> bool:
+        import sys
+        if sys.platform != 'win32':
+            return False
+        if self._watch_thread is None:
+            self._watch_thread = threading.Thread(
+                target=self._watch, args=(callback,), name='WinEventWatcher', daemon=True)
+            self._watch_thread.start()
+        return True
+
+    def _watch(self, callback: Callable[[], None]) -> None:
+        """在独立线程中安装 WinEvent 钩子并运行消息循环。"""
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        WINEVENTPROC = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+        def _proc(hook, event, hwnd, id_object, id_child, thread_id, time_ms):
+            callback()
+
+        proc = WINEVENTPROC(_proc)
+        hooks = [user32.SetWinEventHook(ev, ev, 0, proc, 0, 0, 0)  # WINEVENT_OUTOFCONTEXT
+                 for ev in self._EVENTS]
+        msg = wintypes.MSG()
+        try:
+            while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            for h in hooks:
+                user32.UnhookWinEvent(h)
+
+
+# ------------------------------------------------------------------
+# 跟踪器
+# ------------------------------------------------------------------
+class WindowTracker:
+    """缓存放映窗口状态的跟踪器。
+
+    后台线程每隔 `ttl` 秒刷新一次；窗口来源发出变化通知时立即刷新。
+    读取 `showing` / `state` 只是一次属性访问，可在鼠标钩子回调中直接使用。
+    放映开始 / 结束时依次调用 `on_change` 注册的回调。
+
+    参数:
+        matcher: 编译好的窗口匹配器，或单个标题子串（兼容旧用法）。
+        idle_ttl: 未在放映时的刷新周期，默认与 ttl 相同。
+    """
+
+    def __init__(self, source: WindowSource, matcher: Union[TitleMatcher, str], ttl: float = 0.5,
+                 idle_ttl: Optional[float] = None):
+        self.source = source
+        self.matcher = matcher_from_config(matcher) if isinstance(matcher, str) else matcher
+        self.ttl = ttl
+        self.idle_ttl = ttl if idle_ttl is None else idle_ttl
+        self.state: SlideshowState = INACTIVE
+        self.showing: bool = False
+        self.refresh_count = 0
+        # 每次枚举窗口的耗时（只由刷新线程写入）
+        self.check_time = LatencyHistogram('窗口检查')
+        self._callbacks: List[Callable[[SlideshowState], None]] = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _match(self, win: WindowInfo) -> bool:
+        return self.matcher.match(win.title, win.class_name, lambda: self.source.process_name(win.handle))
+
+    def refresh(self) -> SlideshowState:
+        """立即枚举一次窗口并更新缓存状态。"""
+        state = INACTIVE
+        start = time.perf_counter()
+        try:
+            for win in self.source.list_windows(with_class=self.matcher.needs_class):
+                if self._match(win):
+                    state = SlideshowState(True, win.handle, win.left, win.top, win.width, win.height)
+                    break
+        except Exception as e:
+            logger.warning(f"枚举窗口失败：{e}")
+        self.check_time.record(time.perf_counter() - start)
+        if state != self.state:
+            logger.debug(f"放映状态变化：{state}")
+        changed = state.active != self.showing
+        # 先写 state 再写 showing，两者均为单次属性赋值，读者无需加锁
+        self.state = state
+        self.showing = state.active
+        self.refresh_count += 1
+        if changed:
+            for callback in self._callbacks:
+                try:
+                    callback(state)
+                except Exception as e:
+                    logger.error(f"放映状态回调出错：{e}")
+        return state
+
+    def on_change(self, callback: Callable[[SlideshowState], None]) -> None:
+        """注册放映开始 / 结束回调（在刷新所在的线程中调用，参数为新的状态）。"""
+        self._callbacks.append(callback)
+
+    def set_title(self, title: str) -> None:
+        """改为只匹配单个标题子串并触发刷新。"""
+        self.set_matcher(matcher_from_config(title))
+
+    def set_matcher(self, matcher: TitleMatcher) -> None:
+        """替换窗口匹配器；与当前匹配器相同（配置未变化）时不做任何事。"""
+        if matcher is self.matcher:
+            return
+        self.matcher = matcher
+        self.notify()
+
+    def notify(self) -> None:
+        """窗口变化通知：唤醒后台线程立即刷新。"""
+        self._wake.set()
+
+    def start(self) -> None:
+        """同步刷新一次后启动后台刷新线程。"""
+        if self._thread is not None:
+            return
+        self.refresh()
+        self._stop.clear()
+        self.source.subscribe(self.notify)
+        self._thread = threading.Thread(target=self._run, name='WindowTracker', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台刷新线程。"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.ttl if self.showing else self.idle_ttl)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.refresh()